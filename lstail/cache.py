@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from shutil import rmtree
+import os
+import zlib
+
+from lstail.constants import HIT_CACHE_BLOCK_DOCUMENTS, HIT_CACHE_SETTLE_TIME
+from lstail.error import HitCacheError
+from lstail.util.file import write_file_atomically
+
+
+HIT_CACHE_VERSION = 1
+HIT_CACHE_INDEX_FILE_NAME = 'index.json'
+HIT_CACHE_SEGMENT_SUFFIX = '.seg'
+
+
+########################################################################
+class HitCache:
+    """
+    Cache the documents found by a search on disk to serve overlapping time ranges of
+    later searches (e.g. with a larger "--range") without querying Elasticsearch again.
+
+    The documents of each search (identified by its fingerprint) are stored in its own
+    directory as segments, each one covering a time range (exclusive start, inclusive end)
+    completely. A segment consists of zlib compressed blocks of documents sorted by time,
+    the sparse index of the blocks' time ranges is kept in the directory's index file.
+    Segments are read via mmap to decompress only the blocks of the requested time range.
+
+    Adjacent segments are merged into one. If the cache grows larger than `max_size`,
+    the least recently used searches are removed and if the current search alone is
+    still too large, its oldest documents.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, directory, fingerprint, logger, max_size):
+        self._directory = directory
+        self._search_directory = os.path.join(directory, fingerprint)
+        self._index_path = os.path.join(self._search_directory, HIT_CACHE_INDEX_FILE_NAME)
+        self._logger = logger
+        self._max_size = max_size
+        self._segments = None
+        self._new_segments = None
+        self._obsolete_file_names = None
+
+    # ----------------------------------------------------------------------
+    def search(self, timestamp_from, size, fetch, get_timestamp):
+        """
+        Return the latest `size` documents newer than `timestamp_from`, newest first.
+        Time ranges not covered by the cache are queried via
+        `fetch(timestamp_from, timestamp_to, size)` which must return the latest documents
+        of the time range, newest first (`timestamp_to` is None for the latest time range).
+        """
+        try:
+            self._load_index()
+            documents = self._search(timestamp_from, size, fetch, get_timestamp)
+        except HitCacheError as exc:
+            self._logger.warning('Reading the hit cache failed ({}), querying without cache', exc)
+            self._clear()
+            return fetch(timestamp_from, None, size)
+
+        try:
+            if self._new_segments:
+                self._store_new_segments()
+            elif self._segments:
+                self._mark_as_used()
+        except (OSError, ValueError, zlib.error) as exc:
+            self._logger.warning('Writing the hit cache failed: {}', exc)
+        return documents
+
+    # ----------------------------------------------------------------------
+    def _load_index(self):
+        self._segments = []
+        self._new_segments = []
+        self._obsolete_file_names = []
+        try:
+            with open(self._index_path, encoding='utf-8') as index_file:
+                index = loads(index_file.read())
+            self._parse_index(index)
+        except FileNotFoundError:
+            pass  # nothing cached yet
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            raise HitCacheError(exc) from exc
+
+    # ----------------------------------------------------------------------
+    def _parse_index(self, index):
+        if index['version'] != HIT_CACHE_VERSION:
+            raise ValueError(f'unsupported version {index["version"]}')
+
+        for segment in index['segments']:
+            self._segments.append(dict(
+                file_name=segment['file_name'],
+                timestamp_from=datetime.fromisoformat(segment['timestamp_from']),
+                timestamp_to=datetime.fromisoformat(segment['timestamp_to']),
+                blocks=[
+                    (datetime.fromisoformat(first), datetime.fromisoformat(last), offset, length)
+                    for first, last, offset, length in segment['blocks']]))
+
+    # ----------------------------------------------------------------------
+    def _search(self, timestamp_from, size, fetch, get_timestamp):
+        documents = []
+        cached_document_count = 0
+        cacheable_until = datetime.now() - HIT_CACHE_SETTLE_TIME
+        for range_from, range_to, segment in self._get_time_ranges(timestamp_from):
+            remaining_size = size - len(documents)
+            if remaining_size <= 0:
+                break
+
+            if segment is not None:
+                cached_documents = self._read_segment(
+                    segment,
+                    range_from,
+                    range_to,
+                    remaining_size)
+                cached_document_count += len(cached_documents)
+                documents.extend(cached_documents)
+                continue
+
+            fetched_documents = fetch(range_from, range_to, remaining_size)
+            documents.extend(fetched_documents)
+            self._add_segment(
+                fetched_documents,
+                range_from,
+                min(range_to or cacheable_until, cacheable_until),
+                remaining_size,
+                get_timestamp)
+
+        self._logger.debug(
+            'Hit cache served {} of {} documents',
+            cached_document_count,
+            len(documents))
+        return documents
+
+    # ----------------------------------------------------------------------
+    def _get_time_ranges(self, timestamp_from):
+        """Split the time range into cached and missing parts, newest first"""
+        range_to = None  # up to now
+        for segment in sorted(self._segments, key=lambda item: item['timestamp_to'], reverse=True):
+            if segment['timestamp_to'] <= timestamp_from:
+                break
+
+            # segments do not overlap, so there is a gap if the segment ends earlier
+            if range_to is None or segment['timestamp_to'] < range_to:
+                yield segment['timestamp_to'], range_to, None
+
+            range_to = segment['timestamp_to']
+            range_from = max(segment['timestamp_from'], timestamp_from)
+            yield range_from, range_to, segment
+            range_to = range_from
+            if range_to <= timestamp_from:
+                return
+
+        yield timestamp_from, range_to, None
+
+    # ----------------------------------------------------------------------
+    def _read_segment(self, segment, range_from, range_to, size):
+        if not segment['blocks']:
+            return []  # nothing found in the segment's time range
+
+        try:
+            return self._read_segment_file(segment, range_from, range_to, size)
+        except (OSError, ValueError, zlib.error) as exc:
+            raise HitCacheError(exc) from exc
+
+    # ----------------------------------------------------------------------
+    def _read_segment_file(self, segment, range_from, range_to, size):
+        documents = []
+        path = os.path.join(self._search_directory, segment['file_name'])
+        with open(path, 'rb') as segment_file:
+            with mmap(segment_file.fileno(), 0, access=ACCESS_READ) as segment_data:
+                for block in reversed(segment['blocks']):
+                    for document in self._read_block(segment_data, block, range_from, range_to):
+                        documents.append(document)
+                        if len(documents) >= size:
+                            return documents
+
+        return documents
+
+    # ----------------------------------------------------------------------
+    def _read_block(self, segment_data, block, range_from, range_to):
+        first, last, offset, length = block
+        if first > range_to or last <= range_from:
+            return  # no documents of the requested time range in the block
+
+        data = zlib.decompress(segment_data[offset:offset + length])
+        for line in reversed(data.splitlines()):
+            timestamp, document_json = line.split(b'\t', 1)
+            timestamp = datetime.fromisoformat(timestamp.decode('utf-8'))
+            if range_from < timestamp <= range_to:
+                yield loads(document_json)
+
+    # ----------------------------------------------------------------------
+    def _add_segment(self, documents, range_from, range_to, size, get_timestamp):
+        if len(documents) >= size:
+            # more documents than fetched might exist, so only the time range after the
+            # oldest fetched document is complete
+            range_from = get_timestamp(documents[-1]) if documents else None
+            if range_from is None:
+                return
+
+        if range_to <= range_from:
+            return  # the time range is too recent to be cached
+
+        entries = []
+        for document in reversed(documents):
+            timestamp = get_timestamp(document)
+            if timestamp is not None and range_from < timestamp <= range_to:
+                entries.append((timestamp, document))
+
+        # written after the search to not delay it
+        self._new_segments.append((range_from, range_to, entries))
+
+    # ----------------------------------------------------------------------
+    def _store_new_segments(self):
+        for range_from, range_to, entries in self._new_segments:
+            file_name, blocks = self._write_segment_file(entries)
+            self._segments.append(dict(
+                file_name=file_name,
+                timestamp_from=range_from,
+                timestamp_to=range_to,
+                blocks=blocks))
+        self._merge_adjacent_segments()
+        self._write_index()
+        self._remove_obsolete_segment_files()
+
+        excess_size = self._evict_least_recently_used_searches()
+        if excess_size > 0:
+            self._drop_oldest_documents(excess_size)
+            self._write_index()
+            self._remove_obsolete_segment_files()
+
+    # ----------------------------------------------------------------------
+    def _mark_as_used(self):
+        # the index is not written on a cache hit, but its modification time marks the search
+        # as recently used
+        os.utime(self._index_path)
+
+    # ----------------------------------------------------------------------
+    def _write_segment_file(self, entries):
+        blocks = []
+        data = bytearray()
+        for start in range(0, len(entries), HIT_CACHE_BLOCK_DOCUMENTS):
+            block_entries = entries[start:start + HIT_CACHE_BLOCK_DOCUMENTS]
+            lines = [
+                f'{timestamp.isoformat()}\t{dumps(document)}'
+                for timestamp, document in block_entries]
+            block = zlib.compress('\n'.join(lines).encode('utf-8'))
+            blocks.append((block_entries[0][0], block_entries[-1][0], len(data), len(block)))
+            data.extend(block)
+
+        return self._write_segment_data(data), blocks
+
+    # ----------------------------------------------------------------------
+    def _write_segment_data(self, data):
+        os.makedirs(self._search_directory, exist_ok=True)
+        file_name = f'{os.urandom(8).hex()}{HIT_CACHE_SEGMENT_SUFFIX}'
+        write_file_atomically(os.path.join(self._search_directory, file_name), bytes(data))
+        return file_name
+
+    # ----------------------------------------------------------------------
+    def _merge_adjacent_segments(self):
+        groups = []
+        for segment in sorted(self._segments, key=lambda item: item['timestamp_from']):
+            if groups and groups[-1][-1]['timestamp_to'] == segment['timestamp_from']:
+                groups[-1].append(segment)
+            else:
+                groups.append([segment])
+
+        self._segments = []
+        for group in groups:
+            if len(group) == 1:
+                self._segments.append(group[0])
+                continue
+
+            file_name, blocks = self._copy_blocks(
+                [(segment, segment['blocks']) for segment in group])
+            self._segments.append(dict(
+                file_name=file_name,
+                timestamp_from=group[0]['timestamp_from'],
+                timestamp_to=group[-1]['timestamp_to'],
+                blocks=blocks))
+
+    # ----------------------------------------------------------------------
+    def _copy_blocks(self, segment_blocks):
+        """Write the compressed `blocks` of the segments into a new segment file"""
+        blocks = []
+        data = bytearray()
+        for segment, source_blocks in segment_blocks:
+            path = os.path.join(self._search_directory, segment['file_name'])
+            with open(path, 'rb') as segment_file:
+                segment_data = segment_file.read()
+            for first, last, offset, length in source_blocks:
+                blocks.append((first, last, len(data), length))
+                data.extend(segment_data[offset:offset + length])
+            self._obsolete_file_names.append(segment['file_name'])
+
+        return self._write_segment_data(data), blocks
+
+    # ----------------------------------------------------------------------
+    def _drop_oldest_documents(self, excess_size):
+        """Remove the oldest segments or blocks of the current search of `excess_size` bytes"""
+        self._logger.debug('Removing the oldest documents of the current search from hit cache')
+        segments = sorted(self._segments, key=lambda item: item['timestamp_from'])
+        while segments and excess_size > 0:
+            segment = segments.pop(0)
+            blocks = segment['blocks']
+            dropped_block_count = 0
+            while dropped_block_count < len(blocks) and excess_size > 0:
+                excess_size -= blocks[dropped_block_count][3]
+                dropped_block_count += 1
+
+            if dropped_block_count == len(blocks):
+                self._obsolete_file_names.append(segment['file_name'])
+                continue
+
+            file_name, kept_blocks = self._copy_blocks([(segment, blocks[dropped_block_count:])])
+            # the time range of the segment continues after the last removed document
+            segments.insert(0, dict(
+                file_name=file_name,
+                timestamp_from=blocks[dropped_block_count - 1][1],
+                timestamp_to=segment['timestamp_to'],
+                blocks=kept_blocks))
+            break
+
+        self._segments = segments
+
+    # ----------------------------------------------------------------------
+    def _remove_obsolete_segment_files(self):
+        # removed only once the index does not refer to them anymore
+        while self._obsolete_file_names:
+            file_name = self._obsolete_file_names.pop()
+            try:
+                os.remove(os.path.join(self._search_directory, file_name))
+            except FileNotFoundError:
+                pass
+
+    # ----------------------------------------------------------------------
+    def _write_index(self):
+        index = dict(
+            version=HIT_CACHE_VERSION,
+            segments=[
+                dict(
+                    file_name=segment['file_name'],
+                    timestamp_from=segment['timestamp_from'].isoformat(),
+                    timestamp_to=segment['timestamp_to'].isoformat(),
+                    blocks=[
+                        (first.isoformat(), last.isoformat(), offset, length)
+                        for first, last, offset, length in segment['blocks']])
+                for segment in self._segments])
+        # the modification time of the index marks the search as recently used
+        write_file_atomically(self._index_path, dumps(index).encode('utf-8'))
+
+    # ----------------------------------------------------------------------
+    def _evict_least_recently_used_searches(self):
+        """Remove other searches if the cache is too large, return the remaining excess size"""
+        searches = []
+        for entry in os.scandir(self._directory):
+            if entry.is_dir():
+                try:
+                    searches.append(self._get_search_directory_usage(entry.path))
+                except OSError as exc:
+                    # e.g. removed concurrently by another lstail process
+                    self._logger.debug('Unable to inspect hit cache directory: {}', exc)
+
+        total_size = sum(size for _, size, _ in searches)
+        for _, size, path in sorted(searches):
+            if total_size <= self._max_size:
+                break
+            if path == self._search_directory:
+                continue  # keep the current search
+
+            self._logger.debug('Removing least recently used search from hit cache: {}', path)
+            rmtree(path, ignore_errors=True)
+            total_size -= size
+
+        return total_size - self._max_size
+
+    # ----------------------------------------------------------------------
+    def _get_search_directory_usage(self, path):
+        size = 0
+        last_used = 0
+        for entry in os.scandir(path):
+            stat = entry.stat()
+            size += stat.st_size
+            if entry.name == HIT_CACHE_INDEX_FILE_NAME:
+                last_used = stat.st_mtime
+        return last_used, size, path
+
+    # ----------------------------------------------------------------------
+    def _clear(self):
+        self._segments = []
+        rmtree(self._search_directory, ignore_errors=True)
@@ -6,8 +6,15 @@
 import sys
 
 from lstail.config import LstailConfigParser
+from lstail.fanout import FanOutLogstashReader
+from lstail.multisearch import MultiSearchLogstashReader
 from lstail.options import LstailArgumentParser
 from lstail.reader import LogstashReader
+from lstail.replay import ReplayLogstashReader
+from lstail.serve import AttachedLogstashReader, ServingLogstashReader
+from lstail.sink import FileSink
+from lstail.summary import SummaryLogstashReader
+from lstail.util.timestamp import parse_time_range_to_seconds
 
 
 # ----------------------------------------------------------------------
@@ -22,18 +29,60 @@ def _setup_config(options):
     return config_parser.parse()
 
 
+# ----------------------------------------------------------------------
+def _factor_reader(config):  # pylint: disable=too-many-return-statements
+    if config.replay_file:
+        return ReplayLogstashReader(config)
+    if config.serve:
+        return ServingLogstashReader(config)
+    if config.attach:
+        return AttachedLogstashReader(config)
+    if config.summary_count or config.summary_top or config.summary_histogram_interval:
+        return SummaryLogstashReader(config)
+    if config.fan_out:
+        return FanOutLogstashReader(config)
+    if config.multi_search:
+        return MultiSearchLogstashReader(config)
+
+    return LogstashReader(config)
+
+
+# ----------------------------------------------------------------------
+def _factor_file_sink(config):
+    rotate_size = None
+    if config.output_rotate_size:
+        rotate_size = config.output_rotate_size * 1024 * 1024
+    rotate_interval = None
+    if config.output_rotate_interval:
+        rotate_interval = parse_time_range_to_seconds(config.output_rotate_interval)
+
+    return FileSink(config.output_file, rotate_size=rotate_size, rotate_interval=rotate_interval)
+
+
+# ----------------------------------------------------------------------
+def _read(reader, config):
+    if not config.output_file:
+        reader.read()
+        return
+
+    # the file sink is closed also on Ctrl-C to write all events read so far
+    with _factor_file_sink(config) as file_sink:
+        reader.set_output(file_sink)
+        reader.read()
+
+
 # ----------------------------------------------------------------------
 def main():
     options = _setup_options()
     try:
         config = _setup_config(options)
-        reader = LogstashReader(config)
+        reader = _factor_reader(config)
         if options.kibana_list_saved_searches:
             reader.list_kibana_saved_searches()
         elif options.version:
             reader.show_version()
         else:
-            reader.read()
+            _read(reader, config)
     except Exception as exc:  # pylint: disable=broad-except
         if options.debug:
             raise
@@ -6,7 +6,24 @@
 from configparser import ConfigParser
 import os
 
-from lstail.constants import LSTAIL_DEFAULT_FIELD_DOCUMENT_ID
+from lstail.constants import (
+    BACKPRESSURE_BLOCK,
+    BACKPRESSURE_POLICIES,
+    DEFAULT_BACKPRESSURE_MAX_LAG,
+    DEFAULT_FAN_OUT_REORDER_WINDOW,
+    DEFAULT_HIT_CACHE_MAX_SIZE,
+    DEFAULT_PAGE_MAX_BYTES,
+    DEFAULT_PAGE_SIZE_MAX,
+    DEFAULT_PAGE_TARGET_BYTES,
+    DEFAULT_PAGE_TARGET_LATENCY,
+    DEFAULT_PREFETCH_PAGES,
+    DEFAULT_REFRESH_INTERVAL_MAX,
+    DEFAULT_RENDER_POOL_THRESHOLD,
+    DEFAULT_STATE_CHECKPOINT_PAGES,
+    LSTAIL_DEFAULT_FIELD_CLUSTER,
+    LSTAIL_DEFAULT_FIELD_DOCUMENT_ID,
+    LSTAIL_DEFAULT_FIELD_SEARCH,
+)
 from lstail.dto.column import Column
 from lstail.dto.configuration import Configuration
 from lstail.dto.server import Server
@@ -31,6 +48,8 @@ class LstailConfigParser:
         self._parse_config()
         self._override_config_options_from_command_line()
         self._add_debug_columns()
+        self._add_fan_out_columns()
+        self._add_multi_search_columns()
         return self._config
 
     # ----------------------------------------------------------------------
@@ -79,13 +98,97 @@ class LstailConfigParser:
         parser = self._config_parser
         self._config.timeout = parser.getfloat(section_name, 'timeout')
         self._config.refresh_interval = parser.getfloat(section_name, 'refresh_interval')
+        self._config.refresh_interval_min = self._config_option_get_default(
+            section_name,
+            'refresh_interval_min',
+            0.0,
+            getter=parser.getfloat)
+        self._config.refresh_interval_max = self._config_option_get_default(
+            section_name,
+            'refresh_interval_max',
+            max(DEFAULT_REFRESH_INTERVAL_MAX, self._config.refresh_interval),
+            getter=parser.getfloat)
         self._config.initial_query_size = parser.getint(section_name, 'initial_query_size')
+        self._config.page_size_max = self._config_option_get_default(
+            section_name,
+            'page_size_max',
+            DEFAULT_PAGE_SIZE_MAX,
+            getter=parser.getint)
+        self._config.page_target_bytes = self._config_option_get_default(
+            section_name,
+            'page_target_bytes',
+            DEFAULT_PAGE_TARGET_BYTES,
+            getter=parser.getint)
+        self._config.page_max_bytes = self._config_option_get_default(
+            section_name,
+            'page_max_bytes',
+            DEFAULT_PAGE_MAX_BYTES,
+            getter=parser.getint)
+        self._config.page_target_latency = self._config_option_get_default(
+            section_name,
+            'page_target_latency',
+            DEFAULT_PAGE_TARGET_LATENCY,
+            getter=parser.getfloat)
+        self._config.prefetch_pages = self._config_option_get_default(
+            section_name,
+            'prefetch_pages',
+            DEFAULT_PREFETCH_PAGES,
+            getter=parser.getint)
+        self._config.state_checkpoint_pages = self._config_option_get_default(
+            section_name,
+            'state_checkpoint_pages',
+            DEFAULT_STATE_CHECKPOINT_PAGES,
+            getter=parser.getint)
         self._config.initial_time_range = parser.get(section_name, 'initial_time_range')
         self._config.verify_ssl_certificates = parser.getboolean(
             section_name, 'verify_ssl_certificates')
         self._config.default_index = self._config_option_get_default(section_name, 'default_index')
         self._config.verbose = parser.getboolean(section_name, 'verbose')
         self._config.no_header = parser.getboolean(section_name, 'no_header')
+        self._config.narrow_indices = self._config_option_get_default(
+            section_name,
+            'narrow_indices',
+            True,
+            getter=parser.getboolean)
+        self._config.follow_overlap = self._config_option_get_default(
+            section_name,
+            'follow_overlap',
+            0.0,
+            getter=parser.getfloat)
+        self._config.ingest_time_field = self._config_option_get_default(
+            section_name,
+            'ingest_time_field')
+        self._config.fan_out_reorder_window = self._config_option_get_default(
+            section_name,
+            'fan_out_reorder_window',
+            DEFAULT_FAN_OUT_REORDER_WINDOW,
+            getter=parser.getfloat)
+        self._config.hit_cache_dir = self._config_option_get_default(section_name, 'hit_cache_dir')
+        self._config.hit_cache_max_size = self._config_option_get_default(
+            section_name,
+            'hit_cache_max_size',
+            DEFAULT_HIT_CACHE_MAX_SIZE,
+            getter=parser.getint)
+        self._config.render_pool_threshold = self._config_option_get_default(
+            section_name,
+            'render_pool_threshold',
+            DEFAULT_RENDER_POOL_THRESHOLD,
+            getter=parser.getint)
+        self._config.server_side_truncation = self._config_option_get_default(
+            section_name,
+            'server_side_truncation',
+            False,
+            getter=parser.getboolean)
+        self._config.backpressure = self._parse_backpressure_policy(
+            self._config_option_get_default(section_name, 'backpressure', BACKPRESSURE_BLOCK),
+            section_name)
+        self._config.backpressure_max_lag = self._config_option_get_default(
+            section_name,
+            'backpressure_max_lag',
+            DEFAULT_BACKPRESSURE_MAX_LAG,
+            getter=parser.getfloat)
+        highlight_terms = self._config_option_get_default(section_name, 'highlight_terms', '')
+        self._config.highlight_terms = [term for term in highlight_terms.split(', ') if term]
         header_color = self._config_option_get_default(section_name, 'header_color', 'light_yellow')
         if header_color:
             self._config.header_color = self._parse_column_color(header_color, section_name)
@@ -99,6 +202,8 @@ class LstailConfigParser:
         self._config.kibana.saved_search = self._config_option_get_default(
             section_name,
             'default_saved_search')
+        if self._config.kibana.saved_search:
+            self._config.kibana.saved_searches = [self._config.kibana.saved_search]
         default_columns = self._config_option_get_default(
             section_name,
             'default_columns',
@@ -134,11 +239,14 @@ class LstailConfigParser:
         padding_raw = self._config_option_get_default(section_name, 'padding')
         column_color_name = self._config_option_get_default(section_name, 'color')
         column_color = self._parse_column_color(column_color_name, section_name)
+        max_length_raw = self._config_option_get_default(section_name, 'max_length')
+        max_length = self._parse_column_max_length(max_length_raw, section_name)
 
         column = Column()
         column.names = names_raw.split(', ')
         column.color = column_color
         column.padding = padding_raw
+        column.max_length = max_length
         column.display = bool(display_raw in (True, '1', 'true', 'True', 'TRUE'))
         self._config.display.columns[column_name] = column
 
@@ -151,6 +259,27 @@ class LstailConfigParser:
                   f'in section "{section_name}"'
             raise RuntimeError(msg) from exc
 
+    # ----------------------------------------------------------------------
+    def _parse_backpressure_policy(self, policy, section_name):
+        if policy not in BACKPRESSURE_POLICIES:
+            msg = f'Invalid backpressure policy: "{policy}" in section "{section_name}"'
+            raise RuntimeError(msg)
+        return policy
+
+    # ----------------------------------------------------------------------
+    def _parse_column_max_length(self, max_length_raw, section_name):
+        if not max_length_raw:
+            return None  # no limit
+
+        try:
+            max_length = int(max_length_raw)
+        except ValueError:
+            max_length = 0
+        if max_length < 1:
+            msg = f'Invalid maximum length: "{max_length_raw}" in section "{section_name}"'
+            raise RuntimeError(msg)
+        return max_length
+
     # ----------------------------------------------------------------------
     def _parse_server_settings(self, section_name):
         server = Server()
@@ -162,6 +291,9 @@ class LstailConfigParser:
         server.url = self._config_parser.get(section_name, 'url')
         server.username = self._config_option_get_default(section_name, 'username')
         server.password = self._config_option_get_default(section_name, 'password')
+        # servers of the same group are used for failover, groups are queried concurrently
+        # in fan-out mode
+        server.group = self._config_option_get_default(section_name, 'group', server.name)
         headers_raw = self._config_option_get_default(section_name, 'headers', default='')
         server.headers = [
             self._parse_server_http_header(header)
@@ -190,12 +322,37 @@ class LstailConfigParser:
         self._config.verbose = self._config.verbose or self._options.verbose or self._config.debug
         self._config.no_header = self._config.no_header or self._options.no_header
         self._config.csv_output = self._options.csv_output
+        self._config.json_output = self._options.json_output
+        self._config.fan_out = self._options.fan_out
+        self._config.serve = self._options.serve
+        self._config.attach = self._options.attach
+        self._config.socket_path = self._options.socket_path
+        self._config.async_search = self._options.async_search
+        self._config.state_file = self._options.state_file
+        self._config.no_cache = self._options.no_cache
+        self._config.record_file = self._options.record_file
+        self._config.replay_file = self._options.replay_file
+        self._config.replay_pacing = self._options.replay_pacing
+        self._config.output_file = self._options.output_file
+        self._config.output_rotate_size = self._options.output_rotate_size
+        self._config.output_rotate_interval = self._options.output_rotate_interval
+        self._config.min_level = self._options.min_level
+        self._config.match_expressions = self._options.match_expressions
+        self._config.sample_rate = self._options.sample_rate
+        self._config.summary_histogram_interval = self._options.summary_histogram_interval
+        self._config.summary_top = self._options.summary_top
+        self._config.summary_count = self._options.summary_count
+        if self._options.backpressure:
+            self._config.backpressure = self._options.backpressure
+        if self._options.highlight_terms:
+            self._config.highlight_terms = self._options.highlight_terms
         if self._options.initial_time_range:
             self._config.initial_time_range = self._options.initial_time_range
         if self._options.initial_query_size:
             self._config.initial_query_size = self._options.initial_query_size
         if self._options.kibana_saved_search:
             self._config.kibana.saved_search = self._options.kibana_saved_search
+            self._config.kibana.saved_searches = self._options.kibana_saved_searches
         if self._options.custom_search:
             self._config.kibana.custom_search = self._options.custom_search
 
@@ -210,3 +367,29 @@ class LstailConfigParser:
                 display=True,
                 padding=24)
             self._config.display.columns[document_id_column_name] = document_id_column
+
+    # ----------------------------------------------------------------------
+    def _add_fan_out_columns(self):
+        if self._config.fan_out:
+            # add column for the server group each event was fetched from
+            cluster_column_name = LSTAIL_DEFAULT_FIELD_CLUSTER
+            cluster_column = Column(
+                names=[cluster_column_name],
+                color=self._parse_column_color('blue', '<code>'),
+                display=True,
+                padding=max((len(server.group) for server in self._config.servers), default=0))
+            self._config.display.columns[cluster_column_name] = cluster_column
+
+    # ----------------------------------------------------------------------
+    def _add_multi_search_columns(self):
+        saved_searches = self._config.kibana.saved_searches
+        self._config.multi_search = len(saved_searches) > 1
+        if self._config.multi_search:
+            # add column for the saved search each event was found by
+            search_column_name = LSTAIL_DEFAULT_FIELD_SEARCH
+            search_column = Column(
+                names=[search_column_name],
+                color=self._parse_column_color('green', '<code>'),
+                display=True,
+                padding=max(len(saved_search) for saved_search in saved_searches))
+            self._config.display.columns[search_column_name] = search_column
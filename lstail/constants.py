@@ -3,6 +3,7 @@
 # This software may be modified and distributed under the terms
 # of the MIT license.  See the LICENSE file for details.
 
+from datetime import timedelta
 import os
 import sys
 
@@ -16,6 +17,14 @@ LSTAIL_FALLBACK_FIELD_VALUE = '<unset>'
 LSTAIL_DEFAULT_FIELD_TIMESTAMP = 'timestamp'
 LSTAIL_DEFAULT_FIELD_DOCUMENT_ID = 'document_id'
 LSTAIL_DEFAULT_FIELD_MESSAGE = 'message'
+LSTAIL_DEFAULT_FIELD_CLUSTER = 'cluster'
+LSTAIL_DEFAULT_FIELD_SEARCH = 'search'
+# appended to values cut to the maximum length of their column, with the number of cut characters
+LSTAIL_TRUNCATION_MARKER = '...[+{}]'
+
+# JSON output formats: display columns or the complete document source
+OUTPUT_FORMAT_JSON = 'json'
+OUTPUT_FORMAT_NDJSON = 'ndjson'
 
 # fallback encoding to be used for log events (tried to be read from the response headers first)
 LOG_ENCODING = 'utf-8'
@@ -24,8 +33,114 @@ NON_RETRYING_STATUS_CODES = (400, 401, 404, 406)
 # number of seconds to wait between retrying HTTP calls
 HTTP_RETRYING_PAUSE = 1.0
 
+# upper limit in seconds for the refresh interval in follow mode if no new events were found
+DEFAULT_REFRESH_INTERVAL_MAX = 60.0
+# factor to increase the refresh interval in follow mode if no new events were found
+REFRESH_INTERVAL_BACKOFF_FACTOR = 2.0
+
+# page size limits for queries in follow mode, adapted to document size and response time
+PAGE_SIZE_INITIAL = 500
+PAGE_SIZE_MIN = 10
+# Elasticsearch's default "index.max_result_window"
+DEFAULT_PAGE_SIZE_MAX = 10000
+DEFAULT_PAGE_TARGET_BYTES = 4 * 1024 * 1024
+DEFAULT_PAGE_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_PAGE_TARGET_LATENCY = 1.0
+# number of pages to fetch in advance while printing, 0 to fetch and print sequentially
+DEFAULT_PREFETCH_PAGES = 2
+# number of seconds to wait for free space in the prefetch queue before checking for shutdown
+PREFETCH_QUEUE_TIMEOUT = 0.5
+# number of pages after which the reader position is written to the state file
+DEFAULT_STATE_CHECKPOINT_PAGES = 10
+# maximum number of processed document IDs to store in the state file
+STATE_MAX_DOCUMENTS = 10000
+
+# policies if printing the events is slower than their ingest (in follow mode): wait for
+# the output, skip to the latest events or print a sample of the events
+BACKPRESSURE_BLOCK = 'block'
+BACKPRESSURE_SKIP = 'skip'
+BACKPRESSURE_SAMPLE = 'sample'
+BACKPRESSURE_POLICIES = (BACKPRESSURE_BLOCK, BACKPRESSURE_SKIP, BACKPRESSURE_SAMPLE)
+# number of seconds the printed events may lag behind the current time before the
+# backpressure policy applies
+DEFAULT_BACKPRESSURE_MAX_LAG = 60.0
+# minimum rate of the events printed by the "sample" backpressure policy
+BACKPRESSURE_MIN_SAMPLE_RATE = 0.01
+
+# number of seconds to hold back events in fan-out mode to merge them in order if
+# a server group lags behind
+DEFAULT_FAN_OUT_REORDER_WINDOW = 5.0
+
+# number of seconds after which wildcard index patterns are resolved again
+INDEX_RESOLUTION_REFRESH_INTERVAL = 300
+# safety margin for time-based index narrowing, e.g. for events stored with a slightly
+# different time than the index name suggests
+INDEX_NARROWING_TIME_MARGIN = timedelta(hours=1)
+# query the index pattern itself if it resolves into more indices (to keep the URL short)
+INDEX_NARROWING_MAX_INDICES = 128
+
+# maximum number of seconds to wait for the results of an async search per request,
+# limited to half of the configured timeout to not run into the timeout
+ASYNC_SEARCH_WAIT_FOR_COMPLETION_TIMEOUT = 10.0
+# number of seconds to wait before asking again for the results of an async search
+ASYNC_SEARCH_POLL_INTERVAL = 1.0
+# time to keep the results of an async search if lstail gets interrupted
+ASYNC_SEARCH_KEEP_ALIVE = '5m'
+
+# maximum size in bytes of the hit cache (for all searches)
+DEFAULT_HIT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+# number of documents per compressed block in the hit cache
+HIT_CACHE_BLOCK_DOCUMENTS = 256
+# documents newer than this are not cached as more documents might still be indexed for
+# this time range
+HIT_CACHE_SETTLE_TIME = timedelta(seconds=60)
+
+# minimum number of documents in a page to render them in worker processes if the output
+# is not a terminal (e.g. for large exports), 0 to always render in the main process
+DEFAULT_RENDER_POOL_THRESHOLD = 5000
+# number of documents rendered at once by a worker process
+RENDER_POOL_CHUNK_DOCUMENTS = 1000
+
+# number of bytes of output to collect before handing them to the compression thread of
+# "lstail --output"
+FILE_SINK_CHUNK_SIZE = 64 * 1024
+# number of chunks waiting for compression before writing blocks (to limit memory usage)
+FILE_SINK_QUEUE_SIZE = 16
+
+# number of values of the field of "lstail --top FIELD" if not specified
+DEFAULT_SUMMARY_TOP_SIZE = 10
+# maximum width of the bars of "lstail --histogram"
+SUMMARY_HISTOGRAM_BAR_WIDTH = 40
+
+# seed of the random scores to sample the events of "lstail --sample", fixed to select the
+# same events in each query (e.g. for overlapping time ranges) and each run
+SAMPLE_RANDOM_SCORE_SEED = 1783
+# field of which the random scores are derived (per shard, available since Elasticsearch 6)
+SAMPLE_RANDOM_SCORE_FIELD = '_seq_no'
+
+# number of seconds to wait for a client of "lstail --serve" to receive events before
+# the client is dropped to not slow down the other clients
+SERVE_CLIENT_SEND_TIMEOUT = 2.0
+# maximum number of bytes of events received at once by "lstail --attach" to print them
+# as one page
+ATTACH_READ_SIZE = 65536
+# number of documents of a recording printed at once by "lstail --replay"
+REPLAY_PAGE_SIZE = 1000
+
 ELASTICSEARCH_DEFAULT_FIELD_TIMESTAMP = '@timestamp'
 
+# Painless script to return a field cut to "params.max_length" characters (with its original
+# length) instead of transferring an oversized value in "_source"
+TRUNCATION_SCRIPT = '''
+def source = params['_source'];
+if (!source.containsKey(params.field)) { return null; }
+def value = source[params.field];
+if (value instanceof String && value.length() > params.max_length) {
+    return ['truncated_value': value.substring(0, params.max_length), 'length': value.length()];
+}
+return value;
+'''.strip()
+
 # default format
 ELASTICSEARCH_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 # supported formats
@@ -37,6 +152,9 @@ ELASTICSEARCH_TIMESTAMP_FORMATS = (
     '%d/%b/%Y:%H:%M:%S %z',
 )
 
+SORT_ORDER_ASCENDING = 'asc'
+SORT_ORDER_DESCENDING = 'desc'
+
 FILTER_GROUP_MUST = 'must'
 FILTER_GROUP_MUST_NOT = 'must_not'
 
@@ -173,10 +291,18 @@ KIBANA6_INDEX_PATTERN_SEARCH_QUERY = {
     }
 }
 
+# log levels for --min-level, in ascending order
+LOG_LEVEL_WARNING = 'warning'
+LOG_LEVEL_ERROR = 'error'
+LOG_LEVELS = (LOG_LEVEL_WARNING, LOG_LEVEL_ERROR)
+
 TERM_COLOR_WARNING = 'yellow'
 TERM_COLOR_ERROR = 'red'
 TERM_COLOR_DEFAULT = 'default'
 TERM_COLOR_RESET = 'reset'
+# reverse video on/off for highlighted terms, keeping the color of the column
+TERM_HIGHLIGHT_START = '\033[7m'
+TERM_HIGHLIGHT_END = '\033[27m'
 
 TERM_COLORS = {
     '_c_blue': '\033[34m',
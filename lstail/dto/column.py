@@ -8,8 +8,9 @@
 class Column:  # pylint: disable=too-few-public-methods
 
     # ----------------------------------------------------------------------
-    def __init__(self, names=None, color=None, display=None, padding=None):
+    def __init__(self, names=None, color=None, display=None, padding=None, max_length=None):
         self.names = names
         self.color = color
         self.display = display
         self.padding = padding
+        self.max_length = max_length
@@ -15,20 +15,60 @@ from lstail.dto.parser import ParserConfiguration
 class Configuration:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
 
     # ----------------------------------------------------------------------
-    def __init__(self):
+    def __init__(self):  # pylint: disable=too-many-statements
         self.initial_query_size = None
+        self.page_size_max = None
+        self.page_target_bytes = None
+        self.page_max_bytes = None
+        self.page_target_latency = None
+        self.prefetch_pages = None
         self.initial_time_range = None
         self.default_index = None
         self.refresh_interval = None
+        self.refresh_interval_min = None
+        self.refresh_interval_max = None
         self.verify_ssl_certificates = None
         self.header_color = None
         self.no_header = None
         self.csv_output = None
+        self.json_output = None
         self.timeout = None
         self.follow = None
         self.verbose = None
         self.debug = None
         self.select_kibana_saved_search = None
+        self.narrow_indices = None
+        self.follow_overlap = None
+        self.ingest_time_field = None
+        self.fan_out = None
+        self.fan_out_reorder_window = None
+        self.multi_search = None
+        self.serve = None
+        self.attach = None
+        self.socket_path = None
+        self.async_search = None
+        self.state_file = None
+        self.state_checkpoint_pages = None
+        self.hit_cache_dir = None
+        self.hit_cache_max_size = None
+        self.no_cache = None
+        self.render_pool_threshold = None
+        self.server_side_truncation = None
+        self.highlight_terms = None
+        self.backpressure = None
+        self.backpressure_max_lag = None
+        self.record_file = None
+        self.replay_file = None
+        self.replay_pacing = None
+        self.output_file = None
+        self.output_rotate_size = None
+        self.output_rotate_interval = None
+        self.min_level = None
+        self.match_expressions = None
+        self.sample_rate = None
+        self.summary_histogram_interval = None
+        self.summary_top = None
+        self.summary_count = None
 
         self.servers = deque()
         self.kibana = KibanaConfiguration()
@@ -11,5 +11,6 @@ class KibanaConfiguration:  # pylint: disable=too-few-public-methods
     def __init__(self):
         self.index_name = None
         self.saved_search = None
+        self.saved_searches = []
         self.default_columns = None
         self.custom_search = None
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+
+########################################################################
+class PageColumn:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name, aliases, color=None, format_spec='', max_length=None):
+        self.name = name
+        self.path = tuple(name.split('.'))
+        # (name, path) of the column name and its aliases to look up in the documents
+        self.paths = [(alias, tuple(alias.split('.'))) for alias in [name] + aliases]
+        self.color = color
+        self.format_spec = format_spec
+        self.max_length = max_length
+
+
+########################################################################
+class Page:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self, documents):
+        self.documents = documents
+        # per document: the values to look up the columns in or None if the document needs
+        # to be printed on its own (e.g. to handle errors)
+        self.values = []
+        self.event_times = []
+        # per page column: the values of all documents
+        self.columns = []
@@ -5,6 +5,8 @@
 
 from copy import deepcopy
 
+from lstail.constants import TRUNCATION_SCRIPT
+
 
 ########################################################################
 class Query:
@@ -15,6 +17,67 @@ class Query:
         self.query = query
         self.time_field_name = time_field_name
 
+    # ----------------------------------------------------------------------
+    def set_time_field_name(self, time_field_name):
+        # sort by the new time field
+        sort = self.query['sort'][0].pop(self.time_field_name)
+        self.query['sort'][0][time_field_name] = sort
+        self.time_field_name = time_field_name
+
+    # ----------------------------------------------------------------------
+    def set_sort_order(self, order):
+        self.query['sort'][0][self.time_field_name]['order'] = order
+
+    # ----------------------------------------------------------------------
+    def get_sort_order(self):
+        return self.query['sort'][0][self.time_field_name]['order']
+
+    # ----------------------------------------------------------------------
+    def set_truncated_fields(self, max_lengths):
+        # let Elasticsearch return the fields cut to their maximum length as script fields
+        # instead of transferring the complete values as part of the source
+        self._add_source_excludes(max_lengths)
+        self.query['script_fields'] = {
+            field_name: {
+                'script': {
+                    'lang': 'painless',
+                    'source': TRUNCATION_SCRIPT,
+                    'params': {'field': field_name, 'max_length': max_length},
+                }
+            }
+            for field_name, max_length in max_lengths.items()
+        }
+
+    # ----------------------------------------------------------------------
+    def _add_source_excludes(self, field_names):
+        # keep any source filter of the query (e.g. of a custom search)
+        source = self.query.get('_source', True)
+        if source is False:
+            return  # no source at all
+
+        if source is True:
+            source = {}
+        elif not isinstance(source, dict):
+            source = {'includes': source}  # a field name or a list of field names
+        excludes = source.get('excludes', [])
+        if isinstance(excludes, str):
+            excludes = [excludes]
+        source['excludes'] = sorted(set(excludes) | set(field_names))
+        self.query['_source'] = source
+
+    # ----------------------------------------------------------------------
+    def set_aggregations(self, aggregations, track_total_hits=False):
+        # no documents, only their number and the aggregations
+        self.query['size'] = 0
+        self.query.pop('sort', None)
+        self.query.pop('_source', None)
+        self.query.pop('script_fields', None)
+        if aggregations:
+            self.query['aggs'] = aggregations
+        if track_total_hits:
+            # count exactly instead of up to 10000 documents
+            self.query['track_total_hits'] = True
+
     # ----------------------------------------------------------------------
     def clone(self):
         new_query = deepcopy(self.query)
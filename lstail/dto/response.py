@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+
+########################################################################
+class ResponseStats:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self, size, duration):
+        # size of the response body in bytes
+        self.size = size
+        # duration of the request in seconds
+        self.duration = duration
@@ -14,3 +14,4 @@ class Server:  # pylint: disable=too-few-public-methods
         self.username = None
         self.password = None
         self.headers = None
+        self.group = None
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+
+########################################################################
+class ReaderState:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self, timestamp, documents):
+        self.timestamp = timestamp
+        # (timestamp, document id) of the latest processed documents
+        self.documents = documents
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+
+########################################################################
+class Summary:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self.count = 0
+        # per value of the top field: the number of events
+        self.top_values = {}
+        # number of events with other values than the top values
+        self.top_other_count = 0
+        # per start of the histogram intervals (epoch milliseconds): the number of events
+        self.histogram = {}
@@ -57,3 +57,58 @@ class ElasticSearchIndexNotFoundError(Exception):
 ########################################################################
 class ColumnNotFoundError(Exception):
     pass
+
+
+########################################################################
+class TailServerNotFoundError(Exception):
+    pass
+
+
+########################################################################
+class TailServerAlreadyRunningError(Exception):
+    pass
+
+
+########################################################################
+class TailServerSocketError(Exception):
+    pass
+
+
+########################################################################
+class AsyncSearchNotSupportedError(Exception):
+    pass
+
+
+########################################################################
+class HitCacheError(Exception):
+    pass
+
+
+########################################################################
+class InvalidRecordingError(Exception):
+    pass
+
+
+########################################################################
+class OutputCompressionNotAvailableError(Exception):
+    pass
+
+
+########################################################################
+class DocumentNotPageableError(Exception):
+    pass
+
+
+########################################################################
+class InvalidMatchExpressionError(Exception):
+    pass
+
+
+########################################################################
+class InvalidSummaryFieldError(Exception):
+    pass
+
+
+########################################################################
+class InvalidSampleRateError(Exception):
+    pass
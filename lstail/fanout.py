@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from copy import copy
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from itertools import count
+from traceback import format_exc
+
+from lstail.constants import LSTAIL_DEFAULT_FIELD_CLUSTER
+from lstail.error import StopReaderLoop
+from lstail.reader import LogstashReader
+
+
+# the fan-out reader drives the readers of the server groups step by step
+# pylint: disable=protected-access
+
+
+########################################################################
+class FanOutLogstashReader(LogstashReader):
+    """
+    Tail the same search concurrently on all server groups (e.g. one cluster per region)
+    and merge the events of all groups by their timestamp into one stream.
+
+    Each server group is queried by its own LogstashReader, i.e. with its own connection
+    and cursor. The servers within a group are still used for failover.
+    Events are held back until all groups have been queried up to their timestamp or
+    until they are older than the reorder window, to print them in order even if
+    a group lags behind a little.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._readers = None
+        self._executor = None
+        self._pending_documents = []
+        self._sequence = count()
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._setup_logger()
+        self._setup_readers()
+        self._setup_timezone()
+        self._setup_queries()
+        self._setup_poll_scheduler()
+        self._setup_recorder()
+        self._print_header()
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(self._readers)) as self._executor:
+                self._read_merged()
+        finally:
+            self._logger.flush()
+            self._close_recorder()
+
+    # ----------------------------------------------------------------------
+    def _setup_readers(self):
+        self._readers = {}
+        for group, servers in self._get_server_groups().items():
+            config = copy(self._config)
+            config.servers = servers
+            reader = LogstashReader(config)
+            reader._logger = self._logger  # share the logger to keep the output in order
+            self._readers[group] = reader
+
+    # ----------------------------------------------------------------------
+    def _get_server_groups(self):
+        server_groups = {}
+        for server in self._config.servers:
+            server_groups.setdefault(server.group, deque()).append(server)
+        return server_groups
+
+    # ----------------------------------------------------------------------
+    def _setup_queries(self):
+        for index, reader in enumerate(self._readers.values()):
+            reader._setup_http_handler()
+            reader._setup_initial_time_range()
+            if index == 0:
+                # select the saved search only once, it is used for all server groups
+                reader._prompt_for_kibana_saved_search_selection_if_necessary()
+                self._config.select_kibana_saved_search = False
+            reader._config.select_kibana_saved_search = False
+            reader._setup_query()
+
+    # ----------------------------------------------------------------------
+    def _describe_search(self):
+        # all server groups are queried with the same search
+        first_reader = next(iter(self._readers.values()))
+        return first_reader._describe_search()
+
+    # ----------------------------------------------------------------------
+    def _read_merged(self):
+        while True:
+            try:
+                self._poll_scheduler.start_poll()
+                self._fetch_pages_concurrently()
+                self._print_merged_documents()
+                self._stop_reader_loop_if_necessary()
+                self._update_poll_scheduler()
+                self._wait_for_next_refresh_interval()
+            except StopReaderLoop:
+                self._print_merged_documents(flush=True)
+                return
+            except KeyboardInterrupt:
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                self._log_unexpected_error(exc, format_exc())
+                self._poll_scheduler.record_error()
+                self._wait_for_next_refresh_interval()
+
+    # ----------------------------------------------------------------------
+    def _fetch_pages_concurrently(self):
+        futures = {
+            group: self._executor.submit(self._fetch_page_from_reader, reader)
+            for group, reader in self._readers.items()}
+        wait(futures.values())
+        # the logger defers the records of the worker threads to this thread, log them
+        # before the results of the page
+        self._logger.flush()
+        for group, future in futures.items():
+            error = future.result()
+            if error is not None:
+                exc, traceback = error
+                # a failing group must not block the others
+                self._logger.warning('Querying server group "{}" failed:', group)
+                self._log_unexpected_error(exc, traceback)
+                continue
+
+            self._add_pending_documents(group, self._readers[group])
+
+    # ----------------------------------------------------------------------
+    def _fetch_page_from_reader(self, reader):
+        try:
+            reader._fetch_page()
+        except Exception as exc:  # pylint: disable=broad-except
+            reader._documents = []
+            reader._page_document_count = None
+            return exc, format_exc()
+
+        return None
+
+    # ----------------------------------------------------------------------
+    def _add_pending_documents(self, group, reader):
+        for document in reader._documents:
+            timestamp = reader._get_document_timestamp(document)
+            if timestamp is None:
+                timestamp = datetime.min  # print events without timestamp immediately
+            document['_source'][LSTAIL_DEFAULT_FIELD_CLUSTER] = group
+            # the sequence number keeps the order of events with the same timestamp and
+            # prevents comparing documents
+            heappush(self._pending_documents, (timestamp, next(self._sequence), document))
+
+    # ----------------------------------------------------------------------
+    def _print_merged_documents(self, flush=False):
+        if flush:
+            watermark = datetime.max
+        else:
+            watermark = self._get_watermark()
+
+        documents = []
+        while self._pending_documents and self._pending_documents[0][0] <= watermark:
+            _, _, document = heappop(self._pending_documents)
+            documents.append(document)
+
+        self._print_documents(documents)
+
+    # ----------------------------------------------------------------------
+    def _get_watermark(self):
+        # all groups have been queried up to their latest timestamp, so events up to the
+        # oldest of these timestamps are complete; do not wait longer than the reorder window
+        # for groups without new events
+        complete_until = min(reader._last_timestamp for reader in self._readers.values())
+        reorder_window = timedelta(seconds=self._config.fan_out_reorder_window)
+        return max(complete_until, datetime.now() - reorder_window)
+
+    # ----------------------------------------------------------------------
+    def _update_poll_scheduler(self):
+        # poll again soon if any group returned a full page
+        pages = [
+            (reader._page_document_count, reader._query_size)
+            for reader in self._readers.values()
+            if reader._page_document_count is not None]
+        self._poll_scheduler.update_for_pages(pages)
@@ -20,6 +20,7 @@ import ssl
 import sys
 
 from lstail.constants import HTTP_RETRYING_PAUSE, LOG_ENCODING, NON_RETRYING_STATUS_CODES, VERSION
+from lstail.dto.response import ResponseStats
 from lstail.error import HttpRetryError
 from lstail.util.debug import get_memory_usage
 
@@ -64,7 +65,13 @@ class ElasticsearchRequestController:
         self._url_opener = None
 
     # ----------------------------------------------------------------------
-    def request(self, path, data=None, http_method='GET'):
+    def request(self, path, data=None, http_method='GET', content_type=None):
+        response, _ = self.request_with_stats(path, data, http_method, content_type)
+        return response
+
+    # ----------------------------------------------------------------------
+    def request_with_stats(self, path, data=None, http_method='GET', content_type=None):
+        """Like request() but return the response together with its ResponseStats"""
         self._setup_user_agent_if_necessary()
         self._setup_url_opener_if_necessary()
 
@@ -73,7 +80,11 @@ class ElasticsearchRequestController:
         # go for it
         while True:
             try:
-                result = self._request_inner(path, data, http_method=http_method)
+                result = self._request_inner(
+                    path,
+                    data,
+                    content_type=content_type,
+                    http_method=http_method)
             except HttpRetryError:
                 # wait a moment and advance to the next server in the list
                 sleep(HTTP_RETRYING_PAUSE)
@@ -138,9 +149,8 @@ class ElasticsearchRequestController:
 
         begin_date = datetime.now()
         try:
-            response_raw = self._url_opener.open(request, timeout=self._timeout)
-            response = self._parse_response(response_raw)
-            response_raw.close()
+            response, response_size = self._read_response(
+                self._url_opener.open(request, timeout=self._timeout))
             self._assert_response_not_timed_out(response)
         except URLError as exc:
             # log
@@ -153,17 +163,21 @@ class ElasticsearchRequestController:
             raise HttpRetryError() from exc
         finally:
             call_duration = self._calculate_call_duration(begin_date)
-            http_method = 'POST' if data else http_method
-            memory_usage = f' - {get_memory_usage():0.2f} MB' if self._debug else ''
-            self._logger.debug(
-                'Querying server "{}" took {:0.3f} seconds ({} {}){memory_usage}',
-                server.name,
-                call_duration,
-                http_method,
-                path,
-                memory_usage=memory_usage)
+            self._log_call_duration(server, path, data, http_method, call_duration)
 
-        return response
+        return response, ResponseStats(response_size, call_duration)
+
+    # ----------------------------------------------------------------------
+    def _log_call_duration(self, server, path, data, http_method, call_duration):
+        http_method = 'POST' if data else http_method
+        memory_usage = f' - {get_memory_usage():0.2f} MB' if self._debug else ''
+        self._logger.debug(
+            'Querying server "{}" took {:0.3f} seconds ({} {}){memory_usage}',
+            server.name,
+            call_duration,
+            http_method,
+            path,
+            memory_usage=memory_usage)
 
     # ----------------------------------------------------------------------
     def _factor_url(self, server, path):
@@ -194,8 +208,18 @@ class ElasticsearchRequestController:
             request.add_header(name, value)
 
     # ----------------------------------------------------------------------
-    def _parse_response(self, response_raw, decode_as_json=True):
+    def _read_response(self, response_raw):
         result_encoded = response_raw.read()
+        response = self._decode_response(response_raw, result_encoded)
+        response_raw.close()
+        return response, len(result_encoded) if result_encoded else 0
+
+    # ----------------------------------------------------------------------
+    def _parse_response(self, response_raw, decode_as_json=True):
+        return self._decode_response(response_raw, response_raw.read(), decode_as_json)
+
+    # ----------------------------------------------------------------------
+    def _decode_response(self, response_raw, result_encoded, decode_as_json=True):
         if result_encoded and hasattr(result_encoded, 'decode'):
             encoding = self._get_encoding_from_response(response_raw)
             result = result_encoded.decode(encoding)
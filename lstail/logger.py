@@ -3,46 +3,74 @@
 # This software may be modified and distributed under the terms
 # of the MIT license.  See the LICENSE file for details.
 
-from collections import deque
+from collections import ChainMap
 from datetime import datetime
-from io import StringIO
+from io import TextIOWrapper
+from json import dumps
 from operator import attrgetter
 from socket import getfqdn
 import csv
 import logging
-import sys
-import traceback
 
 from lstail.constants import (
+    LSTAIL_DEFAULT_FIELD_CLUSTER,
     LSTAIL_DEFAULT_FIELD_DOCUMENT_ID,
     LSTAIL_DEFAULT_FIELD_MESSAGE,
+    LSTAIL_DEFAULT_FIELD_SEARCH,
     LSTAIL_DEFAULT_FIELD_TIMESTAMP,
     LSTAIL_FALLBACK_FIELD_VALUE,
     LSTAIL_INTERNAL_DOCUMENT_ID,
+    OUTPUT_FORMAT_JSON,
+    OUTPUT_FORMAT_NDJSON,
     PROGRAM_NAME,
     TERM_COLOR_DEFAULT,
     TERM_COLOR_ERROR,
     TERM_COLOR_RESET,
     TERM_COLOR_WARNING,
     TERM_COLORS,
+    TERM_HIGHLIGHT_END,
+    TERM_HIGHLIGHT_START,
 )
 from lstail.dto.column import Column
-from lstail.error import ColumnNotFoundError, DocumentIdAlreadyProcessedError
+from lstail.dto.page import Page, PageColumn
+from lstail.error import (
+    ColumnNotFoundError,
+    DocumentIdAlreadyProcessedError,
+    DocumentNotPageableError,
+    InvalidTimestampFormatError,
+)
+from lstail.render import RenderPool
+from lstail.sink import FileSink
 from lstail.util.color import detect_terminal_color_support, factor_color_code
+from lstail.util.debug import format_exception
+from lstail.util.dedup import ProcessedDocumentIndex
+from lstail.util.deferred import DeferredLogRecords
+from lstail.util.document import get_document_field, truncate_field_value
 from lstail.util.formatter import AutoFillFormatter
+from lstail.util.highlight import KeywordHighlighter
+from lstail.util.page import (
+    get_csv_page_value,
+    get_page_leaf_value,
+    get_page_value_like_format,
+    has_nested_names,
+    is_page_column_supported,
+    MISSING,
+    PAGE_CONTAINER_TYPES,
+)
 from lstail.util.safe_munch import DefaultSafeMunch, safe_munchify
-from lstail.util.timestamp import parse_timestamp_from_elasticsearch
+from lstail.util.timestamp import get_timestamp_from_sort_value, parse_timestamp_from_elasticsearch
 
 
 ########################################################################
-class LstailLogger:
+class LstailLogger:  # pylint: disable=too-many-instance-attributes
 
     _color_code_reset = factor_color_code(TERM_COLOR_RESET)
 
     # ----------------------------------------------------------------------
-    def __init__(self, config, output, verbose=False):
+    def __init__(self, config, output, verbose=False, use_colors=None):
         self._config = config
         self._verbose = verbose
+        self._force_colors = use_colors
         self._my_hostname = None
         self._processed_ids = None
         self._use_colors = None
@@ -51,6 +79,16 @@ class LstailLogger:
         self._display_columns = None
         self._default_document_values = None
         self._internal_display_columns = None
+        self._json_columns = None
+        self._log_level_color_codes = None
+        self._highlighter = None
+        self._page_columns = None
+        self._page_buffer = bytearray()
+        self._render_pool = None
+        self._time_field_name = None
+        self._timestamp_prefix_second = None
+        self._timestamp_prefix = None
+        self._deferred_records = DeferredLogRecords()
         self._output = output
 
     # ----------------------------------------------------------------------
@@ -59,7 +97,8 @@ class LstailLogger:
             return
         self._setup_hostname()
         self._setup_processed_ids_queue()
-        self._setup_terminal_colors()
+        self._setup_terminal_colors(force=self._force_colors)
+        self._setup_highlighter()
         self._update_internal_display_columns()
         self._factor_default_document_values()
 
@@ -71,7 +110,7 @@ class LstailLogger:
     def _setup_processed_ids_queue(self):
         # Remember the last 100 processed document IDs to check if we are to show already
         # processed ones. If the queue is full, just discard old items.
-        self._processed_ids = deque(maxlen=100)
+        self._processed_ids = ProcessedDocumentIndex(max_size=100)
 
     # ----------------------------------------------------------------------
     def _setup_terminal_colors(self, force=None):
@@ -86,10 +125,20 @@ class LstailLogger:
                 self._term_colors[color_name] = ''
                 self._term_reset_string = ''
 
+    # ----------------------------------------------------------------------
+    def _setup_highlighter(self):
+        if self._use_colors and self._config.highlight_terms:
+            self._highlighter = KeywordHighlighter(
+                self._config.highlight_terms,
+                TERM_HIGHLIGHT_START,
+                TERM_HIGHLIGHT_END)
+
     # ----------------------------------------------------------------------
     def _update_internal_display_columns(self):
         self._internal_display_columns = self._config.kibana.default_columns
         self._add_timestamp_column_if_necessary(self._internal_display_columns)
+        self._add_search_column_if_necessary(self._internal_display_columns)
+        self._add_cluster_column_if_necessary(self._internal_display_columns)
         self._add_document_id_column_if_necessary(self._internal_display_columns)
 
     # ----------------------------------------------------------------------
@@ -98,6 +147,20 @@ class LstailLogger:
             # hard-coded timestamp column as Kibana saved searches don't include it
             columns.insert(0, LSTAIL_DEFAULT_FIELD_TIMESTAMP)
 
+    # ----------------------------------------------------------------------
+    def _add_search_column_if_necessary(self, columns):
+        # add "search" column after the timestamp when following multiple saved searches
+        if self._config.multi_search and LSTAIL_DEFAULT_FIELD_SEARCH not in columns:
+            timestamp_index = columns.index(LSTAIL_DEFAULT_FIELD_TIMESTAMP)
+            columns.insert(timestamp_index + 1, LSTAIL_DEFAULT_FIELD_SEARCH)
+
+    # ----------------------------------------------------------------------
+    def _add_cluster_column_if_necessary(self, columns):
+        # add "cluster" column after the timestamp in fan-out mode
+        if self._config.fan_out and LSTAIL_DEFAULT_FIELD_CLUSTER not in columns:
+            timestamp_index = columns.index(LSTAIL_DEFAULT_FIELD_TIMESTAMP)
+            columns.insert(timestamp_index + 1, LSTAIL_DEFAULT_FIELD_CLUSTER)
+
     # ----------------------------------------------------------------------
     def _add_document_id_column_if_necessary(self, columns):
         # add "document_id" column in debug mode
@@ -141,6 +204,14 @@ class LstailLogger:
             # dive one level deeper
             current_level_values = current_level_values[column_name_element]
 
+    # ----------------------------------------------------------------------
+    def set_time_field_name(self, time_field_name):
+        """Set the time field name the events are sorted by to use their sort values"""
+        if time_field_name != self._time_field_name:
+            self._time_field_name = time_field_name
+            # the workers render with the previous time field name
+            self._shutdown_render_pool()
+
     # ----------------------------------------------------------------------
     def update_display_columns(self, columns=None):
         if columns:
@@ -149,45 +220,39 @@ class LstailLogger:
             self._display_columns = list(self._config.kibana.default_columns)
 
         self._add_timestamp_column_if_necessary(self._display_columns)
+        self._add_search_column_if_necessary(self._display_columns)
+        self._add_cluster_column_if_necessary(self._display_columns)
         self._add_document_id_column_if_necessary(self._display_columns)
         self._factor_default_document_values()
+        self._json_columns = None
+        self._page_columns = None
+        # the workers render with the previous display columns
+        self._shutdown_render_pool()
 
     # ----------------------------------------------------------------------
     def log(self, level, format_, *args, **kwargs):
         if level <= logging.DEBUG and not self._verbose:
             return  # quiet ourselves when not in verbose mode and level is DEBUG
+        if self._deferred_records.defer(level, format_, args, kwargs):
+            return  # the output is not thread-safe, let the owning thread log it
 
         self._init_if_necessary()
+        # keep the order with events still being rendered
+        self.flush()
+        self._log(level, format_, args, kwargs)
 
+    # ----------------------------------------------------------------------
+    def _log(self, level, format_, args, kwargs):
         message = format_.format(*args, **kwargs)
         # handle exception information
         exc_info = kwargs.get('exc_info', None)
         if exc_info is not None:
-            message = f'{message}{self._format_exception(exc_info)}'
+            message = f'{message}{format_exception(exc_info)}'
         # fake Logstash document
         extra = kwargs.get('extra', None)
         document = self._factor_logstash_document(message, level, extra=extra)
         self._print_document(document)
 
-    # ----------------------------------------------------------------------
-    def _format_exception(self, exc_info):
-        if isinstance(exc_info, BaseException):
-            exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
-        elif not isinstance(exc_info, tuple):
-            exc_info = sys.exc_info()
-
-        if exc_info[0] is None:
-            return ''
-
-        # from Python's logging.Formatter.formatException()
-        text = StringIO()
-        traceback.print_exception(exc_info[0], exc_info[1], exc_info[2], None, text)
-        stack_trace = text.getvalue()
-        text.close()
-        if stack_trace[-1:] == "\n":
-            stack_trace = stack_trace[:-1]
-        return stack_trace
-
     # ----------------------------------------------------------------------
     def _factor_logstash_document(self, message, level, extra=None):
         source = {
@@ -200,17 +265,313 @@ class LstailLogger:
         if extra:
             source.update(**extra)
 
-        document = dict(
-            _source=source,
-            internal=True)
-        return document
+        return dict(_source=source, internal=True)
+
+    # ----------------------------------------------------------------------
+    def log_documents(self, documents):
+        self._init_if_necessary()
+        if self._deferred_records:
+            self.flush()  # log the records of other threads first
+
+        if self._use_render_pool(documents):
+            self._setup_render_pool_if_necessary()
+            self._render_pool.render(documents)
+            return
+
+        self.flush()
+        page_columns = self._get_page_columns()
+        if page_columns is None:
+            for document in documents:
+                self.log_document(document)
+            return
+
+        page = self._factor_page(documents, page_columns)
+        if self._config.csv_output:
+            self._print_page_as_csv(page)
+        elif isinstance(self._output, TextIOWrapper):
+            self._print_page_as_bytes(page, page_columns)
+        else:
+            self._print_page_as_text(page, page_columns)
+
+    # ----------------------------------------------------------------------
+    def _get_page_columns(self):
+        # resolved once for all pages
+        if self._page_columns is None:
+            self._page_columns = self._factor_page_columns()
+        return self._page_columns or None
+
+    # ----------------------------------------------------------------------
+    def _factor_page_columns(self):
+        if self._use_json_output():
+            return False  # JSON output has its own fast path per document
+
+        column_names = self._get_display_columns_for_document(None)
+        if self._has_nested_page_column_names(column_names):
+            return False
+
+        page_columns = []
+        for column_name in column_names:
+            column = self._get_column_by_name(column_name)
+            if self._config.csv_output:
+                # CSV output contains hidden columns as well but does not resolve aliases
+                page_column = PageColumn(column_name, [], max_length=column.max_length)
+            elif not column.display:
+                continue
+            else:
+                color = self._term_colors.get(self._get_column_color(column))
+                if color is None:
+                    return False
+                format_spec = f'{column.padding}' if column.padding else ''
+                page_column = PageColumn(
+                    column_name,
+                    list(column.names),
+                    color,
+                    format_spec,
+                    column.max_length)
+
+            if not is_page_column_supported(page_column):
+                return False
+            page_columns.append(page_column)
+
+        return page_columns
+
+    # ----------------------------------------------------------------------
+    def _has_nested_page_column_names(self, column_names):
+        # e.g. "a" and "a.b" overwrite each other's values of missing columns,
+        # including hidden columns and aliases
+        names = []
+        for column_name in column_names:
+            names.append(column_name)
+            names.extend(self._get_column_by_name(column_name).names)
+        return has_nested_names(names)
+
+    # ----------------------------------------------------------------------
+    def _factor_page(self, documents, page_columns):
+        """
+        Extract the values of all documents of the page column by column, documents which
+        cannot be handled this way are marked to be printed on their own
+        """
+        page = Page(documents)
+        # timestamps, document IDs and messages
+        for document in documents:
+            try:
+                values, event_time = self._factor_page_document_values(document)
+            except Exception:  # pylint: disable=broad-except
+                values = event_time = None  # handled by log_document() including errors
+            page.values.append(values)
+            page.event_times.append(event_time)
+
+        if self._config.csv_output:
+            get_page_value = get_csv_page_value
+        else:
+            get_page_value = self._get_text_page_value
+        for page_column in page_columns:
+            column_values = []
+            for index, values in enumerate(page.values):
+                value = None
+                if values is not None:
+                    try:
+                        value = get_page_value(values, page_column)
+                    except (DocumentNotPageableError, TypeError, ValueError):
+                        page.values[index] = None
+                column_values.append(value)
+            page.columns.append(column_values)
+
+        return page
+
+    # ----------------------------------------------------------------------
+    def _factor_page_document_values(self, document):
+        source = document['_source']
+        if document.get('internal', False) or not isinstance(source, dict):
+            raise DocumentNotPageableError()
+
+        event_time = self._get_event_time(document, source)
+        message = self._format_message(document) or source.get(LSTAIL_DEFAULT_FIELD_MESSAGE, None)
+        # like _get_document_values() but without copying the source
+        values = ChainMap(
+            {},  # values of missing columns
+            {
+                LSTAIL_DEFAULT_FIELD_TIMESTAMP: self._format_timestamp(event_time),
+                LSTAIL_DEFAULT_FIELD_DOCUMENT_ID: self._get_document_id_from_document(
+                    source,
+                    document),
+                LSTAIL_DEFAULT_FIELD_MESSAGE: message,
+            },
+            source)
+        if self._is_internal_document(values):
+            raise DocumentNotPageableError()
+
+        return values, event_time
+
+    # ----------------------------------------------------------------------
+    def _get_text_page_value(self, values, page_column):
+        value = self._find_text_page_value(values, page_column)
+        if isinstance(value, PAGE_CONTAINER_TYPES):
+            raise DocumentNotPageableError()
+
+        if page_column.max_length:
+            value = truncate_field_value(value, page_column.max_length)
+        value = format(value, page_column.format_spec)
+        if self._highlighter:
+            value = self._highlighter.highlight(value)
+        return value
+
+    # ----------------------------------------------------------------------
+    def _find_text_page_value(self, values, page_column):
+        # like _update_column_name_from_document(): the column or the first alias found
+        missing_values = values.maps[0]
+        for name, path in page_column.paths:
+            if name in missing_values:
+                return get_page_value_like_format(values, path)
+            value = get_page_leaf_value(values, path)
+            if value is not MISSING:
+                return value
+
+        if self._config.debug:
+            missing_values[page_column.name] = f'<{page_column.name}>'
+        else:
+            missing_values[page_column.name] = ''
+        return get_page_value_like_format(values, page_column.path)
+
+    # ----------------------------------------------------------------------
+    def _print_page_as_text(self, page, page_columns):
+        color_reset = self._term_colors[self._color_code_reset]
+        for index, document in enumerate(page.documents):
+            if not self._prepare_page_document_output(page, index):
+                self.log_document(document)
+                continue
+
+            line = ' '.join(
+                f'{page_column.color}{column_values[index]}{color_reset}'
+                for page_column, column_values in zip(page_columns, page.columns))
+            self._output.write(f'{line}\n{self._term_reset_string}')
+
+    # ----------------------------------------------------------------------
+    def _print_page_as_bytes(self, page, page_columns):
+        """
+        Like _print_page_as_text() but write the lines as bytes to the binary buffer of
+        the output (e.g. sys.stdout.buffer), only the column values need to be encoded
+        """
+        encoding = self._output.encoding
+        errors = self._output.errors
+        fragments = [
+            fragment.encode(encoding, errors)
+            for fragment in self._factor_page_line_fragments(page_columns)]
+        line_end = fragments.pop()
+        buffer = self._page_buffer
+        # write anything already written to the text layer first
+        self._output.flush()
+        for index, document in enumerate(page.documents):
+            if not self._prepare_page_document_output(page, index):
+                self._write_page_buffer()
+                self.log_document(document)
+                self._output.flush()
+                continue
+
+            for fragment, column_values in zip(fragments, page.columns):
+                buffer += fragment
+                buffer += column_values[index].encode(encoding, errors)
+            buffer += line_end
+
+        self._write_page_buffer()
+        if self._output.line_buffering:
+            self._output.buffer.flush()
+
+    # ----------------------------------------------------------------------
+    def _factor_page_line_fragments(self, page_columns):
+        # the static parts of a line: the colors before each value and the line end
+        color_reset = self._term_colors[self._color_code_reset]
+        fragments = []
+        for page_column in page_columns:
+            separator = f'{color_reset} ' if fragments else ''
+            fragments.append(f'{separator}{page_column.color}')
+        line_end_reset = color_reset if fragments else ''
+        fragments.append(f'{line_end_reset}\n{self._term_reset_string}')
+        return fragments
+
+    # ----------------------------------------------------------------------
+    def _write_page_buffer(self):
+        if self._page_buffer:
+            self._output.buffer.write(self._page_buffer)
+            self._page_buffer.clear()
+
+    # ----------------------------------------------------------------------
+    def _print_page_as_csv(self, page):
+        writer = csv.writer(self._output)
+        for index, document in enumerate(page.documents):
+            if not self._prepare_page_document_output(page, index):
+                self.log_document(document)
+                continue
+
+            writer.writerow([column_values[index] for column_values in page.columns])
+
+    # ----------------------------------------------------------------------
+    def _prepare_page_document_output(self, page, index):
+        values = page.values[index]
+        if values is None:
+            return False
+
+        try:
+            # without the values of missing columns like _print_document()
+            self._assert_document_already_processed(values.parents)
+        except (DocumentIdAlreadyProcessedError, TypeError):
+            return False  # reported by log_document()
+
+        if self._rotates_output_by_event_time():
+            self._output.set_event_time(page.event_times[index])
+        return True
+
+    # ----------------------------------------------------------------------
+    def _use_render_pool(self, documents):
+        threshold = self._config.render_pool_threshold
+        if not isinstance(threshold, int) or threshold <= 0 or len(documents) < threshold:
+            return False
+        # keep interactive tailing in the main process
+        if self._output.isatty():
+            return False
+        # rotation by event time requires the events to be written by the main process
+        return not self._rotates_output_by_event_time()
+
+    # ----------------------------------------------------------------------
+    def _rotates_output_by_event_time(self):
+        return isinstance(self._output, FileSink) and self._output.rotates_by_event_time
+
+    # ----------------------------------------------------------------------
+    def _setup_render_pool_if_necessary(self):
+        if self._render_pool is None:
+            self._render_pool = RenderPool(
+                type(self),
+                self._config,
+                self._output,
+                use_colors=self._use_colors,
+                display_columns=self._display_columns,
+                time_field_name=self._time_field_name)
+
+    # ----------------------------------------------------------------------
+    def _shutdown_render_pool(self):
+        if self._render_pool is not None:
+            self._render_pool.shutdown()
+            self._render_pool = None
+
+    # ----------------------------------------------------------------------
+    def flush(self):
+        """Write the events still being rendered and the log records of other threads"""
+        if self._render_pool is not None:
+            self._render_pool.wait()
+        for record in self._deferred_records.pop_all():
+            self._init_if_necessary()
+            self._log(*record)
 
     # ----------------------------------------------------------------------
     def log_document(self, document):
         self._init_if_necessary()
 
         try:
-            self._print_document(document)
+            self._rotate_output_if_necessary(document)
+            if self._use_json_output():
+                self._print_document_as_json(document)
+            else:
+                self._print_document(document)
         except Exception as exc:  # pylint: disable=broad-except
             try:
                 error_message = self._factor_error_message_from_exception(exc, document)
@@ -222,6 +583,70 @@ class LstailLogger:
                 print(message, file=self._output)
                 self._reset_terminal_color()
 
+    # ----------------------------------------------------------------------
+    def _rotate_output_if_necessary(self, document):
+        if not self._rotates_output_by_event_time():
+            return
+
+        try:
+            timestamp = self._get_event_time(document, document['_source'])
+        except (ColumnNotFoundError, InvalidTimestampFormatError, KeyError, TypeError):
+            return  # keep writing to the current file
+        self._output.set_event_time(timestamp)
+
+    # ----------------------------------------------------------------------
+    def _use_json_output(self):
+        return self._config.json_output in (OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_NDJSON)
+
+    # ----------------------------------------------------------------------
+    def _print_document_as_json(self, document):
+        # fast path for machine-readable output: no munching, no formatting
+        document_id = document.get('_id')
+        if document_id is not None:
+            if document_id in self._processed_ids:
+                raise DocumentIdAlreadyProcessedError(document_id, document['_source'])
+            self._processed_ids.add(document_id)
+
+        if self._config.json_output == OUTPUT_FORMAT_NDJSON:
+            values = document['_source']
+        else:
+            values = self._project_document_to_display_columns(document)
+
+        self._output.write(dumps(values, separators=(',', ':'), default=str))
+        self._output.write('\n')
+
+    # ----------------------------------------------------------------------
+    def _project_document_to_display_columns(self, document):
+        source = document['_source']
+        values = {}
+        for column_name, field_names in self._get_json_columns():
+            if column_name == LSTAIL_DEFAULT_FIELD_DOCUMENT_ID:
+                values[column_name] = document.get('_id')
+                continue
+
+            value = None
+            for field_name in field_names:
+                value = get_document_field(source, field_name)
+                if value is not None:
+                    break
+            values[column_name] = value
+
+        return values
+
+    # ----------------------------------------------------------------------
+    def _get_json_columns(self):
+        if self._json_columns is None:
+            # resolve the column names and aliases only once, not for each document
+            self._json_columns = []
+            for column_name in self._get_display_columns_for_document(None):
+                column = self._get_column_by_name(column_name)
+                if not column.display:
+                    continue  # skip hidden columns
+                field_names = [column_name] + [name for name in column.names if name != column_name]
+                self._json_columns.append((column_name, field_names))
+
+        return self._json_columns
+
     # ----------------------------------------------------------------------
     def _factor_error_message_from_exception(self, exc, document):
         exc_type = exc.__class__.__name__
@@ -235,8 +660,7 @@ class LstailLogger:
 
         values = dict(**source)
         # timestamp
-        timestamp = self._get_timestamp_from_document(source)
-        timestamp = self._parse_timestamp(timestamp)
+        timestamp = self._get_event_time(document, source)
         timestamp = self._format_timestamp(timestamp)
         values[LSTAIL_DEFAULT_FIELD_TIMESTAMP] = timestamp
 
@@ -250,6 +674,18 @@ class LstailLogger:
 
         return values
 
+    # ----------------------------------------------------------------------
+    def _get_event_time(self, document, source):
+        timestamp = self._get_timestamp_from_document(source)
+        # the sort value is the time of the displayed timestamp if the queries are sorted
+        # by the same field, then parsing the timestamp is not necessary
+        if self._time_field_name is not None and source.get(self._time_field_name) == timestamp:
+            event_time = get_timestamp_from_sort_value(document)
+            if event_time is not None:
+                return event_time
+
+        return self._parse_timestamp(timestamp)
+
     # ----------------------------------------------------------------------
     def _get_timestamp_from_document(self, document_values):
         timestamp_column = self._config.display.columns[LSTAIL_DEFAULT_FIELD_TIMESTAMP]
@@ -303,13 +739,20 @@ class LstailLogger:
 
     # ----------------------------------------------------------------------
     def _factor_log_level_color_code(self, log_level):
-        log_level_lower = log_level.lower()
-        if log_level_lower in self._config.parser.log_level_names_warning:
-            return factor_color_code(TERM_COLOR_WARNING)
-        elif log_level_lower in self._config.parser.log_level_names_error:
-            return factor_color_code(TERM_COLOR_ERROR)
-        else:
-            return factor_color_code(TERM_COLOR_RESET)
+        if self._log_level_color_codes is None:
+            self._log_level_color_codes = self._factor_log_level_color_codes()
+
+        return self._log_level_color_codes.get(log_level.casefold(), self._color_code_reset)
+
+    # ----------------------------------------------------------------------
+    def _factor_log_level_color_codes(self):
+        # case-folded log level names mapped to their color, warning wins if in both lists
+        color_codes = {}
+        for log_level in self._config.parser.log_level_names_warning:
+            color_codes[log_level.casefold()] = factor_color_code(TERM_COLOR_WARNING)
+        for log_level in self._config.parser.log_level_names_error:
+            color_codes.setdefault(log_level.casefold(), factor_color_code(TERM_COLOR_ERROR))
+        return color_codes
 
     # ----------------------------------------------------------------------
     def _parse_timestamp(self, timestamp):
@@ -320,7 +763,17 @@ class LstailLogger:
 
     # ----------------------------------------------------------------------
     def _format_timestamp(self, timestamp):
-        return timestamp.strftime(self._config.format.timestamp)[:-3]
+        timestamp_format = self._config.format.timestamp
+        if not timestamp_format.endswith('%f'):
+            return timestamp.strftime(timestamp_format)[:-3]
+
+        # events are mostly sorted, so format the part up to the seconds once per second
+        second = timestamp.replace(microsecond=0)
+        if second != self._timestamp_prefix_second:
+            self._timestamp_prefix_second = second
+            self._timestamp_prefix = second.strftime(timestamp_format[:-2])
+        # cut the microseconds to milliseconds
+        return f'{self._timestamp_prefix}{timestamp.microsecond // 1000:03d}'
 
     # ----------------------------------------------------------------------
     def _reset_terminal_color(self):
@@ -356,7 +809,7 @@ class LstailLogger:
             if document_id in self._processed_ids:
                 raise DocumentIdAlreadyProcessedError(document_id, document_values)
 
-        self._processed_ids.append(document_id)
+        self._processed_ids.add(document_id)
 
     # ----------------------------------------------------------------------
     def _is_internal_document(self, document_values):
@@ -370,6 +823,9 @@ class LstailLogger:
         for column in columns:
             get_value_from_document = attrgetter(column)
             values[column] = get_value_from_document(document_values)
+            max_length = self._get_column_by_name(column).max_length
+            if max_length:
+                values[column] = truncate_field_value(values[column], max_length)
 
         writer = csv.DictWriter(self._output, fieldnames=columns, extrasaction='ignore')
         writer.writerow(values)
@@ -379,11 +835,17 @@ class LstailLogger:
         # add color codes to document values
         document_values.sm_dict_update(self._term_colors)
         # factor column specs and build message format string
-        column_specs = self._prepare_column_specs(document, document_values, force_color)
+        column_specs, max_lengths = self._prepare_column_specs(
+            document,
+            document_values,
+            force_color)
 
         # format message
         message_format = ' '.join(column_specs)
-        formatted_message = self._auto_fill_format_message(message_format, document_values)
+        formatted_message = self._auto_fill_format_message(
+            message_format,
+            document_values,
+            max_lengths)
         # finally print the message
         print(formatted_message, file=self._output)
         self._reset_terminal_color()
@@ -391,6 +853,8 @@ class LstailLogger:
     # ----------------------------------------------------------------------
     def _prepare_column_specs(self, document, document_values, force_color):
         message_format_parts = []
+        # maximum lengths by the column names found in the document
+        max_lengths = {}
         display_columns = self._get_display_columns_for_document(document)
 
         for column_name in display_columns:
@@ -408,8 +872,10 @@ class LstailLogger:
 
             column_spec = self._factor_column_spec(column_name, column_color, column_padding)
             message_format_parts.append(column_spec)
+            if column.max_length:
+                max_lengths[column_name] = column.max_length
 
-        return message_format_parts
+        return message_format_parts, max_lengths
 
     # ----------------------------------------------------------------------
     def _get_display_columns_for_document(self, document):
@@ -485,8 +951,11 @@ class LstailLogger:
         return f'{{{color_code}}}{{{column_name}:{column_padding}}}{{{self._color_code_reset}}}'
 
     # ----------------------------------------------------------------------
-    def _auto_fill_format_message(self, message_format, document_values):
-        formatter = AutoFillFormatter(autofill=LSTAIL_FALLBACK_FIELD_VALUE)
+    def _auto_fill_format_message(self, message_format, document_values, max_lengths=None):
+        formatter = AutoFillFormatter(
+            autofill=LSTAIL_FALLBACK_FIELD_VALUE,
+            max_lengths=max_lengths,
+            highlighter=self._highlighter)
         formatted_message = formatter.vformat(
             format_string=message_format,
             args=(),
@@ -495,7 +964,7 @@ class LstailLogger:
 
     # ----------------------------------------------------------------------
     def print_header(self):
-        if self._config.no_header:
+        if self._config.no_header or self._use_json_output():
             return
 
         self._init_if_necessary()
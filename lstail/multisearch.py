@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from copy import copy
+from datetime import datetime
+from heapq import merge
+from json import dumps
+from traceback import format_exc
+from urllib.error import HTTPError
+
+from lstail.constants import LSTAIL_DEFAULT_FIELD_SEARCH
+from lstail.dto.response import ResponseStats
+from lstail.error import StopReaderLoop
+from lstail.query.factory import QueryBuilderFactory
+from lstail.reader import LogstashReader
+
+
+# the multi search reader drives the readers of the saved searches step by step
+# pylint: disable=protected-access
+
+
+########################################################################
+class MultiSearchLogstashReader(LogstashReader):
+    """
+    Follow multiple Kibana saved searches at once. The saved searches are resolved once
+    and then all of them are queried with a single "_msearch" request per poll.
+    The events of all saved searches are merged by their timestamp and printed with
+    the columns of the first saved search.
+
+    Each saved search is handled by its own LogstashReader, sharing the connection.
+    The hit cache and async search are not used, as they cannot be combined with "_msearch".
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._readers = None
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._setup_logger()
+        self._setup_http_handler()
+        self._setup_timezone()
+        self._setup_readers()
+        self._setup_display_columns()
+        self._setup_poll_scheduler()
+        self._setup_recorder()
+        self._print_header()
+
+        try:
+            self._read_multi_search()
+        finally:
+            self._logger.flush()
+            self._close_recorder()
+
+    # ----------------------------------------------------------------------
+    def _setup_readers(self):
+        self._warn_about_ignored_options()
+        # detect the Elasticsearch version only once for all saved searches
+        query_builder_factory = QueryBuilderFactory(self._http_handler, self._logger)
+        self._readers = {}
+        for saved_search in self._config.kibana.saved_searches:
+            config = copy(self._config)
+            config.kibana = copy(self._config.kibana)
+            config.kibana.saved_search = saved_search
+            config.async_search = False
+            config.no_cache = True
+            reader = LogstashReader(config)
+            reader._logger = self._logger
+            reader._http_handler = self._http_handler
+            reader._query_builder_factory = query_builder_factory
+            reader._setup_initial_time_range()
+            reader._setup_query()
+            reader._setup_backpressure()
+            self._readers[saved_search] = reader
+
+    # ----------------------------------------------------------------------
+    def _warn_about_ignored_options(self):
+        if self._config.async_search:
+            self._logger.warning('Async search is not supported with several saved searches')
+        if self._config.hit_cache_dir and not self._config.no_cache:
+            self._logger.warning('The hit cache is not used with several saved searches')
+
+    # ----------------------------------------------------------------------
+    def _setup_display_columns(self):
+        # each saved search sets its columns when it is resolved, use the first one's
+        first_reader = next(iter(self._readers.values()))
+        self._logger.update_display_columns(first_reader._query_builder.display_columns)
+
+    # ----------------------------------------------------------------------
+    def _describe_search(self):
+        # the events are printed with the columns of the first saved search
+        first_reader = next(iter(self._readers.values()))
+        return first_reader._describe_search()
+
+    # ----------------------------------------------------------------------
+    def _read_multi_search(self):
+        while True:
+            try:
+                self._poll_scheduler.start_poll()
+                self._fetch_multi_search_pages()
+                self._print_documents(self._merge_documents())
+                self._log_backpressure_notices()
+                self._stop_reader_loop_if_necessary()
+                self._update_poll_scheduler()
+                self._wait_for_next_refresh_interval()
+            except (StopReaderLoop, KeyboardInterrupt):
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                self._log_unexpected_error(exc, format_exc())
+                self._poll_scheduler.record_error()
+                self._wait_for_next_refresh_interval()
+
+    # ----------------------------------------------------------------------
+    def _fetch_multi_search_pages(self):
+        request_body = self._factor_multi_search_request_body()
+        try:
+            response, stats = self._http_handler.request_with_stats(
+                '_msearch',
+                request_body,
+                content_type='application/x-ndjson')
+        except HTTPError:
+            for reader in self._readers.values():
+                reader._index_resolver.invalidate()
+            raise
+
+        search_responses = response['responses']
+        search_stats = self._split_response_stats(stats, search_responses)
+        for (saved_search, reader), search_response, search_stat in zip(
+                self._readers.items(), search_responses, search_stats):
+            self._process_multi_search_response(
+                saved_search,
+                reader,
+                search_response,
+                search_stat)
+
+    # ----------------------------------------------------------------------
+    def _split_response_stats(self, stats, search_responses):
+        # the response of all searches is received at once, so attribute its size and
+        # duration to the searches by their share of the returned documents
+        document_counts = [
+            len(search_response.get('hits', {}).get('hits', []))
+            for search_response in search_responses]
+        total_document_count = sum(document_counts)
+        if not total_document_count:
+            return [None] * len(search_responses)
+
+        return [
+            ResponseStats(
+                stats.size * document_count / total_document_count,
+                stats.duration * document_count / total_document_count)
+            for document_count in document_counts]
+
+    # ----------------------------------------------------------------------
+    def _factor_multi_search_request_body(self):
+        lines = []
+        for reader in self._readers.values():
+            header = {'index': reader._get_search_index()}
+            if reader._index_resolver.narrowed:
+                # resolved indices might vanish (e.g. by ILM) before the next resolution
+                header['ignore_unavailable'] = True
+            query = reader._factor_search_query()
+            lines.append(dumps(header))
+            lines.append(dumps(query.query))
+
+        # the request body must be terminated by a newline
+        return '\n'.join(lines) + '\n'
+
+    # ----------------------------------------------------------------------
+    def _process_multi_search_response(self, saved_search, reader, search_response, stats):
+        if 'error' in search_response:
+            # a failing saved search must not block the others
+            self._logger.error(
+                'Querying saved search "{}" failed: {}',
+                saved_search,
+                search_response['error'])
+            reader._documents = []
+            reader._page_document_count = None
+            reader._backpressure_notice = None
+            reader._index_resolver.invalidate()
+            return
+
+        reader._process_search_response(search_response, stats)
+        reader._process_fetched_documents()
+        for document in reader._documents:
+            document['_source'][LSTAIL_DEFAULT_FIELD_SEARCH] = saved_search
+
+    # ----------------------------------------------------------------------
+    def _merge_documents(self):
+        pages = [self._factor_sortable_page(reader) for reader in self._readers.values()]
+        # the pages are sorted by timestamp already, so merge them in order
+        return [document for _, document in merge(*pages, key=lambda item: item[0])]
+
+    # ----------------------------------------------------------------------
+    def _factor_sortable_page(self, reader):
+        page = []
+        for document in reader._documents:
+            timestamp = reader._get_document_timestamp(document)
+            if timestamp is None:
+                timestamp = datetime.min  # print events without timestamp first
+            page.append((timestamp, document))
+        return page
+
+    # ----------------------------------------------------------------------
+    def _log_backpressure_notices(self):
+        for saved_search, reader in self._readers.items():
+            if reader._backpressure_notice is not None:
+                self._logger.warning('{}: {}', saved_search, reader._backpressure_notice)
+
+    # ----------------------------------------------------------------------
+    def _update_poll_scheduler(self):
+        # poll again soon if any saved search returned a full page
+        pages = [
+            (reader._page_document_count, reader._query_size)
+            for reader in self._readers.values()
+            if reader._page_document_count is not None]
+        self._poll_scheduler.update_for_pages(pages)
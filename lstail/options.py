@@ -5,6 +5,13 @@
 
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
 
+from lstail.constants import (
+    BACKPRESSURE_POLICIES,
+    LOG_LEVELS,
+    OUTPUT_FORMAT_JSON,
+    OUTPUT_FORMAT_NDJSON,
+)
+
 
 ########################################################################
 class LstailArgumentParser:
@@ -15,6 +22,7 @@ class LstailArgumentParser:
         self._argument_parser = None
         self._initial_query_exclusive_group = None
         self._actions_exclusive_group = None
+        self._output_exclusive_group = None
         self._arguments = None
 
     # ----------------------------------------------------------------------
@@ -31,9 +39,13 @@ class LstailArgumentParser:
         # but not both at once
         self._initial_query_exclusive_group = self._argument_parser.add_mutually_exclusive_group()
 
-        # mutually exclusive group for actions: --version and --list-saved-searches
+        # mutually exclusive group for actions: --version, --list-saved-searches, --serve,
+        # --attach and --replay
         self._actions_exclusive_group = self._argument_parser.add_mutually_exclusive_group()
 
+        # mutually exclusive group for output formats: --csv, --json and --ndjson
+        self._output_exclusive_group = self._argument_parser.add_mutually_exclusive_group()
+
     # ----------------------------------------------------------------------
     def _setup_arguments(self):
         self._actions_exclusive_group.add_argument(
@@ -83,6 +95,32 @@ class LstailArgumentParser:
             help='List all saved searches from Kibana',
             default=False)
 
+        self._actions_exclusive_group.add_argument(
+            '--serve',
+            dest='serve',
+            action='store_true',
+            help='Fetch events once and publish them to clients started with --attach',
+            default=False)
+
+        self._actions_exclusive_group.add_argument(
+            '--attach',
+            dest='attach',
+            action='store_true',
+            help='Print events published by a server started with --serve for the same search',
+            default=False)
+
+        self._actions_exclusive_group.add_argument(
+            '--replay',
+            dest='replay_file',
+            metavar='FILE',
+            help='Print the events recorded with --record to FILE instead of querying')
+
+        self._argument_parser.add_argument(
+            '--socket',
+            dest='socket_path',
+            metavar='PATH',
+            help='Unix socket path for --serve and --attach, derived from the search if not set')
+
         self._argument_parser.add_argument(
             '-H',
             '--no-header',
@@ -92,12 +130,108 @@ class LstailArgumentParser:
             default=False)
 
         self._argument_parser.add_argument(
+            '--fan-out',
+            dest='fan_out',
+            action='store_true',
+            help='Query all server groups concurrently and merge their events',
+            default=False)
+
+        self._argument_parser.add_argument(
+            '--async-search',
+            dest='async_search',
+            action='store_true',
+            help='Run the initial query as async search (Elasticsearch 7.7+), '
+                 'e.g. for large time ranges',
+            default=False)
+
+        self._argument_parser.add_argument(
+            '--state-file',
+            dest='state_file',
+            metavar='FILE',
+            help='Store the reader position in FILE and resume from it on the next start')
+
+        self._argument_parser.add_argument(
+            '--no-cache',
+            dest='no_cache',
+            action='store_true',
+            help='Do not use the hit cache (if "hit_cache_dir" is configured)',
+            default=False)
+
+        self._argument_parser.add_argument(
+            '--record',
+            dest='record_file',
+            metavar='FILE',
+            help='Record the printed events to FILE (gzip compressed) to replay them later')
+
+        self._argument_parser.add_argument(
+            '--replay-pacing',
+            dest='replay_pacing',
+            action='store_true',
+            help='Replay events with the time between them instead of as fast as possible',
+            default=False)
+
+        self._argument_parser.add_argument(
+            '-o',
+            '--output',
+            dest='output_file',
+            metavar='FILE',
+            help='Write the events to FILE instead of stdout, compressed by suffix (.gz/.zst/.lz4)')
+
+        self._argument_parser.add_argument(
+            '--rotate-size',
+            dest='output_rotate_size',
+            metavar='MB',
+            type=int,
+            help='Start a new --output file after MB megabytes (uncompressed)')
+
+        self._argument_parser.add_argument(
+            '--rotate-interval',
+            dest='output_rotate_interval',
+            metavar='RANGE',
+            help='Start a new --output file per RANGE minutes(m)/hours(h)/days(d) of event time')
+
+        self._output_exclusive_group.add_argument(
             '--csv',
             dest='csv_output',
             action='store_true',
             help='Use CSV (comma separated) output',
             default=False)
 
+        self._output_exclusive_group.add_argument(
+            '--json',
+            dest='json_output',
+            action='store_const',
+            const=OUTPUT_FORMAT_JSON,
+            help='Output the display columns of each event as JSON, one event per line')
+
+        self._output_exclusive_group.add_argument(
+            '--ndjson',
+            dest='json_output',
+            action='store_const',
+            const=OUTPUT_FORMAT_NDJSON,
+            help='Output the complete source of each event as JSON, one event per line')
+
+        self._argument_parser.add_argument(
+            '--histogram',
+            dest='summary_histogram_interval',
+            metavar='INTERVAL',
+            help='Output the number of events per INTERVAL seconds or minutes(m)/hours(h)/days(d) '
+                 'as counted by Elasticsearch instead of the events')
+
+        self._argument_parser.add_argument(
+            '--top',
+            dest='summary_top',
+            metavar='FIELD[:N]',
+            help='Output the N (default: 10) most frequent values of FIELD as counted by '
+                 'Elasticsearch instead of the events')
+
+        self._argument_parser.add_argument(
+            '--count',
+            dest='summary_count',
+            action='store_true',
+            help='Output the number of events as counted by Elasticsearch instead of the events',
+            default=False)
+
         self._initial_query_exclusive_group.add_argument(
             '-n',
             '--lines',
@@ -106,6 +240,47 @@ class LstailArgumentParser:
             type=int,
             help='Output the last NUM lines, instead of the last 10')
 
+        self._argument_parser.add_argument(
+            '--min-level',
+            dest='min_level',
+            metavar='LEVEL',
+            choices=LOG_LEVELS,
+            help='Query only events of LEVEL (warning or error) or higher, '
+                 'by the names of the "log_level" column')
+
+        self._argument_parser.add_argument(
+            '--match',
+            dest='match_expressions',
+            metavar='FIELD~REGEX',
+            action='append',
+            help='Output only events whose field FIELD matches the regular expression REGEX, '
+                 'literals and prefixes (^literal) on keyword fields are searched by '
+                 'Elasticsearch as well, can be specified multiple times (all must match)')
+
+        self._argument_parser.add_argument(
+            '--sample',
+            dest='sample_rate',
+            metavar='RATE',
+            help='Output only a random sample of RATE (e.g. 0.01 or 1%%) of the events, '
+                 'selected by Elasticsearch 6 or newer')
+
+        self._argument_parser.add_argument(
+            '--backpressure',
+            dest='backpressure',
+            metavar='POLICY',
+            choices=BACKPRESSURE_POLICIES,
+            help='If the output lags behind in follow mode: wait for it (block), skip to the '
+                 'latest events (skip) or print a sample of the events (sample), instead of '
+                 'the "backpressure" setting')
+
+        self._argument_parser.add_argument(
+            '--highlight',
+            dest='highlight_terms',
+            metavar='TERM',
+            action='append',
+            help='Highlight TERM in the displayed columns (instead of the "highlight_terms" '
+                 'setting), can be specified multiple times')
+
         self._argument_parser.add_argument(
             '-q',
             '--query',
@@ -126,7 +301,9 @@ class LstailArgumentParser:
             '--saved-search',
             dest='kibana_saved_search',
             metavar='NAME',
-            help='Saved search title as stored in Kibana ("-" to select from a list)')
+            action='append',
+            help='Saved search title as stored in Kibana ("-" to select from a list), '
+                 'can be specified multiple times to follow multiple saved searches at once')
 
         self._argument_parser.add_argument(
             '--select-saved-search',
@@ -138,3 +315,11 @@ class LstailArgumentParser:
     # ----------------------------------------------------------------------
     def _parse_arguments(self):
         self._arguments = self._argument_parser.parse_args(self._argv)
+        self._split_saved_searches()
+
+    # ----------------------------------------------------------------------
+    def _split_saved_searches(self):
+        # keep the first saved search as "kibana_saved_search" as the main saved search
+        saved_searches = self._arguments.kibana_saved_search or []
+        self._arguments.kibana_saved_searches = saved_searches
+        self._arguments.kibana_saved_search = saved_searches[0] if saved_searches else None
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from time import sleep
+from urllib.error import HTTPError
+
+from lstail.constants import (
+    ASYNC_SEARCH_KEEP_ALIVE,
+    ASYNC_SEARCH_POLL_INTERVAL,
+    ASYNC_SEARCH_WAIT_FOR_COMPLETION_TIMEOUT,
+)
+from lstail.dto.response import ResponseStats
+from lstail.error import AsyncSearchNotSupportedError
+
+
+########################################################################
+class AsyncSearch:
+    """
+    Run a search with the async search API (Elasticsearch 7.7+): the search is submitted
+    once and runs on the server while its progress is polled with short requests.
+    A request timing out on the client side is retried by just polling again instead of
+    running the expensive search again. The search is deleted on the server when done.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, http_handler, logger, timeout):
+        self._http_handler = http_handler
+        self._logger = logger
+        self._wait_for_completion_timeout = min(
+            ASYNC_SEARCH_WAIT_FOR_COMPLETION_TIMEOUT,
+            timeout / 2)
+        self._search_id = None
+
+    # ----------------------------------------------------------------------
+    def search(self, index, query_json, ignore_unavailable=False):
+        """Return the search response together with its ResponseStats"""
+        response, stats = self._submit(index, query_json, ignore_unavailable)
+        duration = stats.duration
+        self._search_id = response.get('id')
+        try:
+            while response.get('is_running'):
+                self._log_progress(response)
+                sleep(ASYNC_SEARCH_POLL_INTERVAL)
+                response, stats = self._poll()
+                duration += stats.duration
+        finally:
+            self._delete()
+
+        # the search ran while submitting and polling, the last response contains the results
+        return response['response'], ResponseStats(stats.size, duration)
+
+    # ----------------------------------------------------------------------
+    def _submit(self, index, query_json, ignore_unavailable):
+        path = \
+            f'{index}/_async_search' \
+            f'?wait_for_completion_timeout={self._wait_for_completion_timeout:.0f}s' \
+            f'&keep_on_completion=true&keep_alive={ASYNC_SEARCH_KEEP_ALIVE}'
+        if ignore_unavailable:
+            path = f'{path}&ignore_unavailable=true'
+        try:
+            return self._http_handler.request_with_stats(path, query_json)
+        except HTTPError as exc:
+            if exc.code in (400, 404, 405):
+                # unknown endpoint (Elasticsearch < 7.7) or a bad query which will
+                # fail again as regular search with a better error message
+                raise AsyncSearchNotSupportedError(str(exc)) from exc
+            raise
+
+    # ----------------------------------------------------------------------
+    def _poll(self):
+        path = \
+            f'_async_search/{self._search_id}' \
+            f'?wait_for_completion_timeout={self._wait_for_completion_timeout:.0f}s'
+        return self._http_handler.request_with_stats(path)
+
+    # ----------------------------------------------------------------------
+    def _log_progress(self, response):
+        search_response = response.get('response', {})
+        shards = search_response.get('_shards', {})
+        shards_done = shards.get('successful', 0) + shards.get('skipped', 0)
+        self._logger.info(
+            'Async search running: {} of {} shards done',
+            shards_done,
+            shards.get('total', '?'))
+
+    # ----------------------------------------------------------------------
+    def _delete(self):
+        if self._search_id is None:
+            return  # nothing was stored on the server
+
+        try:
+            self._http_handler.request(f'_async_search/{self._search_id}', http_method='DELETE')
+        except HTTPError as exc:
+            # the search expires after the keep alive time anyway
+            self._logger.debug('Unable to delete async search "{}": {}', self._search_id, exc)
+        self._search_id = None
@@ -11,6 +11,8 @@ from lstail.constants import (
     ELASTICSEARCH_DEFAULT_FIELD_TIMESTAMP,
     FILTER_GROUP_MUST,
     FILTER_GROUP_MUST_NOT,
+    SAMPLE_RANDOM_SCORE_FIELD,
+    SAMPLE_RANDOM_SCORE_SEED,
 )
 from lstail.error import ElasticSearchIndexNotFoundError, UnsupportedFilterTypeError
 from lstail.util.http import is_error_http_not_found
@@ -22,6 +24,11 @@ class BaseQueryBuilder:
     __metaclass__ = ABCMeta
 
     _index_time_field_name = '@timestamp'
+    supports_async_search = False
+    supports_painless_scripts = False
+    supports_random_score = False
+    _date_histogram_interval_name = 'interval'
+    _track_total_hits = False
 
     # ----------------------------------------------------------------------
     def __init__(
@@ -45,6 +52,7 @@ class BaseQueryBuilder:
         self._index = None
         self._filters = None
         self._filter = None
+        self._additional_filters = []
         self._query = None
 
     # ----------------------------------------------------------------------
@@ -52,6 +60,14 @@ class BaseQueryBuilder:
     def build(self):
         pass
 
+    # ----------------------------------------------------------------------
+    @property
+    def display_columns(self):
+        if self._kibana_search is None:
+            return None  # no saved search used
+
+        return self._kibana_search['columns']
+
     # ----------------------------------------------------------------------
     def _kibana_search_requested(self):
         if not self._kibana_index_name or not self._saved_search_title:
@@ -143,6 +159,39 @@ class BaseQueryBuilder:
 
         self._filters[filter_group].append(filter_query)
 
+    # ----------------------------------------------------------------------
+    def add_filter(self, filter_query, negate=False):
+        """Add a filter to the query to be built, in addition to the filters of a saved search"""
+        filter_group = FILTER_GROUP_MUST_NOT if negate else FILTER_GROUP_MUST
+        self._additional_filters.append((filter_group, filter_query))
+
+    # ----------------------------------------------------------------------
+    def factor_sample_filter(self, rate):
+        """
+        Factor a filter for a random sample of `rate` of the documents: the random scores
+        are uniformly distributed in [0, 1), so `rate` of them reach 1 - `rate`
+        """
+        return {
+            'function_score': {
+                'query': {'match_all': {}},
+                'random_score': {
+                    'seed': SAMPLE_RANDOM_SCORE_SEED,
+                    'field': SAMPLE_RANDOM_SCORE_FIELD,
+                },
+                'boost_mode': 'replace',
+                'min_score': 1 - rate,
+            }
+        }
+
+    # ----------------------------------------------------------------------
+    def _get_filters(self):
+        if self._filters:
+            for filter_group in (FILTER_GROUP_MUST, FILTER_GROUP_MUST_NOT):
+                for filter_query in self._filters[filter_group]:
+                    yield filter_group, filter_query
+
+        yield from self._additional_filters
+
     # ----------------------------------------------------------------------
     @abstractmethod
     def _factor_filter_query_by_type(self):
@@ -181,15 +230,23 @@ class BaseQueryBuilder:
 
     # ----------------------------------------------------------------------
     @abstractmethod
-    def build_query_for_time_range(self, query, timestamp_from):
+    def build_query_for_time_range(
+            self, query, timestamp_from, timestamp_to=None, *, include_from=False):
         pass
 
     # ----------------------------------------------------------------------
-    def _build_query_for_time_range(self, query, must_filters, timestamp_from):
-        time_range__filter = {self._index_time_field_name: {'gt': timestamp_from}}
+    def _build_query_for_time_range(
+            self, query, must_filters, timestamp_from, timestamp_to, *, include_from=False):
+        # the query's time field might differ from the index' time field, e.g. if the
+        # ingest time is used instead of the event time
+        time_field_name = query.time_field_name
+        operator_from = 'gte' if include_from else 'gt'
+        time_range__filter = {time_field_name: {operator_from: timestamp_from}}
+        if timestamp_to is not None:
+            time_range__filter[time_field_name]['lte'] = timestamp_to
         for must_filter in must_filters:
             if 'range' in must_filter:
-                if self._index_time_field_name in must_filter['range']:
+                if time_field_name in must_filter['range']:
                     must_filter['range'] = time_range__filter
                     break
         else:
@@ -197,6 +254,27 @@ class BaseQueryBuilder:
 
         return query
 
+    # ----------------------------------------------------------------------
+    def build_summary_query(self, query, aggregations):
+        """Turn `query` into a query for the number of documents and `aggregations` only"""
+        query.set_aggregations(aggregations, track_total_hits=self._track_total_hits)
+        return query
+
+    # ----------------------------------------------------------------------
+    def factor_date_histogram_aggregation(self, time_field_name, interval, bounds):
+        """
+        Count the documents per `interval` seconds, including empty intervals within
+        `bounds` (epoch milliseconds)
+        """
+        return {
+            'date_histogram': {
+                'field': time_field_name,
+                self._date_histogram_interval_name: f'{interval}s',
+                'min_doc_count': 0,
+                'extended_bounds': {'min': bounds[0], 'max': bounds[1]},
+            }
+        }
+
     # ----------------------------------------------------------------------
     def _replace_timestamp_field_name_in_query(self, query):
         if self._index_time_field_name:
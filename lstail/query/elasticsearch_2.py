@@ -6,12 +6,7 @@
 from copy import deepcopy
 from json import dumps
 
-from lstail.constants import (
-    BASE_QUERY_ES2,
-    FILTER_GROUP_MUST,
-    FILTER_GROUP_MUST_NOT,
-    KIBANA4_SEARCH_QUERY,
-)
+from lstail.constants import BASE_QUERY_ES2, KIBANA4_SEARCH_QUERY
 from lstail.dto.query import Query
 from lstail.error import KibanaSavedSearchNotFoundError
 from lstail.query.base import BaseQueryBuilder
@@ -87,10 +82,8 @@ class ElasticSearch2QueryBuilder(BaseQueryBuilder):
         if self._base_query:
             query['query']['filtered']['query'] = self._base_query
 
-        if self._filters:
-            for filter_group in (FILTER_GROUP_MUST, FILTER_GROUP_MUST_NOT):
-                for filter_query in self._filters[filter_group]:
-                    query['query']['filtered']['filter']['bool'][filter_group].append(filter_query)
+        for filter_group, filter_query in self._get_filters():
+            query['query']['filtered']['filter']['bool'][filter_group].append(filter_query)
 
         self._replace_timestamp_field_name_in_query(query)
 
@@ -100,7 +93,13 @@ class ElasticSearch2QueryBuilder(BaseQueryBuilder):
             time_field_name=self._index_time_field_name)
 
     # ----------------------------------------------------------------------
-    def build_query_for_time_range(self, query, timestamp_from):
+    def build_query_for_time_range(
+            self, query, timestamp_from, timestamp_to=None, *, include_from=False):
         new_query = query.clone()
         must_filters = new_query.query['query']['filtered']['filter']['bool']['must']
-        return self._build_query_for_time_range(new_query, must_filters, timestamp_from)
+        return self._build_query_for_time_range(
+            new_query,
+            must_filters,
+            timestamp_from,
+            timestamp_to,
+            include_from=include_from)
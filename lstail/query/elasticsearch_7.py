@@ -8,8 +8,6 @@ from json import dumps
 
 from lstail.constants import (
     BASE_QUERY_ES6,
-    FILTER_GROUP_MUST,
-    FILTER_GROUP_MUST_NOT,
     KIBANA6_INDEX_PATTERN_SEARCH_QUERY,
     KIBANA6_SEARCH_QUERY,
 )
@@ -21,6 +19,13 @@ from lstail.query.base import BaseQueryBuilder
 ########################################################################
 class ElasticSearch7QueryBuilder(BaseQueryBuilder):
 
+    # available since Elasticsearch 7.7, older versions fall back to a regular search
+    supports_async_search = True
+    supports_painless_scripts = True
+    supports_random_score = True
+    _date_histogram_interval_name = 'fixed_interval'
+    _track_total_hits = True
+
     # ----------------------------------------------------------------------
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -207,10 +212,8 @@ class ElasticSearch7QueryBuilder(BaseQueryBuilder):
         if self._base_query:
             query['query']['bool']['must'].append(self._base_query)
 
-        if self._filters:
-            for filter_group in (FILTER_GROUP_MUST, FILTER_GROUP_MUST_NOT):
-                for filter_query in self._filters[filter_group]:
-                    query['query']['bool'][filter_group].append(filter_query)
+        for filter_group, filter_query in self._get_filters():
+            query['query']['bool'][filter_group].append(filter_query)
 
         self._replace_timestamp_field_name_in_query(query)
 
@@ -220,7 +223,13 @@ class ElasticSearch7QueryBuilder(BaseQueryBuilder):
             time_field_name=self._index_time_field_name)
 
     # ----------------------------------------------------------------------
-    def build_query_for_time_range(self, query, timestamp_from):
+    def build_query_for_time_range(
+            self, query, timestamp_from, timestamp_to=None, *, include_from=False):
         new_query = query.clone()
         must_filters = new_query.query['query']['bool']['must']
-        return self._build_query_for_time_range(new_query, must_filters, timestamp_from)
+        return self._build_query_for_time_range(
+            new_query,
+            must_filters,
+            timestamp_from,
+            timestamp_to,
+            include_from=include_from)
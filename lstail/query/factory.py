@@ -29,6 +29,9 @@ class QueryBuilderFactory:
 
     # ----------------------------------------------------------------------
     def _detect_elasticsearch_version(self):
+        if self._elasticsearch_version is not None:
+            return  # detect only once, e.g. when building queries for multiple saved searches
+
         self._elasticsearch_version = detect_elasticsearch_version(self._http_handler, self._logger)
 
     # ----------------------------------------------------------------------
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime, timedelta
+from time import monotonic
+from urllib.error import HTTPError
+import re
+
+from lstail.constants import (
+    INDEX_NARROWING_MAX_INDICES,
+    INDEX_NARROWING_TIME_MARGIN,
+    INDEX_RESOLUTION_REFRESH_INTERVAL,
+)
+
+
+# index names ending in a date like "logstash-2018.02.22", "filebeat-2018.02" or
+# "nginx-2018-02-22-13"; rollover style names like ".ds-logs-2018.02.22-000001" do not match
+# intentionally as their date marks the creation of the index and not the contained time range
+INDEX_NAME_DATE_PATTERN = re.compile(
+    r'^(?P<prefix>.*?)'
+    r'(?P<year>\d{4})(?P<separator1>[.\-_])(?P<month>\d{2})'
+    r'(?:(?P<separator2>[.\-_])(?P<day>\d{2})'
+    r'(?:(?P<separator3>[.\-_])(?P<hour>\d{2}))?)?$')
+
+
+########################################################################
+class DatedIndex:  # pylint: disable=too-few-public-methods
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name, template, period_start, period_end):
+        self.name = name
+        self.template = template
+        self.period_start = period_start
+        self.period_end = period_end
+
+
+########################################################################
+class IndexResolver:
+    """
+    Resolve a wildcard index pattern (e.g. "logstash-*") into the concrete indices which
+    can contain events of the queried time range. Indices with a date suffix whose time
+    period ends before the queried time range are skipped, all other indices are kept.
+    To not miss indices created after the last resolution (e.g. the daily index after
+    midnight), a wildcard expression for the current time period is added for each naming
+    scheme found.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, http_handler, logger, index_pattern, enabled=True):
+        self._http_handler = http_handler
+        self._logger = logger
+        self._index_pattern = index_pattern
+        self._enabled = enabled
+        self._dated_indices = None
+        self._undated_indices = None
+        self._templates = None
+        self._resolved_at = None
+        self.narrowed = False
+
+    # ----------------------------------------------------------------------
+    def get_index(self, timestamp_from):
+        if not self._narrowing_possible():
+            return self._index_pattern
+
+        self._resolve_indices_if_necessary()
+        if self._dated_indices is None:
+            return self._index_pattern  # resolution failed, use the pattern as is
+
+        indices = self._factor_indices_for_time_range(timestamp_from)
+        if not indices or len(indices) > INDEX_NARROWING_MAX_INDICES:
+            self.narrowed = False
+            return self._index_pattern
+
+        self.narrowed = True
+        return ','.join(indices)
+
+    # ----------------------------------------------------------------------
+    def invalidate(self):
+        # force a new resolution on next use, e.g. after an index has been deleted
+        self._resolved_at = None
+
+    # ----------------------------------------------------------------------
+    def _narrowing_possible(self):
+        return self._enabled and self._index_pattern and '*' in self._index_pattern
+
+    # ----------------------------------------------------------------------
+    def _resolve_indices_if_necessary(self):
+        if self._resolved_at is not None:
+            if monotonic() - self._resolved_at < INDEX_RESOLUTION_REFRESH_INTERVAL:
+                return
+
+        self._resolved_at = monotonic()
+        index_names = self._fetch_index_names()
+        if index_names is None:
+            self._dated_indices = None
+            return
+
+        self._parse_index_names(index_names)
+        self._logger.debug(
+            'Resolved index pattern "{}" into {} dated and {} other indices',
+            self._index_pattern,
+            len(self._dated_indices),
+            len(self._undated_indices))
+
+    # ----------------------------------------------------------------------
+    def _fetch_index_names(self):
+        # ES 7.9+ and OpenSearch
+        try:
+            response = self._http_handler.request(
+                f'_resolve/index/{self._index_pattern}?expand_wildcards=open')
+            return [index['name'] for index in response['indices']]
+        except (HTTPError, ValueError, KeyError, TypeError) as exc:
+            self._logger.debug('Resolve index API not available: {}', exc)
+
+        # older versions
+        try:
+            response = self._http_handler.request(
+                f'_cat/indices/{self._index_pattern}?format=json&h=index&expand_wildcards=open')
+            return [index['index'] for index in response]
+        except (HTTPError, ValueError, KeyError, TypeError) as exc:
+            self._logger.debug(
+                'Unable to resolve index pattern "{}", using it as is: {}',
+                self._index_pattern,
+                exc)
+
+        return None
+
+    # ----------------------------------------------------------------------
+    def _parse_index_names(self, index_names):
+        self._dated_indices = []
+        self._undated_indices = []
+        self._templates = {}
+        for index_name in sorted(index_names):
+            dated_index = self._parse_index_name(index_name)
+            if dated_index is None:
+                self._undated_indices.append(index_name)
+            else:
+                self._dated_indices.append(dated_index)
+                self._templates[dated_index.template] = None
+
+    # ----------------------------------------------------------------------
+    def _parse_index_name(self, index_name):
+        match = INDEX_NAME_DATE_PATTERN.match(index_name)
+        if match is None:
+            return None
+
+        parts = match.groupdict()
+        try:
+            if parts['hour'] is not None:
+                template = '{prefix}%Y{separator1}%m{separator2}%d{separator3}%H'
+                period_start = datetime(
+                    int(parts['year']), int(parts['month']), int(parts['day']), int(parts['hour']))
+                period_end = period_start + timedelta(hours=1)
+            elif parts['day'] is not None:
+                template = '{prefix}%Y{separator1}%m{separator2}%d'
+                period_start = datetime(int(parts['year']), int(parts['month']), int(parts['day']))
+                period_end = period_start + timedelta(days=1)
+            else:
+                template = '{prefix}%Y{separator1}%m'
+                period_start = datetime(int(parts['year']), int(parts['month']), 1)
+                period_end = (period_start + timedelta(days=32)).replace(day=1)
+        except ValueError:
+            return None  # something which looked like a date but is not valid
+
+        # the prefix is inserted literally by format(), but must not contain strftime directives
+        template = template.format(**dict(parts, prefix=parts['prefix'].replace('%', '%%')))
+        return DatedIndex(index_name, template, period_start, period_end)
+
+    # ----------------------------------------------------------------------
+    def _factor_indices_for_time_range(self, timestamp_from):
+        earliest_period_end = timestamp_from - INDEX_NARROWING_TIME_MARGIN
+        indices = [
+            dated_index.name
+            for dated_index in self._dated_indices
+            if dated_index.period_end > earliest_period_end]
+        indices.extend(self._undated_indices)
+
+        # indices for the current period might be created after we resolved the pattern,
+        # so always include a wildcard expression matching them
+        now = datetime.now()
+        for template in self._templates:
+            current_period_expression = f'{now.strftime(template)}*'
+            if current_period_expression not in indices:
+                indices.append(current_period_expression)
+
+        return indices
@@ -3,42 +3,102 @@
 # This software may be modified and distributed under the terms
 # of the MIT license.  See the LICENSE file for details.
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from json import dumps
 from os import environ
-from time import sleep, tzset
+from os.path import expanduser
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import tzset
 from traceback import format_exc
+from urllib.error import HTTPError
 import sys
 
-from lstail.constants import ELASTICSEARCH_TIMESTAMP_FORMAT, VERSION
-from lstail.error import StopReaderLoop
+from lstail.cache import HitCache
+from lstail.constants import (
+    BACKPRESSURE_BLOCK,
+    ELASTICSEARCH_TIMESTAMP_FORMAT,
+    LOG_LEVEL_WARNING,
+    PAGE_SIZE_INITIAL,
+    PAGE_SIZE_MIN,
+    PREFETCH_QUEUE_TIMEOUT,
+    REFRESH_INTERVAL_BACKOFF_FACTOR,
+    SORT_ORDER_ASCENDING,
+    SORT_ORDER_DESCENDING,
+    STATE_MAX_DOCUMENTS,
+    VERSION,
+)
+from lstail.dto.state import ReaderState
+from lstail.error import AsyncSearchNotSupportedError, StopReaderLoop
 from lstail.http import ElasticsearchRequestController
 from lstail.logger import LstailLogger
 from lstail.prompt import KibanaSavedSearchSelectPrompt
+from lstail.query.async_search import AsyncSearch
 from lstail.query.factory import QueryBuilderFactory
+from lstail.query.index import IndexResolver
 from lstail.query.kibana_saved_search import ListKibanaSavedSearchesController
+from lstail.recording import Recorder
+from lstail.state import StateFile
+from lstail.util.backpressure import BackpressureController
+from lstail.util.dedup import ProcessedDocumentIndex
+from lstail.util.document import get_document_field, merge_truncated_fields
+from lstail.util.fingerprint import get_search_fingerprint
+from lstail.util.http import get_total_hits
+from lstail.util.match import DocumentMatcher
+from lstail.util.paging import AdaptivePageSizeController
+from lstail.util.sample import DocumentSampler, format_sample_rate, parse_sample_rate
+from lstail.util.scheduler import AdaptivePollScheduler
 from lstail.util.timestamp import (
+    get_timestamp_from_sort_value,
     parse_and_convert_time_range_to_start_date_time,
     parse_timestamp_from_elasticsearch,
 )
 
 
 ########################################################################
-class LogstashReader:
+class LogstashReader:  # pylint: disable=too-many-instance-attributes
 
     # ----------------------------------------------------------------------
     def __init__(self, config):
         self._config = config
         self._user_agent = None
         self._http_handler = None
+        self._query_builder_factory = None
         self._query_builder = None
         self._kibana_search = None
         self._base_query = None
+        self._truncated_fields = None
+        self._document_matcher = None
+        self._sample_rate = None
+        self._document_sampler = None
+        self._backpressure = None
+        self._backpressure_sampler = None
+        self._backpressure_notice = None
+        self._index_resolver = None
+        self._poll_scheduler = None
+        self._page_size_controller = None
+        self._async_search = None
+        self._hit_cache = None
+        self._recorder = None
+        self._sort_order = SORT_ORDER_DESCENDING
+        self._query_size = None
+        self._page_continuation_timestamp = None
+        self._page_continuation_inclusive = True
+        self._page_document_count = None
+        self._processed_documents = None
         self._documents = None
+        self._pages = None
+        self._stop_event = None
+        self._state_file = None
+        self._pages_since_checkpoint = 0
         self._last_timestamp = None
         self._logger = None
         self._output = sys.stdout
 
+    # ----------------------------------------------------------------------
+    def set_output(self, output):
+        self._output = output
+
     # ----------------------------------------------------------------------
     def show_version(self):
         print(f'Lstail {VERSION}', file=self._output)
@@ -70,28 +130,120 @@ class LogstashReader:
         self._setup_timezone()
         self._setup_initial_time_range()
         self._prompt_for_kibana_saved_search_selection_if_necessary()
-        self._factor_query_builder()
-        self._build_base_query()
+        self._setup_query()
+        self._setup_state_file()
+        self._setup_poll_scheduler()
+        self._setup_backpressure()
+        self._setup_recorder()
         self._print_header()
 
+        try:
+            if self._config.prefetch_pages:
+                self._read_pipelined()
+            else:
+                self._read_sequentially()
+        finally:
+            self._log_match_statistics()
+            self._logger.flush()
+            self._close_recorder()
+
+    # ----------------------------------------------------------------------
+    def _read_sequentially(self):
         while True:
             try:
-                self._fetch_latest_documents()
-                self._fetch_latest_timestamp()
-                self._print_latest_documents()
+                self._poll_scheduler.start_poll()
+                self._fetch_page()
+                state = self._factor_state_if_necessary()
+                self._print_documents(self._documents)
+                self._log_backpressure_notice(self._backpressure_notice)
+                self._save_state(state)
                 self._stop_reader_loop_if_necessary()
+                self._update_poll_scheduler()
                 self._wait_for_next_refresh_interval()
             except (StopReaderLoop, KeyboardInterrupt):
                 return
             except Exception as exc:  # pylint: disable=broad-except
-                if self._config.debug:
-                    traceback = format_exc()
-                    traceback = f'\n{traceback}'
-                else:
-                    traceback = ''
-                self._logger.error('Unexpected error occurred: {}{}', exc, traceback)
+                self._log_unexpected_error(exc, format_exc())
+                self._poll_scheduler.record_error()
                 self._wait_for_next_refresh_interval()
 
+    # ----------------------------------------------------------------------
+    def _read_pipelined(self):
+        # fetch the next pages in a background thread while the current page is printed,
+        # the size of the queue limits the number of pages fetched ahead if printing
+        # is slower (e.g. on a slow terminal)
+        self._pages = Queue(maxsize=self._config.prefetch_pages)
+        self._stop_event = Event()
+        fetcher = Thread(target=self._fetch_pages, name='lstail-fetcher', daemon=True)
+        fetcher.start()
+        try:
+            self._print_pages()
+        except KeyboardInterrupt:
+            return
+        finally:
+            self._stop_event.set()
+
+    # ----------------------------------------------------------------------
+    def _fetch_pages(self):
+        while not self._stop_event.is_set():
+            try:
+                self._poll_scheduler.start_poll()
+                self._fetch_page()
+                # the state is saved by the main thread once the page has been printed
+                state = self._factor_state_if_necessary()
+                self._put_page((self._documents, state, self._backpressure_notice, None, None))
+                self._stop_reader_loop_if_necessary()
+                self._update_poll_scheduler()
+            except StopReaderLoop:
+                self._put_page((None, None, None, None, None))  # signal the end of input
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                # errors are logged by the main thread to keep the output in order
+                self._put_page((None, None, None, exc, format_exc()))
+                self._poll_scheduler.record_error()
+            self._wait_for_next_refresh_interval()
+
+    # ----------------------------------------------------------------------
+    def _put_page(self, page):
+        while not self._stop_event.is_set():
+            try:
+                self._pages.put(page, timeout=PREFETCH_QUEUE_TIMEOUT)
+            except Full:
+                continue  # printing is slower than fetching, wait for it
+            else:
+                return
+
+    # ----------------------------------------------------------------------
+    def _print_pages(self):
+        while True:
+            documents, state, backpressure_notice, exc, traceback = self._get_page()
+            if exc is not None:
+                self._log_unexpected_error(exc, traceback)
+            elif documents is None:
+                return
+            else:
+                self._print_documents(documents)
+                self._log_backpressure_notice(backpressure_notice)
+                self._save_state(state)
+
+    # ----------------------------------------------------------------------
+    def _get_page(self):
+        while True:
+            try:
+                return self._pages.get(timeout=PREFETCH_QUEUE_TIMEOUT)
+            except Empty:
+                # the logger defers the records of the fetcher thread to this thread, log them
+                # while the fetcher is still busy (e.g. the progress of an async search)
+                self._logger.flush()
+
+    # ----------------------------------------------------------------------
+    def _log_unexpected_error(self, exc, traceback):
+        if self._config.debug:
+            traceback = f'\n{traceback}'
+        else:
+            traceback = ''
+        self._logger.error('Unexpected error occurred: {}{}', exc, traceback)
+
     # ----------------------------------------------------------------------
     def _setup_logger(self):
         self._logger = LstailLogger(
@@ -135,10 +287,24 @@ class LogstashReader:
         # overwrite previously set saved search title
         self._config.kibana.saved_search = selected_saved_search
 
+    # ----------------------------------------------------------------------
+    def _setup_query(self):
+        self._factor_query_builder()
+        self._build_base_query()
+        self._setup_cursor_field()
+        self._logger.set_time_field_name(self._base_query.time_field_name)
+        self._setup_server_side_truncation()
+        self._setup_index_resolver()
+        self._setup_page_size_controller()
+        self._setup_processed_documents_index()
+        self._setup_async_search()
+        self._setup_hit_cache()
+
     # ----------------------------------------------------------------------
     def _factor_query_builder(self):
-        query_builder_factory = QueryBuilderFactory(self._http_handler, self._logger)
-        self._query_builder = query_builder_factory.factor(
+        if self._query_builder_factory is None:
+            self._query_builder_factory = QueryBuilderFactory(self._http_handler, self._logger)
+        self._query_builder = self._query_builder_factory.factor(
             self._config.default_index,
             self._config.kibana.index_name,
             self._config.kibana.saved_search,
@@ -148,36 +314,591 @@ class LogstashReader:
 
     # ----------------------------------------------------------------------
     def _build_base_query(self):
+        self._add_min_level_filter_if_necessary()
+        self._setup_document_matcher()
+        self._setup_sampling()
         self._base_query = self._query_builder.build()
 
+    # ----------------------------------------------------------------------
+    def _add_min_level_filter_if_necessary(self):
+        if not self._config.min_level:
+            return
+
+        log_level_column = self._config.display.columns.get('log_level', None)
+        if log_level_column is None:
+            self._logger.warning('No "log_level" column configured, ignoring --min-level')
+            return
+
+        level_names = list(self._config.parser.log_level_names_error)
+        if self._config.min_level == LOG_LEVEL_WARNING:
+            level_names.extend(self._config.parser.log_level_names_warning)
+        # the level fields are usually not analyzed, so match the common spellings
+        values = sorted({
+            spelling
+            for level_name in level_names
+            for spelling in (level_name.lower(), level_name.upper(), level_name.capitalize())})
+        level_filters = [{'terms': {field_name: values}} for field_name in log_level_column.names]
+        self._query_builder.add_filter(
+            {'bool': {'should': level_filters, 'minimum_should_match': 1}})
+
+    # ----------------------------------------------------------------------
+    def _setup_document_matcher(self):
+        if not self._config.match_expressions:
+            return
+
+        self._document_matcher = DocumentMatcher(self._config.match_expressions)
+        self._document_matcher.set_keyword_fields(
+            self._get_keyword_fields(self._document_matcher.field_names))
+        for filter_query in self._document_matcher.filter_queries:
+            self._query_builder.add_filter(filter_query)
+        self._logger.debug(
+            'Match expressions searched by Elasticsearch: {:.0%}',
+            self._document_matcher.pushdown_ratio)
+
+    # ----------------------------------------------------------------------
+    def _get_keyword_fields(self, field_names):
+        # the index of the search is not known before the query is built, so check the
+        # mapping of the fields in all indices, which is stricter
+        path = f'_field_caps?fields={",".join(field_names)}'
+        try:
+            response = self._http_handler.request(path)
+        except HTTPError as exc:
+            self._logger.debug('Unable to query field capabilities: {}', exc)
+            return set()
+
+        return {
+            field_name
+            for field_name, capabilities in response.get('fields', {}).items()
+            if list(capabilities) == ['keyword'] and capabilities['keyword'].get('searchable')}
+
+    # ----------------------------------------------------------------------
+    def _setup_sampling(self):
+        if not self._config.sample_rate:
+            return
+
+        self._sample_rate = parse_sample_rate(self._config.sample_rate)
+        if self._sample_rate == 1:
+            return  # all events
+
+        if self._query_builder.supports_random_score:
+            sample_filter = self._query_builder.factor_sample_filter(self._sample_rate)
+            self._query_builder.add_filter(sample_filter)
+        else:
+            self._logger.info('Sampling by Elasticsearch is not supported, sampling locally')
+            self._document_sampler = DocumentSampler(self._sample_rate)
+
+    # ----------------------------------------------------------------------
+    def _setup_cursor_field(self):
+        ingest_time_field = self._config.ingest_time_field
+        if not ingest_time_field:
+            return
+
+        if self._is_field_available(ingest_time_field):
+            self._logger.debug('Using ingest time field "{}" to follow events', ingest_time_field)
+            self._base_query.set_time_field_name(ingest_time_field)
+        else:
+            self._logger.info(
+                'Ingest time field "{}" not found, using time field "{}" to follow events',
+                ingest_time_field,
+                self._base_query.time_field_name)
+
+    # ----------------------------------------------------------------------
+    def _is_field_available(self, field_name):
+        path = f'{self._base_query.index}/_field_caps?fields={field_name}'
+        try:
+            response = self._http_handler.request(path)
+        except HTTPError as exc:
+            self._logger.debug('Unable to query field capabilities: {}', exc)
+            return False
+
+        return bool(response.get('fields', {}).get(field_name))
+
+    # ----------------------------------------------------------------------
+    def _setup_server_side_truncation(self):
+        if not self._config.server_side_truncation:
+            return
+
+        if not self._query_builder.supports_painless_scripts:
+            self._logger.info('Server-side truncation is not supported, truncating locally')
+            return
+
+        self._truncated_fields = self._get_truncated_fields()
+        if self._truncated_fields:
+            self._base_query.set_truncated_fields(self._truncated_fields)
+
+    # ----------------------------------------------------------------------
+    def _get_truncated_fields(self):
+        truncated_fields = {}
+        for column_name, column in self._config.display.columns.items():
+            if not column.max_length:
+                continue
+            for field_name in [column_name] + column.names:
+                # nested fields are truncated locally, the time field is needed in the source
+                if '.' in field_name or field_name == self._base_query.time_field_name:
+                    continue
+                truncated_fields[field_name] = column.max_length
+
+        return truncated_fields
+
+    # ----------------------------------------------------------------------
+    def _setup_index_resolver(self):
+        self._index_resolver = IndexResolver(
+            self._http_handler,
+            self._logger,
+            self._base_query.index,
+            enabled=self._config.narrow_indices)
+
+    # ----------------------------------------------------------------------
+    def _setup_poll_scheduler(self):
+        self._poll_scheduler = AdaptivePollScheduler(
+            interval=self._config.refresh_interval,
+            min_interval=self._config.refresh_interval_min,
+            max_interval=self._config.refresh_interval_max,
+            backoff_factor=REFRESH_INTERVAL_BACKOFF_FACTOR)
+
+    # ----------------------------------------------------------------------
+    def _setup_backpressure(self):
+        if not self._config.follow or self._config.backpressure in (None, BACKPRESSURE_BLOCK):
+            return
+
+        self._backpressure = BackpressureController(
+            self._config.backpressure,
+            self._config.backpressure_max_lag)
+
+    # ----------------------------------------------------------------------
+    def _setup_page_size_controller(self):
+        self._page_size_controller = AdaptivePageSizeController(
+            initial_size=PAGE_SIZE_INITIAL,
+            min_size=PAGE_SIZE_MIN,
+            max_size=self._config.page_size_max,
+            target_bytes=self._config.page_target_bytes,
+            max_bytes=self._config.page_max_bytes,
+            target_latency=self._config.page_target_latency)
+
+    # ----------------------------------------------------------------------
+    def _setup_processed_documents_index(self):
+        self._processed_documents = ProcessedDocumentIndex()
+
+    # ----------------------------------------------------------------------
+    def _setup_async_search(self):
+        if not self._config.async_search:
+            return
+
+        if self._query_builder.supports_async_search:
+            self._async_search = AsyncSearch(
+                self._http_handler,
+                self._logger,
+                timeout=self._config.timeout)
+        else:
+            self._logger.info('Async search is not supported, using a regular search')
+
+    # ----------------------------------------------------------------------
+    def _setup_hit_cache(self):
+        if not self._config.hit_cache_dir or self._config.no_cache:
+            return
+
+        # events are cached by the time field used for the search
+        fingerprint_values = [self._base_query.time_field_name]
+        if self._truncated_fields:
+            # cached events contain the truncated fields
+            fingerprint_values.append(self._truncated_fields)
+        fingerprint = get_search_fingerprint(self._config, *fingerprint_values)
+        self._hit_cache = HitCache(
+            expanduser(self._config.hit_cache_dir),
+            fingerprint,
+            self._logger,
+            max_size=self._config.hit_cache_max_size)
+
+    # ----------------------------------------------------------------------
+    def _setup_state_file(self):
+        if not self._config.state_file:
+            return
+
+        self._state_file = StateFile(
+            self._config.state_file,
+            get_search_fingerprint(self._config),
+            self._logger)
+        state = self._state_file.load()
+        if state is not None:
+            self._resume_from_state(state)
+
+    # ----------------------------------------------------------------------
+    def _resume_from_state(self, state):
+        self._logger.info('Resuming from state file at {}', state.timestamp)
+        # documents with the same timestamp as the stored one might not have been processed
+        # yet, so query them again (Elasticsearch stores milliseconds) and skip the processed
+        # ones by their ID
+        self._last_timestamp = state.timestamp - timedelta(milliseconds=1)
+        for timestamp, document_id in state.documents:
+            self._processed_documents.add(document_id, timestamp)
+        # continue after the stored position instead of fetching the latest documents
+        self._sort_order = SORT_ORDER_ASCENDING
+
+    # ----------------------------------------------------------------------
+    def _setup_recorder(self):
+        if not self._config.record_file:
+            return
+
+        self._recorder = Recorder(self._config.record_file, self._describe_search())
+        self._recorder.open()
+
+    # ----------------------------------------------------------------------
+    def _describe_search(self):
+        return dict(
+            version=VERSION,
+            columns=self._query_builder.display_columns,
+            time_field_name=self._base_query.time_field_name)
+
+    # ----------------------------------------------------------------------
+    def _close_recorder(self):
+        if self._recorder is not None:
+            self._recorder.close()
+
     # ----------------------------------------------------------------------
     def _print_header(self):
         self._logger.print_header()
+        if self._sample_rate is not None:
+            self._logger.info(
+                'Showing a sample of {} of the events',
+                format_sample_rate(self._sample_rate))
+
+    # ----------------------------------------------------------------------
+    def _fetch_page(self):
+        self._fetch_latest_documents()
+        self._process_fetched_documents()
+
+    # ----------------------------------------------------------------------
+    def _process_fetched_documents(self):
+        self._fetch_latest_timestamp()
+        self._skip_processed_documents()
+        self._match_documents()
+        self._sample_documents()
+        self._apply_backpressure()
 
     # ----------------------------------------------------------------------
     def _fetch_latest_documents(self):
-        path = f'{self._base_query.index}/_search'
-        timestamp_from = self._last_timestamp.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT)
-        query = self._query_builder.build_query_for_time_range(self._base_query, timestamp_from)
-        query.query['size'] = self._config.initial_query_size
+        if self._use_hit_cache():
+            response, stats = self._request_hit_cache()
+        else:
+            query = self._factor_search_query()
+            response, stats = self._request_search(dumps(query.query))
+        self._process_search_response(response, stats)
 
-        query_json = dumps(query.query)
-        response = self._http_handler.request(path, query_json)
+    # ----------------------------------------------------------------------
+    def _request_search(self, query_json):
+        """Return the search response together with its ResponseStats"""
+        try:
+            if self._use_async_search():
+                return self._request_async_search(query_json)
+
+            return self._http_handler.request_with_stats(self._factor_search_path(), query_json)
+        except HTTPError:
+            # a narrowed index might have been deleted in the meantime, resolve again next time
+            self._index_resolver.invalidate()
+            raise
+
+    # ----------------------------------------------------------------------
+    def _use_hit_cache(self):
+        # only the initial query covers a time range which might have been queried before
+        return self._hit_cache is not None and self._sort_order == SORT_ORDER_DESCENDING
+
+    # ----------------------------------------------------------------------
+    def _request_hit_cache(self):
+        self._query_size = self._get_query_size()
+        documents = self._hit_cache.search(
+            self._get_query_timestamp_from(),
+            self._query_size,
+            self._fetch_time_range,
+            self._get_document_timestamp)
+        # the response is merged from cached and fetched documents, so there are no
+        # stats of a single request for the page size controller
+        return dict(hits=dict(hits=documents)), None
+
+    # ----------------------------------------------------------------------
+    def _fetch_time_range(self, timestamp_from, timestamp_to, size):
+        query = self._factor_time_range_query(timestamp_from, timestamp_to, size)
+        response, _ = self._request_search(dumps(query.query))
+        return response['hits']['hits']
+
+    # ----------------------------------------------------------------------
+    def _use_async_search(self):
+        # only the initial query might cover a large time range, the following queries
+        # are for the latest events only
+        return self._async_search is not None and self._sort_order == SORT_ORDER_DESCENDING
+
+    # ----------------------------------------------------------------------
+    def _request_async_search(self, query_json):
+        index = self._get_search_index()
+        try:
+            return self._async_search.search(
+                index,
+                query_json,
+                ignore_unavailable=self._index_resolver.narrowed)
+        except AsyncSearchNotSupportedError as exc:
+            self._logger.warning('Async search failed ({}), using a regular search', exc)
+            self._async_search = None
+            return self._http_handler.request_with_stats(self._factor_search_path(), query_json)
+
+    # ----------------------------------------------------------------------
+    def _factor_search_query(self):
+        self._query_size = self._get_query_size()
+        # events of the same time as the last one of a full page might not have fit on it,
+        # so query them again and skip the duplicates in _skip_processed_documents()
+        include_from = self._page_continuation_timestamp is not None and \
+            self._page_continuation_inclusive
+        return self._factor_time_range_query(
+            self._get_query_timestamp_from(),
+            None,
+            self._query_size,
+            include_from=include_from)
+
+    # ----------------------------------------------------------------------
+    def _factor_time_range_query(self, timestamp_from, timestamp_to, size, include_from=False):
+        timestamp_from = timestamp_from.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT)
+        if timestamp_to is not None:
+            timestamp_to = timestamp_to.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT)
+        query = self._query_builder.build_query_for_time_range(
+            self._base_query,
+            timestamp_from,
+            timestamp_to,
+            include_from=include_from)
+        query.query['size'] = size
+        query.set_sort_order(self._sort_order)
+        return query
+
+    # ----------------------------------------------------------------------
+    def _process_search_response(self, response, stats):
         self._documents = response['hits']['hits']
-        self._documents.reverse()
+        self._merge_truncated_fields()
+        self._page_document_count = len(self._documents)
+        self._update_page_size_controller(stats)
+        if self._sort_order == SORT_ORDER_DESCENDING:
+            self._documents.reverse()
+        else:
+            self._update_page_continuation_timestamp()
+        # the initial query fetches the latest documents (like "tail"), then continue
+        # in ascending order to not skip any documents if more than a page arrived
+        self._sort_order = SORT_ORDER_ASCENDING
+
+    # ----------------------------------------------------------------------
+    def _merge_truncated_fields(self):
+        if self._truncated_fields:
+            for document in self._documents:
+                merge_truncated_fields(document, self._truncated_fields)
+
+    # ----------------------------------------------------------------------
+    def _get_query_timestamp_from(self):
+        if self._page_continuation_timestamp is not None:
+            # continue at the last document of the last page
+            return self._page_continuation_timestamp
+
+        if self._sort_order == SORT_ORDER_ASCENDING and self._config.follow_overlap:
+            # query again some time before the last seen event to catch late arriving events,
+            # duplicates are skipped in _skip_processed_documents()
+            return self._last_timestamp - timedelta(seconds=self._config.follow_overlap)
+
+        return self._last_timestamp
+
+    # ----------------------------------------------------------------------
+    def _update_page_continuation_timestamp(self):
+        if self._documents and len(self._documents) >= self._query_size:
+            # the page is full, so there are probably more documents to fetch
+            self._page_continuation_timestamp = self._get_document_timestamp(self._documents[-1])
+            # continuing at the time of a page of events of a single time would return
+            # the same page again, so continue after it
+            self._page_continuation_inclusive = \
+                self._get_document_timestamp(self._documents[0]) != \
+                self._page_continuation_timestamp
+            if not self._page_continuation_inclusive:
+                self._logger.warning(
+                    'More than {} events at {}, some of them might be skipped',
+                    self._query_size,
+                    self._page_continuation_timestamp)
+        else:
+            self._page_continuation_timestamp = None
+
+    # ----------------------------------------------------------------------
+    def _get_query_size(self):
+        if self._sort_order == SORT_ORDER_DESCENDING:
+            # initial query for the latest documents, as many as requested
+            return self._config.initial_query_size
+
+        return self._page_size_controller.size
+
+    # ----------------------------------------------------------------------
+    def _update_page_size_controller(self, stats):
+        if stats is None:
+            return  # no request of its own for this page
+
+        self._page_size_controller.update(len(self._documents), stats.size, stats.duration)
+
+    # ----------------------------------------------------------------------
+    def _factor_search_path(self):
+        index = self._get_search_index()
+        if self._index_resolver.narrowed:
+            # resolved indices might vanish (e.g. by ILM) before the next resolution
+            return f'{index}/_search?ignore_unavailable=true'
+
+        return f'{index}/_search'
+
+    # ----------------------------------------------------------------------
+    def _get_search_index(self):
+        return self._index_resolver.get_index(self._last_timestamp)
 
     # ----------------------------------------------------------------------
     def _fetch_latest_timestamp(self):
-        if self._documents:
-            latest_document = self._documents[-1]
-            timestamp = latest_document['_source'][self._base_query.time_field_name]
-            last_timestamp = parse_timestamp_from_elasticsearch(timestamp)
-            self._last_timestamp = min(last_timestamp, datetime.now())
+        for document in reversed(self._documents):
+            last_timestamp = self._get_document_timestamp(document)
+            if last_timestamp is not None:
+                last_timestamp = min(last_timestamp, datetime.now())
+                # pages of late arriving events might be older than the last seen event
+                self._last_timestamp = max(last_timestamp, self._last_timestamp)
+                break
 
     # ----------------------------------------------------------------------
-    def _print_latest_documents(self):
+    def _get_document_timestamp(self, document):
+        # the queries are sorted by the time field, so its sort value is the document's time
+        timestamp = get_timestamp_from_sort_value(document)
+        if timestamp is not None:
+            return timestamp
+
+        timestamp = get_document_field(document['_source'], self._base_query.time_field_name)
+        if timestamp is None:
+            return None
+
+        return parse_timestamp_from_elasticsearch(timestamp)
+
+    # ----------------------------------------------------------------------
+    def _skip_processed_documents(self):
+        documents = []
         for document in self._documents:
-            self._logger.log_document(document)
+            document_id = document.get('_id')
+            if document_id in self._processed_documents:
+                continue
+
+            timestamp = self._get_document_timestamp(document)
+            self._processed_documents.add(document_id, timestamp)
+            documents.append(document)
+
+        self._documents = documents
+        # forget about documents which cannot be returned by the next queries anymore
+        oldest_timestamp = self._last_timestamp
+        if self._config.follow_overlap:
+            oldest_timestamp -= timedelta(seconds=self._config.follow_overlap)
+        if self._page_continuation_timestamp is not None:
+            # the next page starts at the last document of this page, including it
+            oldest_timestamp = min(oldest_timestamp, self._page_continuation_timestamp)
+        self._processed_documents.prune(oldest_timestamp)
+
+    # ----------------------------------------------------------------------
+    def _match_documents(self):
+        if self._document_matcher is not None:
+            self._documents = self._document_matcher.filter(self._documents)
+
+    # ----------------------------------------------------------------------
+    def _sample_documents(self):
+        if self._document_sampler is not None:
+            self._documents = self._document_sampler.filter(self._documents)
+
+    # ----------------------------------------------------------------------
+    def _apply_backpressure(self):
+        self._backpressure_notice = None
+        if self._backpressure is None:
+            return
+
+        if self._backpressure_sampler is not None:
+            self._documents = self._backpressure_sampler.filter(self._documents)
+        # a changed sample rate applies to the following pages
+        if self._backpressure.update(self._get_lag()):
+            self._update_backpressure_sampler()
+        elif self._backpressure.skip_to_live:
+            self._skip_to_live()
+
+    # ----------------------------------------------------------------------
+    def _get_lag(self):
+        if self._page_continuation_timestamp is None:
+            return 0.0  # all events fetched, so printing keeps up
+
+        # the page is full, so the events after it are waiting to be printed
+        return (datetime.now() - self._page_continuation_timestamp).total_seconds()
+
+    # ----------------------------------------------------------------------
+    def _update_backpressure_sampler(self):
+        sample_rate = self._backpressure.sample_rate
+        if sample_rate < 1:
+            self._backpressure_sampler = DocumentSampler(sample_rate)
+            self._backpressure_notice = \
+                f'Output lags {self._backpressure.lag:.0f}s behind, showing a sample ' \
+                f'of {format_sample_rate(sample_rate)} of the events'
+        else:
+            self._backpressure_sampler = None
+            self._backpressure_notice = 'Output caught up, showing all events'
+
+    # ----------------------------------------------------------------------
+    def _skip_to_live(self):
+        timestamp_to = datetime.now()
+        skipped_count = self._count_documents(self._page_continuation_timestamp, timestamp_to)
+        skipped_events = f'{skipped_count} events'
+        if self._document_matcher is not None or self._document_sampler is not None:
+            # Elasticsearch counts the events before they are matched and sampled locally
+            skipped_events = f'{skipped_events} (counted before --match/--sample)'
+        self._backpressure_notice = \
+            f'Output lags {self._backpressure.lag:.0f}s behind, ' \
+            f'skipped {skipped_events} to continue with the latest events'
+        self._last_timestamp = timestamp_to
+        # continue right after the skipped events, without querying the overlap again
+        self._page_continuation_timestamp = timestamp_to
+        self._page_continuation_inclusive = False
+
+    # ----------------------------------------------------------------------
+    def _count_documents(self, timestamp_from, timestamp_to):
+        query = self._factor_time_range_query(timestamp_from, timestamp_to, 0)
+        query = self._query_builder.build_summary_query(query, None)
+        response, _ = self._request_search(dumps(query.query))
+        return get_total_hits(response)
+
+    # ----------------------------------------------------------------------
+    def _log_backpressure_notice(self, backpressure_notice):
+        if backpressure_notice is not None:
+            self._logger.warning(backpressure_notice)
+
+    # ----------------------------------------------------------------------
+    def _log_match_statistics(self):
+        if self._document_matcher is not None and self._document_matcher.checked_documents:
+            self._logger.debug(
+                'Matched {} of {} events locally',
+                self._document_matcher.matched_documents,
+                self._document_matcher.checked_documents)
+
+    # ----------------------------------------------------------------------
+    def _factor_state_if_necessary(self):
+        if self._state_file is None:
+            return None
+
+        self._pages_since_checkpoint += 1
+        # always store the position of the last page if not following
+        if self._pages_since_checkpoint < self._config.state_checkpoint_pages \
+                and self._config.follow:
+            return None
+
+        self._pages_since_checkpoint = 0
+        documents = self._processed_documents.get_entries(limit=STATE_MAX_DOCUMENTS)
+        return ReaderState(self._last_timestamp, documents)
+
+    # ----------------------------------------------------------------------
+    def _save_state(self, state):
+        if state is not None:
+            self._state_file.save(state)
+
+    # ----------------------------------------------------------------------
+    def _print_documents(self, documents):
+        self._record_documents(documents)
+        self._logger.log_documents(documents)
+
+    # ----------------------------------------------------------------------
+    def _record_documents(self, documents):
+        if self._recorder is not None:
+            self._recorder.write(documents)
 
     # ----------------------------------------------------------------------
     def _stop_reader_loop_if_necessary(self):
@@ -186,6 +907,10 @@ class LogstashReader:
             # if "--follow" CLI option was not specified
             raise StopReaderLoop()
 
+    # ----------------------------------------------------------------------
+    def _update_poll_scheduler(self):
+        self._poll_scheduler.update(self._page_document_count, self._query_size)
+
     # ----------------------------------------------------------------------
     def _wait_for_next_refresh_interval(self):
-        sleep(self._config.refresh_interval)
+        self._poll_scheduler.wait()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from json import dumps
+import gzip
+
+
+RECORDING_FORMAT_VERSION = 1
+
+
+########################################################################
+class Recorder:
+    """
+    Write the printed documents (the hits as returned by Elasticsearch) to a gzip
+    compressed file, one JSON document per line, to replay them later with "--replay".
+    The first line describes the search (e.g. the columns of the saved search).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, path, search_description):
+        self._path = path
+        self._search_description = search_description
+        self._file = None
+
+    # ----------------------------------------------------------------------
+    def open(self):
+        self._file = gzip.open(self._path, 'wb')
+        header = dict(self._search_description, lstail_recording=RECORDING_FORMAT_VERSION)
+        self._write_line(header)
+
+    # ----------------------------------------------------------------------
+    def _write_line(self, value):
+        value_json = dumps(value)
+        self._file.write(f'{value_json}\n'.encode('utf-8'))
+
+    # ----------------------------------------------------------------------
+    def write(self, documents):
+        if not documents:
+            return
+
+        for document in documents:
+            self._write_line(document)
+        # keep the recording readable up to the last page if lstail gets killed
+        self._file.flush()
+
+    # ----------------------------------------------------------------------
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from multiprocessing import get_context
+import os
+import signal
+
+from lstail.constants import RENDER_POOL_CHUNK_DOCUMENTS
+
+
+# the logger of a worker process, set up once by the pool's initializer
+_RENDER_WORKER = {}
+
+
+# ----------------------------------------------------------------------
+def _setup_render_worker(logger_class, config, use_colors, display_columns, time_field_name):
+    # Ctrl-C is handled by the main process which writes the pending output
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # render the chunks in the worker itself
+    config.render_pool_threshold = 0
+    output = StringIO()
+    logger = logger_class(config, output=output, use_colors=use_colors)
+    logger.update_display_columns(display_columns)
+    logger.set_time_field_name(time_field_name)
+    _RENDER_WORKER.update(logger=logger, output=output)
+
+
+# ----------------------------------------------------------------------
+def _render_documents(documents):
+    output = _RENDER_WORKER['output']
+    output.seek(0)
+    output.truncate()
+    _RENDER_WORKER['logger'].log_documents(documents)
+    return output.getvalue()
+
+
+########################################################################
+class RenderPool:
+    """
+    Render large pages of documents in worker processes (to not be limited by the GIL),
+    each worker uses its own LstailLogger set up with the same configuration and
+    display columns. The rendered output is written in the original order of the documents.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+            self,
+            logger_class,
+            config,
+            output,
+            *,
+            use_colors,
+            display_columns,
+            time_field_name):
+        self._output = output
+        self._max_workers = os.cpu_count() or 1
+        # spawn the workers instead of forking the multi-threaded main process
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=get_context('spawn'),
+            initializer=_setup_render_worker,
+            initargs=(logger_class, config, use_colors, display_columns, time_field_name))
+        self._pending = deque()
+
+    # ----------------------------------------------------------------------
+    def render(self, documents):
+        for start in range(0, len(documents), RENDER_POOL_CHUNK_DOCUMENTS):
+            chunk = documents[start:start + RENDER_POOL_CHUNK_DOCUMENTS]
+            self._pending.append(self._executor.submit(_render_documents, chunk))
+
+        self._write_rendered_chunks()
+
+    # ----------------------------------------------------------------------
+    def _write_rendered_chunks(self):
+        # write what is done already in order, wait if too many chunks are in progress
+        max_pending = self._max_workers * 2
+        while self._pending and (self._pending[0].done() or len(self._pending) > max_pending):
+            self._write_next_chunk()
+
+    # ----------------------------------------------------------------------
+    def _write_next_chunk(self):
+        future = self._pending.popleft()
+        try:
+            self._output.write(future.result())
+        except Exception:
+            # the following chunks cannot be written in order anymore
+            self._cancel_pending_chunks()
+            raise
+
+    # ----------------------------------------------------------------------
+    def _cancel_pending_chunks(self):
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    # ----------------------------------------------------------------------
+    def wait(self):
+        while self._pending:
+            self._write_next_chunk()
+
+    # ----------------------------------------------------------------------
+    def shutdown(self):
+        self._cancel_pending_chunks()
+        self._executor.shutdown(wait=True)
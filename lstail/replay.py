@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from json import loads
+from mmap import ACCESS_READ, mmap
+from time import sleep
+import gzip
+
+from lstail.constants import REPLAY_PAGE_SIZE
+from lstail.dto.query import Query
+from lstail.error import InvalidRecordingError
+from lstail.reader import LogstashReader
+from lstail.recording import RECORDING_FORMAT_VERSION
+
+
+########################################################################
+class ReplayLogstashReader(LogstashReader):
+    """
+    Print the documents of a recording made with "--record" instead of querying
+    Elasticsearch. The documents are rendered with the local settings (columns, colors,
+    CSV output), as fast as possible or with the pacing of their timestamps.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._last_document_timestamp = None
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._setup_logger()
+        self._setup_timezone()
+        # the recording is mapped into memory to not copy it through the page cache twice
+        with open(self._config.replay_file, 'rb') as recording_file:
+            try:
+                recording_data = mmap(recording_file.fileno(), 0, access=ACCESS_READ)
+            except ValueError as exc:
+                raise InvalidRecordingError(
+                    f'Recording "{self._config.replay_file}" is empty') from exc
+
+            with recording_data, gzip.GzipFile(fileobj=recording_data) as recording:
+                try:
+                    self._replay(recording)
+                except KeyboardInterrupt:
+                    return
+
+    # ----------------------------------------------------------------------
+    def _replay(self, recording):
+        self._process_header(recording.readline())
+        documents = []
+        truncated = False
+        try:
+            for line in recording:
+                document = loads(line)
+                delay = self._get_document_delay(document)
+                if documents and (delay or len(documents) >= REPLAY_PAGE_SIZE):
+                    # print the documents which are due before waiting for the next one
+                    self._logger.log_documents(documents)
+                    documents = []
+                if delay:
+                    sleep(delay)
+                documents.append(document)
+        except EOFError:
+            # the recording has not been closed properly, e.g. lstail was killed
+            truncated = True
+
+        if documents:
+            self._logger.log_documents(documents)
+        if truncated:
+            self._logger.debug('Recording "{}" ends unexpectedly', self._config.replay_file)
+
+    # ----------------------------------------------------------------------
+    def _process_header(self, line):
+        try:
+            header = loads(line)
+        except ValueError:
+            header = None
+
+        if not isinstance(header, dict) or \
+                header.get('lstail_recording') != RECORDING_FORMAT_VERSION:
+            raise InvalidRecordingError(
+                f'"{self._config.replay_file}" is not a recording of this lstail version')
+
+        self._logger.debug('Replaying recording of lstail {}', header['version'])
+        # there is no query to replay, only its time field to get the document timestamps
+        self._base_query = Query(None, None, header['time_field_name'])
+        self._logger.update_display_columns(header['columns'])
+        self._logger.set_time_field_name(header['time_field_name'])
+        self._print_header()
+
+    # ----------------------------------------------------------------------
+    def _get_document_delay(self, document):
+        if not self._config.replay_pacing:
+            return 0
+
+        timestamp = self._get_document_timestamp(document)
+        if timestamp is None:
+            return 0
+
+        delay = 0
+        if self._last_document_timestamp is not None:
+            delay = max((timestamp - self._last_document_timestamp).total_seconds(), 0)
+        self._last_document_timestamp = timestamp
+        return delay
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+from json import dumps, loads
+from socket import AF_UNIX, SHUT_RDWR, SOCK_STREAM, socket
+from tempfile import gettempdir
+from threading import Lock, Thread
+import os
+import stat
+
+from lstail.constants import ATTACH_READ_SIZE, SERVE_CLIENT_SEND_TIMEOUT
+from lstail.error import (
+    TailServerAlreadyRunningError,
+    TailServerNotFoundError,
+    TailServerSocketError,
+)
+from lstail.reader import LogstashReader
+from lstail.util.fingerprint import get_search_fingerprint
+
+
+# ----------------------------------------------------------------------
+def get_socket_path(config):
+    if config.socket_path:
+        return config.socket_path
+
+    # the same search on the same servers uses the same socket
+    fingerprint = get_search_fingerprint(config)
+    return os.path.join(_get_runtime_directory(), f'lstail-{fingerprint[:16]}.sock')
+
+
+# ----------------------------------------------------------------------
+def _get_runtime_directory():
+    runtime_directory = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_directory:
+        return runtime_directory
+
+    # the temporary directory is writable by all users, so use a private directory in it
+    # to prevent others from binding the socket first
+    runtime_directory = os.path.join(gettempdir(), f'lstail-{os.getuid()}')
+    try:
+        os.mkdir(runtime_directory, 0o700)
+    except FileExistsError:
+        pass
+    directory_stat = os.lstat(runtime_directory)
+    if not stat.S_ISDIR(directory_stat.st_mode) or \
+            directory_stat.st_uid != os.getuid() or \
+            stat.S_IMODE(directory_stat.st_mode) & 0o077:
+        raise TailServerSocketError(
+            f'"{runtime_directory}" is not a private directory of the current user, '
+            f'remove it or specify the socket path')
+    return runtime_directory
+
+
+# ----------------------------------------------------------------------
+def _encode_message(message):
+    message_json = dumps(message)
+    return f'{message_json}\n'.encode('utf-8')
+
+
+########################################################################
+class ServingLogstashReader(LogstashReader):
+    """
+    Poll Elasticsearch once and publish the fetched documents to all clients connected
+    to a Unix socket ("lstail --attach"). The clients render the documents themselves.
+
+    The first message to each client describes the search (e.g. the columns of the saved
+    search), followed by the last fetched documents and then all new documents, each
+    as JSON on a separate line. Clients which do not keep up are dropped.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._socket_path = None
+        self._server_socket = None
+        self._clients = []
+        self._clients_lock = Lock()
+        self._backlog = None
+        self._hello_message = None
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._config.follow = True  # serve until interrupted
+        self._setup_logger()
+        self._setup_http_handler()
+        self._setup_timezone()
+        self._setup_initial_time_range()
+        self._prompt_for_kibana_saved_search_selection_if_necessary()
+        self._setup_query()
+        self._setup_poll_scheduler()
+        self._setup_server_socket()
+        self._setup_recorder()
+        try:
+            self._read_sequentially()
+        finally:
+            self._close_server_socket()
+            self._logger.flush()
+            self._close_recorder()
+
+    # ----------------------------------------------------------------------
+    def _setup_server_socket(self):
+        self._socket_path = get_socket_path(self._config)
+        self._remove_stale_socket()
+
+        self._server_socket = socket(AF_UNIX, SOCK_STREAM)
+        self._server_socket.bind(self._socket_path)
+        self._server_socket.listen()
+        # new clients get the latest documents first, like the initial query
+        self._backlog = deque(maxlen=self._config.initial_query_size)
+        self._hello_message = self._factor_hello_message()
+
+        acceptor = Thread(target=self._accept_clients, name='lstail-server', daemon=True)
+        acceptor.start()
+        self._logger.info('Serving events on "{}"', self._socket_path)
+
+    # ----------------------------------------------------------------------
+    def _remove_stale_socket(self):
+        if not os.path.exists(self._socket_path):
+            return
+
+        test_socket = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            test_socket.connect(self._socket_path)
+        except OSError:
+            # nobody is listening anymore, probably left over from a crashed server
+            self._unlink_own_socket()
+        else:
+            raise TailServerAlreadyRunningError(
+                f'Another lstail server is already serving on "{self._socket_path}"')
+        finally:
+            test_socket.close()
+
+    # ----------------------------------------------------------------------
+    def _unlink_own_socket(self):
+        socket_stat = os.lstat(self._socket_path)
+        if not stat.S_ISSOCK(socket_stat.st_mode) or socket_stat.st_uid != os.getuid():
+            raise TailServerSocketError(
+                f'"{self._socket_path}" is not a socket of the current user, not removing it')
+        os.unlink(self._socket_path)
+
+    # ----------------------------------------------------------------------
+    def _factor_hello_message(self):
+        return _encode_message(self._describe_search())
+
+    # ----------------------------------------------------------------------
+    def _accept_clients(self):
+        while True:
+            try:
+                client, _ = self._server_socket.accept()
+            except OSError:
+                return  # server socket closed
+
+            client.settimeout(SERVE_CLIENT_SEND_TIMEOUT)
+            with self._clients_lock:
+                data = self._hello_message + b''.join(self._backlog)
+                if self._send_to_client(client, data):
+                    self._clients.append(client)
+                    self._logger.debug('Client connected ({} clients)', len(self._clients))
+
+    # ----------------------------------------------------------------------
+    def _print_documents(self, documents):
+        # the logger defers the records of the acceptor thread to this thread, log them
+        # once per page
+        self._logger.flush()
+        self._record_documents(documents)
+        messages = [_encode_message(document) for document in documents]
+        if not messages:
+            return
+
+        data = b''.join(messages)
+        with self._clients_lock:
+            self._backlog.extend(messages)
+            self._clients = [
+                client for client in self._clients if self._send_to_client(client, data)]
+
+    # ----------------------------------------------------------------------
+    def _send_to_client(self, client, data):
+        try:
+            client.sendall(data)
+        except OSError as exc:
+            # disconnected or too slow
+            self._logger.debug('Dropping client: {}', exc)
+            client.close()
+            return False
+
+        return True
+
+    # ----------------------------------------------------------------------
+    def _close_server_socket(self):
+        if self._server_socket is None:
+            return
+
+        self._server_socket.close()
+        with self._clients_lock:
+            for client in self._clients:
+                self._close_client(client)
+            self._clients = []
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    # ----------------------------------------------------------------------
+    def _close_client(self, client):
+        try:
+            client.shutdown(SHUT_RDWR)
+        except OSError:
+            pass  # already disconnected
+        client.close()
+
+
+########################################################################
+class AttachedLogstashReader(LogstashReader):
+    """
+    Print the documents published by "lstail --serve" for the same search instead of
+    querying Elasticsearch. The documents are rendered with the local settings
+    (columns, colors, CSV output).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._socket_path = None
+        self._connection = None
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._setup_logger()
+        self._setup_timezone()
+        self._connect()
+        try:
+            self._read_from_server()
+        except KeyboardInterrupt:
+            return
+        finally:
+            self._connection.close()
+
+    # ----------------------------------------------------------------------
+    def _connect(self):
+        self._socket_path = get_socket_path(self._config)
+        self._connection = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            self._connection.connect(self._socket_path)
+        except OSError as exc:
+            self._connection.close()
+            raise TailServerNotFoundError(
+                f'No lstail server found on "{self._socket_path}" ({exc}), '
+                f'start one with "--serve" for the same search') from exc
+
+    # ----------------------------------------------------------------------
+    def _read_from_server(self):
+        stream = self._connection.makefile('rb')
+        hello_message = stream.readline()
+        if hello_message:
+            self._process_hello_message(loads(hello_message))
+            self._read_documents(stream)
+
+        self._logger.info('Server on "{}" closed the connection', self._socket_path)
+
+    # ----------------------------------------------------------------------
+    def _read_documents(self, stream):
+        # print the documents received at once (e.g. a page sent by the server) together
+        # instead of one by one
+        pending_data = b''
+        while True:
+            data = stream.read1(ATTACH_READ_SIZE)
+            if not data:
+                return  # connection closed
+
+            messages = (pending_data + data).split(b'\n')
+            pending_data = messages.pop()  # incomplete message
+            if messages:
+                self._logger.log_documents([loads(message) for message in messages])
+
+    # ----------------------------------------------------------------------
+    def _process_hello_message(self, hello):
+        self._logger.debug('Attached to lstail {} on "{}"', hello['version'], self._socket_path)
+        # render with the own columns, the server's columns are just the ones of its search
+        self._logger.update_display_columns()
+        self._logger.set_time_field_name(hello['time_field_name'])
+        self._print_header()
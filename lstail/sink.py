@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime, timezone
+from queue import Queue
+from threading import Thread
+import gzip
+import os
+
+from lstail.constants import FILE_SINK_CHUNK_SIZE, FILE_SINK_QUEUE_SIZE
+from lstail.error import OutputCompressionNotAvailableError
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+FILE_SINK_ROTATION_TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+_ROTATE = 'rotate'
+_DATA = 'data'
+
+
+# ----------------------------------------------------------------------
+def _open_gzip_file(path, mode):
+    return gzip.open(path, mode)
+
+
+# ----------------------------------------------------------------------
+def _open_zstandard_file(path, mode):
+    compressor = zstandard.ZstdCompressor()
+    return compressor.stream_writer(open(path, mode))  # pylint: disable=consider-using-with
+
+
+# ----------------------------------------------------------------------
+def _open_lz4_file(path, mode):
+    return lz4_frame.open(path, mode)
+
+
+# ----------------------------------------------------------------------
+def _open_plain_file(path, mode):
+    return open(path, mode)  # pylint: disable=consider-using-with
+
+
+########################################################################
+class FileSink:  # pylint: disable=too-many-instance-attributes
+    """
+    File-like output for LstailLogger which writes the output to a file,
+    compressed according to the file name suffix (.gz, .zst, .lz4).
+
+    The output is collected into chunks which are compressed and written by a background
+    thread, so compression does not slow down rendering. The chunks are passed via a
+    bounded queue to keep the memory usage limited and the output in order.
+
+    The output file can be rotated by size (of the uncompressed output) and/or by the time
+    of the events, then the file names get a counter and/or the start time of the interval
+    inserted, e.g. "syslog-20180222T220000-0001.log.gz".
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, path, rotate_size=None, rotate_interval=None):
+        self._path = path
+        self._rotate_size = rotate_size
+        self._rotate_interval = rotate_interval
+        self._open_file = self._get_file_opener(path)
+        self._queue = Queue(maxsize=FILE_SINK_QUEUE_SIZE)
+        self._thread = None
+        self._error = None
+        self._buffer = []
+        self._buffer_size = 0
+        self._event_time_bucket = None
+        # used by the writer thread only
+        self._file = None
+        self._file_size = 0
+        self._file_counter = 0
+        self._file_name_time = None
+        self._file_ends_with_newline = True
+        self._written_paths = set()
+
+    # ----------------------------------------------------------------------
+    def _get_file_opener(self, path):
+        if path.endswith('.gz'):
+            return _open_gzip_file
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise OutputCompressionNotAvailableError(
+                    'zstd compression requires the "zstandard" package')
+            return _open_zstandard_file
+        if path.endswith('.lz4'):
+            if lz4_frame is None:
+                raise OutputCompressionNotAvailableError(
+                    'lz4 compression requires the "lz4" package')
+            return _open_lz4_file
+
+        return _open_plain_file
+
+    # ----------------------------------------------------------------------
+    @property
+    def rotates_by_event_time(self):
+        return bool(self._rotate_interval)
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        self.open()
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ----------------------------------------------------------------------
+    def open(self):
+        self._thread = Thread(target=self._write_chunks, name='lstail-file-sink', daemon=True)
+        self._thread.start()
+
+    # ----------------------------------------------------------------------
+    def isatty(self):
+        return False
+
+    # ----------------------------------------------------------------------
+    def write(self, text):
+        self._raise_error_if_necessary()
+        self._buffer.append(text)
+        self._buffer_size += len(text)
+        if self._buffer_size >= FILE_SINK_CHUNK_SIZE and not self._waits_for_event_time():
+            self._enqueue_buffer()
+        return len(text)
+
+    # ----------------------------------------------------------------------
+    def flush(self):
+        self._raise_error_if_necessary()
+        if not self._waits_for_event_time():
+            self._enqueue_buffer()
+
+    # ----------------------------------------------------------------------
+    def _waits_for_event_time(self):
+        # the file name is not known before the first event if rotating by event time
+        return self.rotates_by_event_time and self._event_time_bucket is None
+
+    # ----------------------------------------------------------------------
+    def set_event_time(self, timestamp):
+        """Rotate the output file if `timestamp` is in another interval than the last event"""
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        seconds = int(timestamp.timestamp())
+        bucket = seconds - seconds % self._rotate_interval
+        if bucket == self._event_time_bucket:
+            return
+
+        if self._event_time_bucket is not None:
+            # the buffered output belongs to the previous interval
+            self._enqueue_buffer()
+        self._event_time_bucket = bucket
+        self._queue.put((_ROTATE, bucket))
+
+    # ----------------------------------------------------------------------
+    def close(self):
+        if self._thread is None:
+            return
+
+        self._enqueue_buffer()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._raise_error_if_necessary()
+
+    # ----------------------------------------------------------------------
+    def _raise_error_if_necessary(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    # ----------------------------------------------------------------------
+    def _enqueue_buffer(self):
+        if not self._buffer:
+            return
+
+        data = ''.join(self._buffer).encode('utf-8')
+        self._buffer = []
+        self._buffer_size = 0
+        # blocks if the writer thread falls behind
+        self._queue.put((_DATA, data))
+
+    # ----------------------------------------------------------------------
+    def _write_chunks(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                continue  # keep draining the queue to not block the main thread
+
+            try:
+                self._write_chunk(*item)
+            except (OSError, ValueError) as exc:
+                self._error = exc
+
+        try:
+            self._close_file()
+        except (OSError, ValueError) as exc:
+            self._error = self._error or exc
+
+    # ----------------------------------------------------------------------
+    def _write_chunk(self, kind, value):
+        if kind == _ROTATE:
+            self._close_file()
+            self._file_counter = 0
+            self._file_name_time = datetime.fromtimestamp(value, timezone.utc)
+            return
+
+        if self._rotate_size and self._file_size >= self._rotate_size:
+            # do not split lines over files
+            if self._file_ends_with_newline:
+                self._close_file()
+                self._file_counter += 1
+
+        if self._file is None:
+            self._open_next_file()
+        self._file.write(value)
+        self._file_size += len(value)
+        self._file_ends_with_newline = value.endswith(b'\n')
+
+    # ----------------------------------------------------------------------
+    def _open_next_file(self):
+        path = self._factor_file_path()
+        # append if the same interval is written again, e.g. for late events
+        mode = 'ab' if path in self._written_paths else 'wb'
+        self._file = self._open_file(path, mode)
+        self._file_size = 0
+        self._written_paths.add(path)
+
+    # ----------------------------------------------------------------------
+    def _factor_file_path(self):
+        name_parts = []
+        if self._file_name_time is not None:
+            name_parts.append(self._file_name_time.strftime(FILE_SINK_ROTATION_TIME_FORMAT))
+        if self._rotate_size:
+            name_parts.append(f'{self._file_counter:04d}')
+        if not name_parts:
+            return self._path
+
+        directory, file_name = os.path.split(self._path)
+        # insert before the suffixes, e.g. "syslog.log.gz" -> "syslog-0001.log.gz"
+        stem, separator, suffixes = file_name.partition('.')
+        file_name = '-'.join([stem] + name_parts) + separator + suffixes
+        return os.path.join(directory, file_name)
+
+    # ----------------------------------------------------------------------
+    def _close_file(self):
+        if self._file is not None:
+            file_ = self._file
+            self._file = None
+            file_.close()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from json import dumps, load
+
+from lstail.dto.state import ReaderState
+from lstail.util.file import write_file_atomically
+
+
+STATE_FILE_VERSION = 1
+
+
+########################################################################
+class StateFile:
+    """
+    Store the position of the reader to resume from it after a restart.
+    The state is only used for the same search (identified by its fingerprint).
+    The file is replaced atomically, so it is never left half written.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, path, fingerprint, logger):
+        self._path = path
+        self._fingerprint = fingerprint
+        self._logger = logger
+
+    # ----------------------------------------------------------------------
+    def load(self):
+        try:
+            with open(self._path, encoding='utf-8') as state_file:
+                state = load(state_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            self._logger.warning('Ignoring unreadable state file "{}": {}', self._path, exc)
+            return None
+
+        if state.get('version') != STATE_FILE_VERSION:
+            self._logger.warning('Ignoring state file "{}" of another version', self._path)
+            return None
+        if state.get('fingerprint') != self._fingerprint:
+            self._logger.info('Ignoring state file "{}" of another search', self._path)
+            return None
+
+        return self._parse_state(state)
+
+    # ----------------------------------------------------------------------
+    def _parse_state(self, state):
+        timestamp = datetime.fromisoformat(state['timestamp'])
+        documents = [
+            (self._parse_timestamp(document_timestamp), document_id)
+            for document_timestamp, document_id in state['documents']]
+        return ReaderState(timestamp, documents)
+
+    # ----------------------------------------------------------------------
+    def _parse_timestamp(self, timestamp):
+        if timestamp is None:
+            return None  # document without timestamp
+
+        return datetime.fromisoformat(timestamp)
+
+    # ----------------------------------------------------------------------
+    def save(self, reader_state):
+        state = dict(
+            version=STATE_FILE_VERSION,
+            fingerprint=self._fingerprint,
+            timestamp=reader_state.timestamp.isoformat(),
+            documents=[
+                (document_timestamp.isoformat() if document_timestamp else None, document_id)
+                for document_timestamp, document_id in reader_state.documents])
+
+        try:
+            write_file_atomically(self._path, dumps(state).encode('utf-8'))
+        except OSError as exc:
+            # keep on reading, the next checkpoint might succeed
+            self._logger.warning('Unable to write state file "{}": {}', self._path, exc)
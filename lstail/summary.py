@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime, timedelta, timezone
+from json import dumps
+from traceback import format_exc
+
+from lstail.constants import (
+    DEFAULT_SUMMARY_TOP_SIZE,
+    ELASTICSEARCH_TIMESTAMP_FORMAT,
+    SORT_ORDER_ASCENDING,
+    SUMMARY_HISTOGRAM_BAR_WIDTH,
+)
+from lstail.dto.summary import Summary
+from lstail.error import InvalidSummaryFieldError, InvalidTimeRangeFormatError, StopReaderLoop
+from lstail.reader import LogstashReader
+from lstail.util.http import get_total_hits
+from lstail.util.timestamp import parse_time_range_to_seconds
+
+
+SUMMARY_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+SPARKLINE_CHARACTERS = '▁▂▃▄▅▆▇█'
+
+_AGGREGATION_HISTOGRAM = 'histogram'
+_AGGREGATION_TOP = 'top'
+
+
+# ----------------------------------------------------------------------
+def parse_top_field(top_field):
+    """Split "FIELD[:N]" into the field name and the number of values"""
+    field_name, separator, size = top_field.rpartition(':')
+    if not separator or not size.isdigit():
+        field_name, size = top_field, DEFAULT_SUMMARY_TOP_SIZE
+    if not field_name or int(size) < 1:
+        raise InvalidSummaryFieldError(
+            f'Invalid top field specified: {top_field}. Valid examples are: host, host:20')
+    return field_name, int(size)
+
+
+# ----------------------------------------------------------------------
+def format_sparkline(counts):
+    maximum = max(counts, default=0)
+    if not maximum:
+        return SPARKLINE_CHARACTERS[0] * len(counts)
+
+    levels = len(SPARKLINE_CHARACTERS) - 1
+    return ''.join(SPARKLINE_CHARACTERS[round(count / maximum * levels)] for count in counts)
+
+
+# ----------------------------------------------------------------------
+def _get_epoch_milliseconds(timestamp):
+    return int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+########################################################################
+class SummaryLogstashReader(LogstashReader):  # pylint: disable=too-many-instance-attributes
+    """
+    Let Elasticsearch summarize the events of the search instead of fetching them:
+    the number of events ("--count"), the most frequent values of a field ("--top")
+    and the number of events per interval ("--histogram").
+
+    In follow mode, only the time range since the last refresh is queried and its
+    numbers are added to the previous ones. Completed histogram intervals are printed
+    as they pass, the number of events and the top values are printed again if
+    new events arrived. The latest refresh interval is summarized only by the next
+    refresh, so events ingested late within that time are counted as well (events
+    ingested later are not counted, as the intervals are printed once).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, config):
+        super().__init__(config)
+        self._histogram_interval = None
+        self._top_field_name = None
+        self._top_size = None
+        self._summary = Summary()
+        self._summary_start = None
+        self._new_event_count = None
+        self._printed_histogram_key = None
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        self._setup_summary()
+        self._setup_logger()
+        self._setup_http_handler()
+        self._setup_timezone()
+        self._setup_initial_time_range()
+        self._prompt_for_kibana_saved_search_selection_if_necessary()
+        self._setup_query()
+        self._warn_about_local_match_expressions()
+        self._setup_poll_scheduler()
+        self._summary_start = self._last_timestamp
+        try:
+            self._read_summaries()
+        finally:
+            self._logger.flush()
+
+    # ----------------------------------------------------------------------
+    def _setup_summary(self):
+        if self._config.summary_histogram_interval:
+            interval = self._config.summary_histogram_interval
+            self._histogram_interval = parse_time_range_to_seconds(interval)
+            if not self._histogram_interval:
+                raise InvalidTimeRangeFormatError(f'Invalid histogram interval: {interval}')
+        if self._config.summary_top:
+            self._top_field_name, self._top_size = parse_top_field(self._config.summary_top)
+
+    # ----------------------------------------------------------------------
+    def _warn_about_local_match_expressions(self):
+        if self._document_matcher is not None and self._document_matcher.pushdown_ratio < 1:
+            self._logger.warning(
+                'Match expressions which cannot be searched by Elasticsearch are ignored')
+
+    # ----------------------------------------------------------------------
+    def _read_summaries(self):
+        while True:
+            try:
+                self._poll_scheduler.start_poll()
+                timestamp_to = self._get_summary_end()
+                self._fetch_summary(timestamp_to)
+                self._print_summary(timestamp_to)
+                self._stop_reader_loop_if_necessary()
+                self._update_poll_scheduler()
+                self._wait_for_next_refresh_interval()
+            except (StopReaderLoop, KeyboardInterrupt):
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                self._log_unexpected_error(exc, format_exc())
+                self._poll_scheduler.record_error()
+                self._wait_for_next_refresh_interval()
+
+    # ----------------------------------------------------------------------
+    def _get_summary_end(self):
+        timestamp_to = datetime.now()
+        if self._config.follow and self._config.refresh_interval:
+            # events of the latest refresh interval might not be searchable yet
+            timestamp_to -= timedelta(seconds=self._config.refresh_interval)
+        # never before the already summarized time range
+        return max(timestamp_to, self._last_timestamp)
+
+    # ----------------------------------------------------------------------
+    def _fetch_summary(self, timestamp_to):
+        query = self._factor_summary_query(self._last_timestamp, timestamp_to)
+        response, _ = self._request_search(dumps(query.query))
+        self._add_summary_response(response)
+        # continue after the summarized time range
+        self._last_timestamp = timestamp_to
+        # like the document reader, only the initial query covers the whole time range
+        # (e.g. for the async search), the following ones the latest events only
+        self._sort_order = SORT_ORDER_ASCENDING
+
+    # ----------------------------------------------------------------------
+    def _factor_summary_query(self, timestamp_from, timestamp_to):
+        query = self._query_builder.build_query_for_time_range(
+            self._base_query,
+            timestamp_from.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT),
+            timestamp_to.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT))
+
+        aggregations = {}
+        if self._histogram_interval:
+            bounds = (
+                _get_epoch_milliseconds(timestamp_from),
+                _get_epoch_milliseconds(timestamp_to))
+            aggregations[_AGGREGATION_HISTOGRAM] = \
+                self._query_builder.factor_date_histogram_aggregation(
+                    query.time_field_name,
+                    self._histogram_interval,
+                    bounds)
+        if self._top_field_name:
+            aggregations[_AGGREGATION_TOP] = {
+                'terms': {'field': self._top_field_name, 'size': self._top_size}}
+
+        return self._query_builder.build_summary_query(query, aggregations)
+
+    # ----------------------------------------------------------------------
+    def _add_summary_response(self, response):
+        total = get_total_hits(response)
+        self._new_event_count = total
+        self._summary.count += total
+
+        aggregations = response.get('aggregations', {})
+        if _AGGREGATION_TOP in aggregations:
+            top = aggregations[_AGGREGATION_TOP]
+            for bucket in top['buckets']:
+                top_values = self._summary.top_values
+                top_values[bucket['key']] = top_values.get(bucket['key'], 0) + bucket['doc_count']
+            self._summary.top_other_count += top.get('sum_other_doc_count', 0)
+        if _AGGREGATION_HISTOGRAM in aggregations:
+            histogram = self._summary.histogram
+            for bucket in aggregations[_AGGREGATION_HISTOGRAM]['buckets']:
+                # the interval at the border of two time ranges is counted by both queries
+                histogram[bucket['key']] = histogram.get(bucket['key'], 0) + bucket['doc_count']
+
+    # ----------------------------------------------------------------------
+    def _print_summary(self, timestamp_to):
+        initial = self._printed_histogram_key is None
+        if self._histogram_interval:
+            self._print_histogram(timestamp_to, initial)
+        if not initial and not self._new_event_count:
+            return
+
+        if self._config.summary_count:
+            start = self._summary_start.strftime(SUMMARY_TIME_FORMAT)
+            self._print(f'{self._summary.count} events since {start}')
+        if self._top_field_name:
+            self._print_top_values()
+
+    # ----------------------------------------------------------------------
+    def _print_histogram(self, timestamp_to, initial):
+        keys = sorted(self._summary.histogram)
+        if self._config.follow:
+            # the last interval is still in progress
+            interval_milliseconds = self._histogram_interval * 1000
+            end = _get_epoch_milliseconds(timestamp_to)
+            keys = [key for key in keys if key + interval_milliseconds <= end]
+
+        if initial:
+            counts = [self._summary.histogram[key] for key in keys]
+            self._print(
+                f'Events per {self._config.summary_histogram_interval}: '
+                f'{format_sparkline(counts)}')
+            self._printed_histogram_key = -1
+
+        maximum = max(self._summary.histogram.values(), default=0)
+        for key in keys:
+            if key <= self._printed_histogram_key:
+                continue
+
+            count = self._summary.histogram[key]
+            interval_start = datetime.fromtimestamp(key / 1000, timezone.utc)
+            bar_ = '█' * round(count / maximum * SUMMARY_HISTOGRAM_BAR_WIDTH) if maximum else ''
+            self._print(f'{interval_start.strftime(SUMMARY_TIME_FORMAT)} {count:>10} {bar_}')
+            self._printed_histogram_key = key
+
+    # ----------------------------------------------------------------------
+    def _print_top_values(self):
+        top_values = sorted(self._summary.top_values.items(), key=lambda item: -item[1])
+        # values merged from several time ranges might exceed the number of top values
+        other_count = self._summary.top_other_count
+        other_count += sum(count for _, count in top_values[self._top_size:])
+        top_values = top_values[:self._top_size]
+
+        self._print(f'Top values of "{self._top_field_name}":')
+        for value, count in top_values:
+            self._print(f'{count:>10} {value}')
+        if other_count:
+            self._print(f'{other_count:>10} (other values)')
+
+    # ----------------------------------------------------------------------
+    def _print(self, line):
+        print(line, file=self._output)
+
+    # ----------------------------------------------------------------------
+    def _update_poll_scheduler(self):
+        self._poll_scheduler.update(self._new_event_count, None)
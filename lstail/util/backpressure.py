@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.constants import BACKPRESSURE_MIN_SAMPLE_RATE, BACKPRESSURE_SAMPLE, BACKPRESSURE_SKIP
+
+
+########################################################################
+class BackpressureController:
+    """
+    Decide how to keep up with the events if printing them is slower than their ingest,
+    based on the lag of the fetched events behind the current time:
+    - "skip": skip to the latest events once the lag exceeds max_lag
+    - "sample": halve the rate of the printed events while the lag exceeds max_lag
+      (down to min_sample_rate) and double it again once the lag is below max_lag
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, policy, max_lag, min_sample_rate=BACKPRESSURE_MIN_SAMPLE_RATE):
+        self._policy = policy
+        self._max_lag = max_lag
+        self._min_sample_rate = min_sample_rate
+        self._lag = 0.0
+        self._sample_rate = 1.0
+
+    # ----------------------------------------------------------------------
+    @property
+    def lag(self):
+        return self._lag
+
+    # ----------------------------------------------------------------------
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    # ----------------------------------------------------------------------
+    @property
+    def skip_to_live(self):
+        return self._policy == BACKPRESSURE_SKIP and self._lag > self._max_lag
+
+    # ----------------------------------------------------------------------
+    def update(self, lag):
+        """Update with the current `lag` (in seconds), return whether the sample rate changed"""
+        self._lag = lag
+        if self._policy != BACKPRESSURE_SAMPLE:
+            return False
+
+        sample_rate = self._sample_rate
+        if lag > self._max_lag:
+            sample_rate = max(sample_rate / 2, self._min_sample_rate)
+        else:
+            sample_rate = min(sample_rate * 2, 1.0)
+        changed = sample_rate != self._sample_rate
+        self._sample_rate = sample_rate
+        return changed
@@ -3,7 +3,10 @@
 # This software may be modified and distributed under the terms
 # of the MIT license.  See the LICENSE file for details.
 
+from io import StringIO
 from os import getpid
+import sys
+import traceback
 
 
 # ----------------------------------------------------------------------
@@ -28,3 +31,23 @@ def get_memory_usage():
             except IndexError:
                 break
     return mem_usage['rss']
+
+
+# ----------------------------------------------------------------------
+def format_exception(exc_info):
+    if isinstance(exc_info, BaseException):
+        exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+    elif not isinstance(exc_info, tuple):
+        exc_info = sys.exc_info()
+
+    if exc_info[0] is None:
+        return ''
+
+    # from Python's logging.Formatter.formatException()
+    text = StringIO()
+    traceback.print_exception(exc_info[0], exc_info[1], exc_info[2], None, text)
+    stack_trace = text.getvalue()
+    text.close()
+    if stack_trace[-1:] == "\n":
+        stack_trace = stack_trace[:-1]
+    return stack_trace
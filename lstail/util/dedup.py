@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+
+
+########################################################################
+class ProcessedDocumentIndex:
+    """
+    Remember IDs of processed documents to detect duplicates in constant time.
+    Entries are discarded in insertion order, either explicitly by their timestamp
+    via `prune()` or implicitly if more than `max_size` entries are stored.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._document_ids = set()
+        self._entries = deque()
+
+    # ----------------------------------------------------------------------
+    def __contains__(self, document_id):
+        return document_id in self._document_ids
+
+    # ----------------------------------------------------------------------
+    def __len__(self):
+        return len(self._document_ids)
+
+    # ----------------------------------------------------------------------
+    def add(self, document_id, timestamp=None):
+        if document_id is None or document_id in self._document_ids:
+            return
+
+        self._document_ids.add(document_id)
+        self._entries.append((timestamp, document_id))
+        if self._max_size is not None and len(self._entries) > self._max_size:
+            self._discard_oldest_entry()
+
+    # ----------------------------------------------------------------------
+    def _discard_oldest_entry(self):
+        _, document_id = self._entries.popleft()
+        self._document_ids.discard(document_id)
+
+    # ----------------------------------------------------------------------
+    def prune(self, timestamp):
+        """Discard all entries older than `timestamp` (assuming roughly ordered insertion)"""
+        while self._entries:
+            entry_timestamp = self._entries[0][0]
+            if entry_timestamp is not None and entry_timestamp >= timestamp:
+                break
+            self._discard_oldest_entry()
+
+    # ----------------------------------------------------------------------
+    def get_entries(self, limit=None):
+        """Return the (timestamp, document ID) entries, at most the latest `limit` ones"""
+        entries = list(self._entries)
+        if limit is not None:
+            entries = entries[max(len(entries) - limit, 0):]
+        return entries
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+from threading import get_ident
+import sys
+
+
+########################################################################
+class DeferredLogRecords:
+    """
+    Collect the log records of other threads than the one which owns the output
+    (e.g. a fetcher thread), to be logged by the owning thread in between its output.
+    Appending to and popping from a deque is thread-safe.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self._owner_thread_id = get_ident()
+        self._records = deque()
+
+    # ----------------------------------------------------------------------
+    def __bool__(self):
+        return bool(self._records)
+
+    # ----------------------------------------------------------------------
+    def is_owner_thread(self):
+        return get_ident() == self._owner_thread_id
+
+    # ----------------------------------------------------------------------
+    def defer(self, level, format_, args, kwargs):
+        """Store the record if called by another thread than the owner, return whether so"""
+        if self.is_owner_thread():
+            return False
+
+        if kwargs.get('exc_info') is True:
+            # the exception is gone once the record is logged by the owner
+            kwargs = dict(kwargs, exc_info=sys.exc_info())
+        self._records.append((level, format_, args, kwargs))
+        return True
+
+    # ----------------------------------------------------------------------
+    def pop_all(self):
+        """Return the stored records in their order, only to the owner thread"""
+        records = []
+        if self.is_owner_thread():
+            while self._records:
+                records.append(self._records.popleft())
+        return records
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.constants import LSTAIL_FALLBACK_FIELD_VALUE, LSTAIL_TRUNCATION_MARKER
+
+
+# ----------------------------------------------------------------------
+def get_document_field(source, field_name, default=None):
+    """
+    Get the value of the field `field_name` from the document source `source`.
+    Nested fields can be specified with dots (e.g. "event.ingested"), they are looked up
+    as flat key first and then as nested structure.
+    """
+    if field_name in source:
+        return source[field_name]
+
+    value = source
+    for field_name_element in field_name.split('.'):
+        if not isinstance(value, dict) or field_name_element not in value:
+            return default
+        value = value[field_name_element]
+
+    return value
+
+
+# ----------------------------------------------------------------------
+def truncate_field_value(value, max_length, length=None):
+    """
+    Cut the string `value` to at most `max_length` characters including a marker with the
+    number of cut characters. `length` is the original length if `value` has been cut already
+    (e.g. by Elasticsearch). Other values, strings which are short enough and the fallback
+    value of missing fields are returned as is.
+    """
+    if length is None:
+        if not isinstance(value, str) or len(value) <= max_length:
+            return value
+        if value == LSTAIL_FALLBACK_FIELD_VALUE:
+            return value  # not a value of the document
+        length = len(value)
+
+    # reserve the space for the longest possible marker
+    kept_length = max(max_length - len(LSTAIL_TRUNCATION_MARKER.format(length)), 0)
+    truncated_value = value[:kept_length] + LSTAIL_TRUNCATION_MARKER.format(length - kept_length)
+    # the marker itself might not fit into very short maximum lengths
+    return truncated_value[:max_length]
+
+
+# ----------------------------------------------------------------------
+def merge_truncated_fields(document, max_lengths):
+    """
+    Move the values of the fields in `max_lengths` which have been returned as script fields
+    (cut to their maximum length by Elasticsearch) into the document source
+    """
+    fields = document.get('fields')
+    if not fields:
+        return
+
+    for field_name, max_length in max_lengths.items():
+        values = fields.pop(field_name, None)
+        if not values or values == [None]:
+            continue  # the document does not contain the field
+
+        value = values[0] if len(values) == 1 else values
+        if isinstance(value, dict) and value.keys() == {'truncated_value', 'length'}:
+            value = truncate_field_value(value['truncated_value'], max_length, value['length'])
+        document['_source'][field_name] = value
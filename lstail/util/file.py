@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from tempfile import NamedTemporaryFile
+import os
+
+
+# ----------------------------------------------------------------------
+def write_file_atomically(path, data):
+    """
+    Write `data` (bytes) to `path` via a temporary file which replaces `path` once it is
+    completely written, so readers never see a partially written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_file_path = None
+    try:
+        with NamedTemporaryFile(dir=directory, prefix='.lstail-', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_file_path, path)
+    except OSError:
+        if temp_file_path is not None:
+            _remove_file(temp_file_path)
+        raise
+
+
+# ----------------------------------------------------------------------
+def _remove_file(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass  # never created or already replaced
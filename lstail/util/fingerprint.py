@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from hashlib import sha1
+from json import dumps
+
+
+# ----------------------------------------------------------------------
+def get_search_fingerprint(config, *extra_values):
+    """
+    Identify the search (servers, index and query) configured in `config`,
+    e.g. to find a server for the same search or state stored for it.
+    `extra_values` distinguish further details of the search (e.g. its time field).
+    """
+    values = [
+        sorted(server.url for server in config.servers),
+        config.default_index,
+        config.kibana.saved_search,
+        config.kibana.custom_search,
+    ]
+    if config.min_level:
+        # only if set to keep the fingerprints of existing searches
+        values.append(config.min_level)
+    if config.match_expressions:
+        values.append(config.match_expressions)
+    if config.sample_rate:
+        values.append(config.sample_rate)
+    values.extend(extra_values)
+    values_json = dumps(values)
+    return sha1(values_json.encode('utf-8')).hexdigest()
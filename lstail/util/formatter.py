@@ -2,17 +2,25 @@
 
 import string
 
+from lstail.constants import TERM_COLORS
+from lstail.util.document import truncate_field_value
+
 
 ########################################################################
 class AutoFillFormatter(string.Formatter):
     """
     Gracefully handle missing keys/attributes in the supplied mapping and use an autofill
     value for the missing input.
+    Values of the fields in `max_lengths` are cut to their maximum length.
+    Keywords are highlighted by `highlighter` in the formatted values of all fields except
+    the color codes.
     """
 
     # ----------------------------------------------------------------------
-    def __init__(self, autofill):
+    def __init__(self, autofill, max_lengths=None, highlighter=None):
         self.autofill = autofill
+        self.max_lengths = max_lengths or {}
+        self.highlighter = highlighter
 
     # ----------------------------------------------------------------------
     def get_field(self, field_name, args, kwargs):
@@ -20,4 +28,24 @@ class AutoFillFormatter(string.Formatter):
             val = super().get_field(field_name, args, kwargs)
         except (KeyError, AttributeError):
             val = self.autofill, field_name
+        else:
+            max_length = self.max_lengths.get(field_name)
+            if max_length:
+                val = truncate_field_value(val[0], max_length), val[1]
+        if self.highlighter and field_name not in TERM_COLORS:
+            val = _HighlightedValue(val[0], self.highlighter), val[1]
         return val
+
+
+########################################################################
+class _HighlightedValue:  # pylint: disable=too-few-public-methods
+    """Highlight the keywords in the value after applying the format spec (e.g. padding)"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, value, highlighter):
+        self._value = value
+        self._highlighter = highlighter
+
+    # ----------------------------------------------------------------------
+    def __format__(self, format_spec):
+        return self._highlighter.highlight(format(self._value, format_spec))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+import re
+
+
+# terminal escape sequences like the color codes (Select Graphic Rendition)
+_ESCAPE_SEQUENCE_REGEX = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+
+
+########################################################################
+class KeywordHighlighter:
+    """
+    Highlight all occurrences of the keywords `terms` in a text in a single pass,
+    independent of the number of keywords (Aho-Corasick automaton).
+
+    Overlapping and adjacent occurrences are highlighted as one, by wrapping them into
+    `start` and `end` (e.g. the terminal codes to switch reverse video on and off).
+    Keywords are matched case-sensitively and not within terminal escape sequences
+    (e.g. the color code of a message).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, terms, start, end):
+        self._start = start
+        self._end = end
+        # per state: the transitions by character, the fallback state on a mismatch and
+        # the length of the longest keyword ending in this state
+        self._transitions = [{}]
+        self._fallbacks = [0]
+        self._match_lengths = [0]
+        for term in terms:
+            self._add_term(term)
+        self._link_fallbacks()
+        self._first_character_regex = self._compile_first_character_regex()
+
+    # ----------------------------------------------------------------------
+    def _compile_first_character_regex(self):
+        # to skip the text between keywords quickly
+        first_characters = ''.join(re.escape(character) for character in self._transitions[0])
+        if not first_characters:
+            return None
+        return re.compile(f'[{first_characters}]')
+
+    # ----------------------------------------------------------------------
+    def _add_term(self, term):
+        state = 0
+        for character in term:
+            next_state = self._transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions.append({})
+                self._fallbacks.append(0)
+                self._match_lengths.append(0)
+                self._transitions[state][character] = next_state
+            state = next_state
+        self._match_lengths[state] = max(self._match_lengths[state], len(term))
+
+    # ----------------------------------------------------------------------
+    def _link_fallbacks(self):
+        # breadth-first, so the fallback states (which are less deep) are linked already
+        states = deque(self._transitions[0].values())
+        while states:
+            state = states.popleft()
+            for character, next_state in self._transitions[state].items():
+                fallback = self._fallbacks[state]
+                while fallback and character not in self._transitions[fallback]:
+                    fallback = self._fallbacks[fallback]
+                fallback = self._transitions[fallback].get(character, 0)
+                self._fallbacks[next_state] = fallback
+                # keywords ending in the fallback state end in this state as well
+                self._match_lengths[next_state] = max(
+                    self._match_lengths[next_state],
+                    self._match_lengths[fallback])
+                states.append(next_state)
+
+    # ----------------------------------------------------------------------
+    def __bool__(self):
+        return bool(self._transitions[0])
+
+    # ----------------------------------------------------------------------
+    def find(self, text):
+        """Return the (start, end) index ranges of the (merged) keyword occurrences in `text`"""
+        transitions = self._transitions
+        fallbacks = self._fallbacks
+        match_lengths = self._match_lengths
+        ranges = []
+        if self._first_character_regex is None:
+            return ranges
+
+        state = 0
+        index = 0
+        length = len(text)
+        while index < length:
+            if not state:
+                first_character = self._first_character_regex.search(text, index)
+                if first_character is None:
+                    break
+                index = first_character.start()
+
+            character = text[index]
+            while state and character not in transitions[state]:
+                state = fallbacks[state]
+            state = transitions[state].get(character, 0)
+            index += 1
+            match_length = match_lengths[state]
+            if match_length:
+                self._add_range(ranges, index - match_length, index)
+
+        return ranges
+
+    # ----------------------------------------------------------------------
+    def _add_range(self, ranges, start, end):
+        # merge with the previous occurrences it overlaps or adjoins
+        while ranges and start <= ranges[-1][1]:
+            start = min(start, ranges.pop()[0])
+        ranges.append((start, end))
+
+    # ----------------------------------------------------------------------
+    def highlight(self, text):
+        if '\x1b' not in text:
+            return self._highlight_text(text)
+
+        parts = []
+        position = 0
+        for escape_sequence in _ESCAPE_SEQUENCE_REGEX.finditer(text):
+            parts.append(self._highlight_text(text[position:escape_sequence.start()]))
+            parts.append(escape_sequence.group())
+            position = escape_sequence.end()
+        parts.append(self._highlight_text(text[position:]))
+        return ''.join(parts)
+
+    # ----------------------------------------------------------------------
+    def _highlight_text(self, text):
+        ranges = self.find(text)
+        if not ranges:
+            return text
+
+        parts = []
+        position = 0
+        for start, end in ranges:
+            parts.append(text[position:start])
+            parts.append(self._start)
+            parts.append(text[start:end])
+            parts.append(self._end)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
@@ -21,6 +21,15 @@ def is_error_http_not_found(exc):
     return False
 
 
+# ----------------------------------------------------------------------
+def get_total_hits(response):
+    total = response['hits']['total']
+    if isinstance(total, dict):
+        return total['value']  # Elasticsearch 7 or newer
+
+    return total
+
+
 # ----------------------------------------------------------------------
 def detect_elasticsearch_version(http_handler, logger):
     def _log_error(exc):
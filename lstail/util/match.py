@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+import re
+
+from lstail.error import InvalidMatchExpressionError
+from lstail.util.document import get_document_field
+
+
+MATCH_EXPRESSION_SEPARATOR = '~'
+# patterns without regular expression syntax (besides escaped special characters)
+_LITERAL_PATTERN_REGEX = re.compile(r'(?:[^.^$*+?{}\[\]\\|()]|\\[^\w\s])+')
+_ESCAPED_CHARACTER_REGEX = re.compile(r'\\(.)')
+_WILDCARD_SPECIAL_CHARACTER_REGEX = re.compile(r'([*?\\])')
+
+
+# ----------------------------------------------------------------------
+def _get_literal(pattern):
+    if _LITERAL_PATTERN_REGEX.fullmatch(pattern) is None:
+        return None
+    return _ESCAPED_CHARACTER_REGEX.sub(r'\1', pattern)
+
+
+# ----------------------------------------------------------------------
+def _escape_wildcard(literal):
+    return _WILDCARD_SPECIAL_CHARACTER_REGEX.sub(r'\\\1', literal)
+
+
+########################################################################
+class FieldMatch:
+
+    # ----------------------------------------------------------------------
+    def __init__(self, field_name, pattern):
+        self.field_name = field_name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+
+    # ----------------------------------------------------------------------
+    def factor_keyword_filter_query(self):
+        """
+        Factor a query to let Elasticsearch evaluate the pattern on a keyword field, if it can
+        be expressed. A keyword field is not analyzed, so a wildcard query compares like the
+        regular expression (case-sensitive, on the whole value) unlike e.g. "match_phrase"
+        (tokens of analyzed text fields) or "prefix" (whole values only).
+
+        Values longer than "ignore_above" are not indexed, so documents without any indexed
+        value are kept as well to let the regular expression decide on them.
+        """
+        wildcard_pattern = self._get_wildcard_pattern()
+        if wildcard_pattern is None:
+            return None
+
+        return {
+            'bool': {
+                'should': [
+                    {'wildcard': {self.field_name: wildcard_pattern}},
+                    {'bool': {'must_not': {'exists': {'field': self.field_name}}}},
+                ],
+                'minimum_should_match': 1,
+            }
+        }
+
+    # ----------------------------------------------------------------------
+    def _get_wildcard_pattern(self):
+        literal = _get_literal(self.pattern)
+        if literal is not None:
+            return f'*{_escape_wildcard(literal)}*'
+
+        if self.pattern.startswith('^'):
+            literal = _get_literal(self.pattern[1:])
+            if literal is not None:
+                return f'{_escape_wildcard(literal)}*'
+
+        return None
+
+    # ----------------------------------------------------------------------
+    def matches(self, source):
+        value = get_document_field(source, self.field_name)
+        if value is None:
+            return False
+        if isinstance(value, list):
+            return any(self.regex.search(str(element)) for element in value)
+        return self.regex.search(str(value)) is not None
+
+
+########################################################################
+class DocumentMatcher:
+    """
+    Filter documents by regular expressions on their fields ("--match FIELD~REGEX"),
+    a document is kept if all expressions match.
+
+    Patterns on keyword fields which can be expressed as Elasticsearch query (literals and
+    literal prefixes like "^GET /api") are searched by Elasticsearch as well via
+    `filter_queries` (see `set_keyword_fields()`), to fetch only matching documents.
+    All patterns are evaluated on the fetched documents anyway, so documents which are
+    not excluded by Elasticsearch (e.g. values longer than "ignore_above" are not indexed)
+    cannot pass either. A field with several values of which only some are indexed might
+    still be excluded although a value which is not indexed would match.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, expressions):
+        self._field_matches = [self._parse_expression(expression) for expression in expressions]
+        self._filter_queries = []
+        self._checked_documents = 0
+        self._matched_documents = 0
+
+    # ----------------------------------------------------------------------
+    def _parse_expression(self, expression):
+        field_name, separator, pattern = expression.partition(MATCH_EXPRESSION_SEPARATOR)
+        if not separator or not field_name:
+            raise InvalidMatchExpressionError(
+                f'Invalid match expression "{expression}", expected FIELD~REGEX')
+
+        try:
+            return FieldMatch(field_name, pattern)
+        except re.error as exc:
+            raise InvalidMatchExpressionError(
+                f'Invalid regular expression in match expression "{expression}": {exc}') from exc
+
+    # ----------------------------------------------------------------------
+    @property
+    def field_names(self):
+        return sorted({field_match.field_name for field_match in self._field_matches})
+
+    # ----------------------------------------------------------------------
+    def set_keyword_fields(self, keyword_field_names):
+        """Push down the patterns on `keyword_field_names` (mapped as keyword in all indices)"""
+        self._filter_queries = []
+        for field_match in self._field_matches:
+            if field_match.field_name in keyword_field_names:
+                filter_query = field_match.factor_keyword_filter_query()
+                if filter_query is not None:
+                    self._filter_queries.append(filter_query)
+
+    # ----------------------------------------------------------------------
+    @property
+    def filter_queries(self):
+        return self._filter_queries
+
+    # ----------------------------------------------------------------------
+    @property
+    def pushdown_ratio(self):
+        """Share of the expressions searched by Elasticsearch as well"""
+        if not self._field_matches:
+            return 0.0
+        return len(self._filter_queries) / len(self._field_matches)
+
+    # ----------------------------------------------------------------------
+    @property
+    def checked_documents(self):
+        return self._checked_documents
+
+    # ----------------------------------------------------------------------
+    @property
+    def matched_documents(self):
+        return self._matched_documents
+
+    # ----------------------------------------------------------------------
+    def filter(self, documents):
+        matched_documents = [
+            document
+            for document in documents
+            if all(field_match.matches(document['_source']) for field_match in self._field_matches)]
+        self._checked_documents += len(documents)
+        self._matched_documents += len(matched_documents)
+        return matched_documents
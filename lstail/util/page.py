@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.constants import LSTAIL_FALLBACK_FIELD_VALUE, TERM_COLORS
+from lstail.error import DocumentNotPageableError
+from lstail.util.document import truncate_field_value
+from lstail.util.safe_munch import DefaultSafeMunch
+
+
+# marker for columns not found in a document
+MISSING = object()
+# values which are converted before formatting by safe_munchify()
+PAGE_CONTAINER_TYPES = (dict, list, tuple, set)
+# attribute names of the document values (and the values themselves) which are resolved
+# differently by format(), so documents with such column names are printed one by one
+PAGE_RESERVED_NAMES = frozenset(
+    name
+    for type_ in (DefaultSafeMunch, str, int, float, bool, list, tuple, set, type(None))
+    for name in dir(type_)) | {'_data', '__default__'}
+
+
+# ----------------------------------------------------------------------
+def is_page_column_supported(page_column):
+    if '{' in page_column.format_spec or '}' in page_column.format_spec:
+        return False
+
+    for name, path in page_column.paths:
+        # names with a special meaning in format strings
+        if any(character in name for character in '[]{}:!'):
+            return False
+        if path[0].isdigit() or path[0] in TERM_COLORS:
+            return False
+        if any(not key or key in PAGE_RESERVED_NAMES for key in path):
+            return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def has_nested_names(names):
+    """Check whether any of the dotted `names` is a prefix of another (e.g. "a" and "a.b")"""
+    paths = {tuple(name.split('.')) for name in names}
+    return any(path[:length] in paths for path in paths for length in range(1, len(path)))
+
+
+# ----------------------------------------------------------------------
+def get_page_leaf_value(values, path):
+    """
+    Get the value of `path` from the document `values` (a ChainMap with the document source
+    as last map) like looking up the path in the flattened keys of the document values,
+    MISSING if there is no such (non-dict) value
+    """
+    containers = [values.maps[-1]]
+    value = values.get(path[0], MISSING)
+    for key in path[1:]:
+        if not isinstance(value, dict):
+            break
+        containers.append(value)
+        value = value.get(key, MISSING)
+    else:
+        if not isinstance(value, dict):
+            return value
+
+    # keys containing dots are ambiguous in the flattened keys
+    if len(path) > 1 and any('.' in key for container in containers for key in container):
+        raise DocumentNotPageableError()
+    return MISSING
+
+
+# ----------------------------------------------------------------------
+def get_page_value_like_format(values, path):
+    # like format() resolves the path on the document values with the fallback value
+    value = values.get(path[0], LSTAIL_FALLBACK_FIELD_VALUE)
+    for key in path[1:]:
+        if not isinstance(value, dict):
+            return LSTAIL_FALLBACK_FIELD_VALUE
+        value = value.get(key, LSTAIL_FALLBACK_FIELD_VALUE)
+    return value
+
+
+# ----------------------------------------------------------------------
+def get_csv_page_value(values, page_column):
+    # like attrgetter() on the document values
+    value = values.get(page_column.path[0], LSTAIL_FALLBACK_FIELD_VALUE)
+    for key in page_column.path[1:]:
+        if not isinstance(value, dict):
+            raise DocumentNotPageableError()
+        value = value.get(key, LSTAIL_FALLBACK_FIELD_VALUE)
+
+    if isinstance(value, PAGE_CONTAINER_TYPES):
+        raise DocumentNotPageableError()
+    if page_column.max_length:
+        value = truncate_field_value(value, page_column.max_length)
+    return value
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+
+########################################################################
+class AdaptivePageSizeController:
+    """
+    Calculate the number of documents to request per page from the observed average
+    document size and response latency. The page size is the largest size which satisfies:
+    - the expected response size does not exceed target_bytes
+    - the expected response size does not exceed max_bytes (to limit peak memory usage)
+    - the expected response time does not exceed target_latency
+    - the page size is between min_size and max_size
+    """
+
+    _smoothing_factor = 0.3  # weight of the latest observation for the average document size
+    _max_growth_factor = 2  # grow the page size slowly to not overshoot the latency target
+
+    # ----------------------------------------------------------------------
+    def __init__(
+            self,
+            *,
+            initial_size,
+            min_size,
+            max_size,
+            target_bytes,
+            max_bytes,
+            target_latency):
+        self._min_size = min_size
+        self._max_size = max_size
+        self._target_bytes = target_bytes
+        self._max_bytes = max_bytes
+        self._target_latency = target_latency
+        self._average_document_size = None
+        self._size = max(min(initial_size, max_size), min_size)
+
+    # ----------------------------------------------------------------------
+    @property
+    def size(self):
+        return self._size
+
+    # ----------------------------------------------------------------------
+    @property
+    def average_document_size(self):
+        return self._average_document_size
+
+    # ----------------------------------------------------------------------
+    def update(self, document_count, response_size, duration):
+        if not document_count or not response_size:
+            return  # nothing to learn from an empty response
+
+        self._update_average_document_size(response_size / document_count)
+
+        sizes = [
+            self._target_bytes / self._average_document_size,
+            self._max_bytes / self._average_document_size,
+            self._max_size,
+            self._size * self._max_growth_factor,
+        ]
+        # only full pages tell about the latency of a page, smaller responses are dominated
+        # by the fixed overhead of a request
+        if document_count >= self._size and duration and duration > 0:
+            # assume the response time grows linearly with the number of documents
+            sizes.append(document_count * self._target_latency / duration)
+
+        self._size = max(int(min(sizes)), self._min_size)
+
+    # ----------------------------------------------------------------------
+    def _update_average_document_size(self, document_size):
+        if self._average_document_size is None:
+            self._average_document_size = document_size
+        else:
+            self._average_document_size = \
+                self._smoothing_factor * document_size + \
+                (1 - self._smoothing_factor) * self._average_document_size
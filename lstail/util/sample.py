@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from zlib import crc32
+
+from lstail.error import InvalidSampleRateError
+
+
+# ----------------------------------------------------------------------
+def parse_sample_rate(sample_rate):
+    """Parse a sample rate as fraction ("0.01") or percentage ("1%") into a fraction"""
+    value = sample_rate.strip()
+    divisor = 1
+    if value.endswith('%'):
+        value = value[:-1]
+        divisor = 100
+    try:
+        rate = float(value) / divisor
+    except ValueError:
+        rate = None
+
+    if rate is None or not 0 < rate <= 1:
+        raise InvalidSampleRateError(
+            f'Invalid sample rate specified: {sample_rate}. Valid examples are: 0.01, 1%')
+    return rate
+
+
+# ----------------------------------------------------------------------
+def format_sample_rate(rate):
+    return f'{rate * 100:g}%'
+
+
+########################################################################
+class DocumentSampler:
+    """
+    Select a sample of `rate` of the documents locally, if Elasticsearch cannot.
+
+    Documents are selected by a hash of their ID, so the same documents are selected
+    each time they are fetched (e.g. for overlapping time ranges).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, rate):
+        self._threshold = int(rate * 0x100000000)
+
+    # ----------------------------------------------------------------------
+    def is_sampled(self, document):
+        return crc32(document['_id'].encode('utf-8')) < self._threshold
+
+    # ----------------------------------------------------------------------
+    def filter(self, documents):
+        return [document for document in documents if self.is_sampled(document)]
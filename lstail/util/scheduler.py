@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from time import monotonic, sleep
+
+
+########################################################################
+class AdaptivePollScheduler:
+    """
+    Calculate the time to wait until the next poll based on the result of the last poll:
+    - a full page indicates more documents are waiting, so poll again after min_interval
+    - documents were found, poll again after the configured interval
+    - no documents were found, back off exponentially up to max_interval
+
+    The waiting time is measured from the start of the last poll, i.e. the time spent
+    for fetching and printing the documents is subtracted.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, interval, min_interval, max_interval, backoff_factor):
+        self._interval = interval
+        self._min_interval = min(min_interval, interval)
+        self._max_interval = max(max_interval, interval)
+        self._backoff_factor = backoff_factor
+        self._next_interval = interval
+        self._empty_polls = 0
+        self._poll_started_at = None
+
+    # ----------------------------------------------------------------------
+    @property
+    def next_interval(self):
+        return self._next_interval
+
+    # ----------------------------------------------------------------------
+    def start_poll(self):
+        self._poll_started_at = monotonic()
+
+    # ----------------------------------------------------------------------
+    def update(self, document_count, page_size):
+        self._update(document_count, bool(page_size and document_count >= page_size))
+
+    # ----------------------------------------------------------------------
+    def update_for_pages(self, pages):
+        """Update from several pages of the same poll, given as (document_count, page_size)"""
+        document_count = 0
+        full_page = False
+        for page_document_count, page_size in pages:
+            document_count += page_document_count
+            full_page = full_page or bool(page_size and page_document_count >= page_size)
+        self._update(document_count, full_page)
+
+    # ----------------------------------------------------------------------
+    def _update(self, document_count, full_page):
+        if full_page:
+            self._empty_polls = 0
+            self._next_interval = self._min_interval
+        elif document_count:
+            self._empty_polls = 0
+            self._next_interval = self._interval
+        else:
+            self._back_off()
+
+    # ----------------------------------------------------------------------
+    def _back_off(self):
+        if self._next_interval < self._max_interval:
+            self._empty_polls += 1  # stop counting once at the maximum to not overflow
+        interval = self._interval * self._backoff_factor ** self._empty_polls
+        self._next_interval = min(interval, self._max_interval)
+
+    # ----------------------------------------------------------------------
+    def record_error(self):
+        self._back_off()
+
+    # ----------------------------------------------------------------------
+    def get_wait_time(self):
+        if self._poll_started_at is None:
+            return self._next_interval
+
+        elapsed = monotonic() - self._poll_started_at
+        return max(self._next_interval - elapsed, 0.0)
+
+    # ----------------------------------------------------------------------
+    def wait(self):
+        wait_time = self.get_wait_time()
+        if wait_time > 0:
+            sleep(wait_time)
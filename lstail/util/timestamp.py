@@ -9,8 +9,14 @@ from lstail.constants import ELASTICSEARCH_TIMESTAMP_FORMATS
 from lstail.error import InvalidTimeRangeFormatError, InvalidTimestampFormatError
 
 
+# sort values of the time field are milliseconds since the epoch (UTC)
+SORT_VALUE_EPOCH = datetime(1970, 1, 1)
+SORT_VALUE_MIN_MILLISECONDS = (datetime.min - SORT_VALUE_EPOCH) // timedelta(milliseconds=1)
+SORT_VALUE_MAX_MILLISECONDS = (datetime.max - SORT_VALUE_EPOCH) // timedelta(milliseconds=1)
+
+
 # ----------------------------------------------------------------------
-def parse_and_convert_time_range_to_start_date_time(time_range):
+def parse_time_range_to_seconds(time_range):
     error_message = f'Invalid time range specified: {time_range}. ' \
         'Valid examples are: 60, 5m, 12h, 7d'
 
@@ -37,6 +43,12 @@ def parse_and_convert_time_range_to_start_date_time(time_range):
     if value < 0:
         raise InvalidTimeRangeFormatError(error_message)
 
+    return seconds
+
+
+# ----------------------------------------------------------------------
+def parse_and_convert_time_range_to_start_date_time(time_range):
+    seconds = parse_time_range_to_seconds(time_range)
     return datetime.now() - timedelta(seconds=seconds)
 
 
@@ -50,3 +62,22 @@ def parse_timestamp_from_elasticsearch(timestamp):
 
     # we didn't find any matching format, so cry
     raise InvalidTimestampFormatError(timestamp)
+
+
+# ----------------------------------------------------------------------
+def get_timestamp_from_sort_value(document):
+    """
+    Return the time of the document from its sort value as returned by Elasticsearch for
+    queries sorted by the time field (epoch milliseconds) or None if there is none
+    """
+    sort_values = document.get('sort')
+    if not sort_values:
+        return None
+
+    milliseconds = sort_values[0]
+    # documents without the time field get the minimum/maximum long value
+    if not isinstance(milliseconds, int) or \
+            not SORT_VALUE_MIN_MILLISECONDS <= milliseconds <= SORT_VALUE_MAX_MILLISECONDS:
+        return None
+
+    return SORT_VALUE_EPOCH + timedelta(milliseconds=milliseconds)
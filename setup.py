@@ -42,6 +42,10 @@ setup(
     keywords='logging logs logstash query tail log-viewer cli',
     python_requires='>=3.9',
     install_requires=['prompt-toolkit'],
+    extras_require={
+        'zstd': ['zstandard'],
+        'lz4': ['lz4'],
+    },
     packages=['lstail'],
     include_package_data=True,
     entry_points={
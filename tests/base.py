@@ -10,6 +10,7 @@ import unittest
 from prompt_toolkit.completion import Completion
 
 from lstail.dto.column import Column
+from lstail.dto.response import ResponseStats
 from lstail.dto.server import Server
 
 
@@ -38,12 +39,22 @@ class BaseTestCase(unittest.TestCase):
         # provide a mocked logger for easy use
         self._mocked_logger = mock.MagicMock(spec=logging)
 
+    # ----------------------------------------------------------------------
+    def _factor_mocked_http_handler(self, response_size=100, duration=0.1):
+        """Mock the HTTP handler, responses with stats are returned from mocked request()"""
+        http_handler = mock.Mock()
+        http_handler.request_with_stats.side_effect = lambda *args, **kwargs: (
+            http_handler.request(*args, **kwargs),
+            ResponseStats(response_size, duration))
+        return http_handler
+
     # ----------------------------------------------------------------------
     def _compare_column_object(self, first, second, msg=None):
         self.assertEqual(first.names, second.names, msg=msg)
         self.assertEqual(first.color, second.color, msg=msg)
         self.assertEqual(first.display, second.display, msg=msg)
         self.assertEqual(first.padding, second.padding, msg=msg)
+        self.assertEqual(first.max_length, second.max_length, msg=msg)
 
     # ----------------------------------------------------------------------
     def _compare_server_object(self, first, second, msg=None):
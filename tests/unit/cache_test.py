@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime, timedelta
+from tempfile import TemporaryDirectory
+import os
+
+from freezegun import freeze_time
+
+from lstail.cache import HitCache
+from lstail.constants import ELASTICSEARCH_TIMESTAMP_FORMAT
+from lstail.util.timestamp import parse_timestamp_from_elasticsearch
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+
+NOW = datetime(2018, 2, 22, 22, 0)
+
+
+# ----------------------------------------------------------------------
+def _factor_document(document_id, minutes_ago):
+    timestamp = NOW - timedelta(minutes=minutes_ago)
+    return dict(
+        _id=document_id,
+        _source={'@timestamp': timestamp.strftime(ELASTICSEARCH_TIMESTAMP_FORMAT)})
+
+
+# ----------------------------------------------------------------------
+def _get_timestamp(document):
+    return parse_timestamp_from_elasticsearch(document['_source']['@timestamp'])
+
+
+class HitCacheTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        super().setUp()
+        self._temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        # documents in Elasticsearch, newest first
+        self._documents = [_factor_document(str(minutes), minutes) for minutes in range(0, 120)]
+        self._fetched_time_ranges = []
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        self._temp_dir.cleanup()
+        super().tearDown()
+
+    # ----------------------------------------------------------------------
+    def _fetch(self, timestamp_from, timestamp_to, size):
+        self._fetched_time_ranges.append((timestamp_from, timestamp_to))
+        documents = []
+        for document in self._documents:
+            timestamp = _get_timestamp(document)
+            if timestamp_from < timestamp and (timestamp_to is None or timestamp <= timestamp_to):
+                documents.append(document)
+        return documents[:size]
+
+    # ----------------------------------------------------------------------
+    def _search(self, hit_cache, minutes, size):
+        with freeze_time(NOW):
+            return hit_cache.search(
+                NOW - timedelta(minutes=minutes),
+                size,
+                self._fetch,
+                _get_timestamp)
+
+    # ----------------------------------------------------------------------
+    def _factor_hit_cache(self, fingerprint='fingerprint', max_size=1024 * 1024):
+        return HitCache(self._temp_dir.name, fingerprint, self._mocked_logger, max_size)
+
+    # ----------------------------------------------------------------------
+    def test_search_overlapping_time_ranges(self):
+        documents = self._search(self._factor_hit_cache(), minutes=30, size=1000)
+        self.assertEqual(documents, self._documents[:30])
+        self.assertEqual(self._fetched_time_ranges, [(NOW - timedelta(minutes=30), None)])
+
+        # a larger time range: only the older part and the latest minute are fetched
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=60, size=1000)
+        self.assertEqual(documents, self._documents[:60])
+        self.assertEqual(
+            self._fetched_time_ranges,
+            [
+                (NOW - timedelta(minutes=1), None),
+                (NOW - timedelta(minutes=60), NOW - timedelta(minutes=30)),
+            ])
+
+        # a smaller time range is served from the cache except the latest minute
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=45, size=1000)
+        self.assertEqual(documents, self._documents[:45])
+        self.assertEqual(self._fetched_time_ranges, [(NOW - timedelta(minutes=1), None)])
+
+    # ----------------------------------------------------------------------
+    def test_search_full_page(self):
+        documents = self._search(self._factor_hit_cache(), minutes=60, size=10)
+        self.assertEqual(documents, self._documents[:10])
+
+        # only the time range after the oldest fetched document is complete
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=60, size=20)
+        self.assertEqual(documents, self._documents[:20])
+        self.assertEqual(
+            self._fetched_time_ranges,
+            [
+                (NOW - timedelta(minutes=1), None),
+                (NOW - timedelta(minutes=60), NOW - timedelta(minutes=9)),
+            ])
+
+    # ----------------------------------------------------------------------
+    def test_search_corrupt_cache(self):
+        self._search(self._factor_hit_cache(), minutes=30, size=1000)
+        search_directory = os.path.join(self._temp_dir.name, 'fingerprint')
+        for file_name in os.listdir(search_directory):
+            if file_name.endswith('.seg'):
+                with open(os.path.join(search_directory, file_name), 'wb') as segment_file:
+                    segment_file.write(b'garbage')
+
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=30, size=1000)
+
+        self.assertEqual(documents, self._documents[:30])
+        self.assertEqual(self._fetched_time_ranges[-1], (NOW - timedelta(minutes=30), None))
+        self._mocked_logger.warning.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_evict_least_recently_used_searches(self):
+        self._search(self._factor_hit_cache('first'), minutes=30, size=1000)
+        self._search(self._factor_hit_cache('second'), minutes=30, size=1000)
+        first_directory = os.path.join(self._temp_dir.name, 'first')
+        second_directory = os.path.join(self._temp_dir.name, 'second')
+        os.utime(os.path.join(first_directory, 'index.json'), (0, 0))
+
+        # the cache is too small for both searches, the least recently used one is removed
+        self._search(self._factor_hit_cache('second', max_size=1), minutes=60, size=1000)
+
+        self.assertFalse(os.path.exists(first_directory))
+        self.assertTrue(os.path.exists(second_directory))
+
+    # ----------------------------------------------------------------------
+    def test_search_marks_search_as_used(self):
+        self._search(self._factor_hit_cache(), minutes=30, size=1000)
+        index_path = os.path.join(self._temp_dir.name, 'fingerprint', 'index.json')
+        os.utime(index_path, (0, 0))
+
+        # served from the cache without writing the index
+        self._search(self._factor_hit_cache(), minutes=20, size=1000)
+
+        self.assertGreater(os.stat(index_path).st_mtime, 0)
+
+    # ----------------------------------------------------------------------
+    def test_merge_adjacent_segments(self):
+        hit_cache = self._factor_hit_cache()
+        self._search(hit_cache, minutes=30, size=1000)
+        self._search(hit_cache, minutes=60, size=1000)
+
+        self.assertEqual(len(hit_cache._segments), 1)
+        segment = hit_cache._segments[0]
+        self.assertEqual(segment['timestamp_from'], NOW - timedelta(minutes=60))
+        self.assertEqual(segment['timestamp_to'], NOW - timedelta(minutes=1))
+        search_directory = os.path.join(self._temp_dir.name, 'fingerprint')
+        self.assertEqual(
+            sorted(os.listdir(search_directory)),
+            sorted(['index.json', segment['file_name']]))
+
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=60, size=1000)
+        self.assertEqual(documents, self._documents[:60])
+        self.assertEqual(self._fetched_time_ranges, [(NOW - timedelta(minutes=1), None)])
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.cache.HIT_CACHE_BLOCK_DOCUMENTS', 10)
+    def test_drop_oldest_documents_of_current_search(self):
+        self._search(self._factor_hit_cache(), minutes=60, size=1000)
+        search_directory = os.path.join(self._temp_dir.name, 'fingerprint')
+        size = sum(entry.stat().st_size for entry in os.scandir(search_directory))
+
+        # the current search alone is too large: its oldest blocks are removed
+        hit_cache = self._factor_hit_cache(max_size=size - 1)
+        self._search(hit_cache, minutes=90, size=1000)
+
+        total_size = sum(entry.stat().st_size for entry in os.scandir(search_directory))
+        self.assertLessEqual(total_size, size - 1)
+        self.assertEqual(len(hit_cache._segments), 1)
+        segment = hit_cache._segments[0]
+        self.assertEqual(segment['timestamp_to'], NOW - timedelta(minutes=1))
+        self.assertGreater(segment['timestamp_from'], NOW - timedelta(minutes=90))
+
+        # the newest documents are still served from the cache
+        self._fetched_time_ranges = []
+        documents = self._search(self._factor_hit_cache(), minutes=90, size=1000)
+        self.assertEqual(documents, self._documents[:90])
+        self.assertEqual(
+            self._fetched_time_ranges,
+            [
+                (NOW - timedelta(minutes=1), None),
+                (NOW - timedelta(minutes=90), segment['timestamp_from']),
+            ])
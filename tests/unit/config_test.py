@@ -40,10 +40,13 @@ default_saved_search =
 '''
 CONFIG_FILE_GENERAL_SET = '''
 [general]
+backpressure = skip
+backpressure_max_lag = 30
 initial_query_size = 99
 initial_time_range = 48h
 no_header = true
 header_color = red
+highlight_terms = req-42, ERROR
 refresh_interval = 1.4
 timeout = 5.1
 verbose = true
@@ -115,6 +118,7 @@ class ConfigTest(BaseTestCase):
             no_header=None,
             debug=None,
             csv_output=None,
+            fan_out=None,
             verbose=None,
             initial_query_size=None,
             initial_time_range=None)
@@ -143,6 +147,7 @@ class ConfigTest(BaseTestCase):
             self.assertEqual(server.url, f'http://127.0.0.{index}:9200')
             self.assertEqual(server.username, f'logstash{index}')
             self.assertEqual(server.password, f'secret{index}')
+            self.assertEqual(server.group, f'test_server{index}')
             found_header_key1 = False
             found_header_key2 = False
             for key, value in server.headers:
@@ -205,7 +210,8 @@ class ConfigTest(BaseTestCase):
             names=['geoip.as_org'],
             display=True,
             color=get_column_color_key(None),
-            padding='25')
+            padding='25',
+            max_length=200)
 
         expected_columns = OrderedDict()
         expected_columns['timestamp'] = column_timestamp
@@ -220,6 +226,13 @@ class ConfigTest(BaseTestCase):
             expected_column = expected_columns.get(column_name, None)
             self.assertEqual(test_column, expected_column)
 
+    # ----------------------------------------------------------------------
+    def test_config_display_invalid_max_length(self):
+        parser = LstailConfigParser(mock.Mock())
+        for max_length in ('many', '0'):
+            with self.assertRaises(RuntimeError):
+                parser._parse_column_max_length(max_length, 'display_column_message')
+
     # ----------------------------------------------------------------------
     def test_config_general_missing(self):
         test_args = mock.Mock()
@@ -438,6 +451,65 @@ class ConfigTest(BaseTestCase):
             parser._override_config_options_from_command_line()
             self.assertEqual(parser._config.initial_query_size, 56)
 
+    # ----------------------------------------------------------------------
+    def test_config_highlight_terms(self):
+        test_args = mock.Mock(highlight_terms=None)
+        section = 'general'
+
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_false):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.highlight_terms, [])
+
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_set):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.highlight_terms, ['req-42', 'ERROR'])
+
+        # emulate --highlight command line flag
+        test_args = mock.Mock(highlight_terms=['web01'])
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_set):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.highlight_terms, ['web01'])
+
+    # ----------------------------------------------------------------------
+    def test_config_backpressure(self):
+        test_args = mock.Mock(backpressure=None)
+        section = 'general'
+
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_false):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.backpressure, 'block')
+            self.assertEqual(parser._config.backpressure_max_lag, 60.0)
+
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_set):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.backpressure, 'skip')
+            self.assertEqual(parser._config.backpressure_max_lag, 30.0)
+
+        # emulate --backpressure command line flag
+        test_args = mock.Mock(backpressure='sample')
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_set):
+            parser = self._setup_test_parser(test_args)
+            parser._parse_general_settings(section)
+            parser._override_config_options_from_command_line()
+            self.assertEqual(parser._config.backpressure, 'sample')
+
+    # ----------------------------------------------------------------------
+    def test_config_backpressure_invalid(self):
+        with mock.patch.object(LstailConfigParser, '_read_config', new=read_config_set):
+            parser = self._setup_test_parser(mock.Mock())
+            with self.assertRaises(RuntimeError):
+                parser._parse_backpressure_policy('drop', 'general')
+
     # ----------------------------------------------------------------------
     def test_config_initial_time_range(self):
         test_args = mock.Mock(initial_time_range=None)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from freezegun import freeze_time
+
+from lstail.dto.configuration import Configuration
+from lstail.dto.server import Server
+from lstail.fanout import FanOutLogstashReader
+from lstail.reader import LogstashReader
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def _factor_server(name, group):
+    server = Server()
+    server.name = name
+    server.group = group
+    return server
+
+
+# ----------------------------------------------------------------------
+def _factor_document(document_id, timestamp):
+    return dict(_id=document_id, _source={'@timestamp': timestamp})
+
+
+class FanOutLogstashReaderTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_reader(self):
+        config = Configuration()
+        config.fan_out_reorder_window = 5
+        config.servers = deque([
+            _factor_server('eu1', 'eu'),
+            _factor_server('us1', 'us'),
+            _factor_server('eu2', 'eu'),
+        ])
+        reader = FanOutLogstashReader(config)
+        reader._logger = self._mocked_logger
+        reader._setup_readers()
+        for group_reader in reader._readers.values():
+            group_reader._base_query = mock.Mock(time_field_name='@timestamp')
+        reader._print_documents = mock.Mock()
+        return reader
+
+    # ----------------------------------------------------------------------
+    def test_setup_readers(self):
+        reader = self._factor_reader()
+
+        self.assertEqual(list(reader._readers), ['eu', 'us'])
+        eu_servers = reader._readers['eu']._config.servers
+        self.assertEqual([server.name for server in eu_servers], ['eu1', 'eu2'])
+        us_servers = reader._readers['us']._config.servers
+        self.assertEqual([server.name for server in us_servers], ['us1'])
+        self.assertIsInstance(reader._readers['us'], LogstashReader)
+
+    # ----------------------------------------------------------------------
+    def test_print_merged_documents(self):
+        reader = self._factor_reader()
+        eu_reader = reader._readers['eu']
+        eu_reader._documents = [
+            _factor_document('eu-1', '2018-02-22T22:22:01.000Z'),
+            _factor_document('eu-2', '2018-02-22T22:22:03.000Z'),
+        ]
+        eu_reader._last_timestamp = datetime(2018, 2, 22, 22, 22, 3)
+        us_reader = reader._readers['us']
+        us_reader._documents = [_factor_document('us-1', '2018-02-22T22:22:02.000Z')]
+        us_reader._last_timestamp = datetime(2018, 2, 22, 22, 22, 2)
+
+        reader._add_pending_documents('eu', eu_reader)
+        reader._add_pending_documents('us', us_reader)
+        with freeze_time(datetime(2018, 2, 22, 22, 22, 4)):
+            reader._print_merged_documents()
+
+        # "eu-2" is held back until "us" has been queried up to its timestamp
+        documents = reader._print_documents.call_args[0][0]
+        self.assertEqual([document['_id'] for document in documents], ['eu-1', 'us-1'])
+        self.assertEqual([document['_source']['cluster'] for document in documents], ['eu', 'us'])
+
+        # but not longer than the reorder window
+        with freeze_time(datetime(2018, 2, 22, 22, 22, 8)):
+            reader._print_merged_documents()
+        documents = reader._print_documents.call_args[0][0]
+        self.assertEqual([document['_id'] for document in documents], ['eu-2'])
+
+    # ----------------------------------------------------------------------
+    def test_print_merged_documents_flush(self):
+        reader = self._factor_reader()
+        eu_reader = reader._readers['eu']
+        eu_reader._documents = [_factor_document('eu-1', '2018-02-22T22:22:01.000Z')]
+        eu_reader._last_timestamp = datetime(2018, 2, 22, 22, 22, 1)
+        reader._readers['us']._last_timestamp = datetime(2018, 2, 22, 22, 20)
+
+        reader._add_pending_documents('eu', eu_reader)
+        with freeze_time(datetime(2018, 2, 22, 22, 22, 2)):
+            reader._print_merged_documents(flush=True)
+
+        documents = reader._print_documents.call_args[0][0]
+        self.assertEqual([document['_id'] for document in documents], ['eu-1'])
+        self.assertEqual(reader._pending_documents, [])
+
+    # ----------------------------------------------------------------------
+    def test_fetch_pages_concurrently(self):
+        reader = self._factor_reader()
+        reader._logger = mock.Mock()
+        for group, group_reader in reader._readers.items():
+            group_reader._documents = [_factor_document(group, '2018-02-22T22:22:01.000Z')]
+            group_reader._fetch_page = mock.Mock()
+        reader._readers['us']._fetch_page.side_effect = RuntimeError('failed')
+
+        with ThreadPoolExecutor(max_workers=2) as reader._executor:
+            reader._fetch_pages_concurrently()
+
+        # the records of the workers are logged by this thread before the failed group
+        method_names = [name for name, _, _ in reader._logger.method_calls]
+        self.assertEqual(method_names[:2], ['flush', 'warning'])
+        self.assertEqual([document['_id'] for _, _, document in reader._pending_documents], ['eu'])
@@ -234,6 +234,24 @@ class HttpTest(BaseTestCase):
             # the response should match in any way, so check it
             self.assertEqual(result, dict(foo='bar'))
 
+    # ----------------------------------------------------------------------
+    def test_request_with_stats(self):
+        mocked_response = mock.MagicMock(status=200, spec=HTTPResponse)
+        mocked_response.read.return_value = b'{ "foo": "bar" }'
+        mocked_response.headers = mock.Mock()
+        mocked_response.headers.get_charset.return_value = 'utf-8'
+        http_client = ElasticsearchRequestController(
+            deque(TEST_SERVERS), TEST_TIMEOUT, None, False, self._mocked_logger)
+
+        with mock.patch.object(http_client, '_url_opener') as mock_url_opener, \
+                mock.patch.object(http_client, '_calculate_call_duration', return_value=0.5):
+            mock_url_opener.open.return_value = mocked_response
+            result, stats = http_client.request_with_stats('/', data=None)
+
+        self.assertEqual(result, dict(foo='bar'))
+        self.assertEqual(stats.size, 16)
+        self.assertEqual(stats.duration, 0.5)
+
     # ----------------------------------------------------------------------
     def test_valid_server_url(self):
         http_client = ElasticsearchRequestController(
@@ -6,20 +6,25 @@
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
+from json import loads
+from threading import Thread
 import logging
 import sys
 
 from ddt import data, ddt
 from freezegun import freeze_time
 
-from lstail.constants import PROGRAM_NAME
+from lstail.constants import OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_NDJSON, PROGRAM_NAME, TERM_COLORS
 from lstail.dto.column import Column
 from lstail.dto.configuration import Configuration
 from lstail.logger import LstailLogger
-from tests.base import BaseTestCase
+from lstail.sink import FileSink
+from tests.base import BaseTestCase, mock
 
 
+# pylint: disable=protected-access,too-many-public-methods
+
 CONFIG = Configuration()
 CONFIG.debug = False
 CONFIG.no_header = True
@@ -205,6 +210,22 @@ class LoggerOutputTest(BaseTestCase):
         expected_output = self._factor_log_output(test_string, verbose=verbose, level='CRITICAL')
         self._test_log('critical', test_string, expected_output, verbose)
 
+    # ----------------------------------------------------------------------
+    def test_log_from_other_thread(self):
+        output = StringIO()
+        expected_output = self._factor_log_output('from thread', verbose=True, level='WARNING')
+
+        with freeze_time(LOG_DATETIME):
+            logger = LstailLogger(CONFIG, output=output, verbose=True)
+            thread = Thread(target=logger.warning, args=('from thread',))
+            thread.start()
+            thread.join()
+            # the record is kept until the owning thread writes again
+            self.assertEqual(output.getvalue(), '')
+            logger.flush()
+
+        self.assertEqual(output.getvalue().strip(), expected_output)
+
     # ----------------------------------------------------------------------
     def test_log_custom_output(self):
         test_string = 'custom output message'
@@ -245,3 +266,218 @@ class LoggerOutputTest(BaseTestCase):
         # check there is no output on default sys.stdout
         output = sys.stdout.getvalue().strip()  # pylint: disable=no-member
         self.assertEqual(output, '')
+
+    # ----------------------------------------------------------------------
+    def _factor_json_test_document(self):
+        return dict(
+            _id='1',
+            _source={
+                '@timestamp': '2018-02-22T22:22:42.000Z',
+                'log_level': 'error',
+                'logsource': 'localhost',
+                'program': 'lstail',
+                'message': 'json "output" message',
+                'nested': {'field': 'value'}})
+
+    # ----------------------------------------------------------------------
+    def test_log_document_json_output(self):
+        config = deepcopy(CONFIG)
+        config.no_header = False
+        config.json_output = OUTPUT_FORMAT_JSON
+
+        custom_output = StringIO()
+        logger = LstailLogger(config, output=custom_output, verbose=False)
+        logger.update_display_columns(['level', 'hostname', 'message', 'missing'])
+        logger.print_header()
+        logger.log_document(self._factor_json_test_document())
+
+        # no header, only the display columns with their raw values
+        output = custom_output.getvalue().splitlines()
+        self.assertEqual(len(output), 1)
+        self.assertEqual(
+            loads(output[0]),
+            dict(
+                timestamp='2018-02-22T22:22:42.000Z',
+                level='error',
+                hostname='localhost',
+                message='json "output" message',
+                missing=None))
+
+    # ----------------------------------------------------------------------
+    def test_log_document_ndjson_output(self):
+        config = deepcopy(CONFIG)
+        config.json_output = OUTPUT_FORMAT_NDJSON
+        document = self._factor_json_test_document()
+
+        custom_output = StringIO()
+        logger = LstailLogger(config, output=custom_output, verbose=False)
+        logger.update_display_columns(['message'])
+        logger.log_document(document)
+        # duplicates are still detected
+        logger.log_document(document)
+
+        output = custom_output.getvalue().splitlines()
+        self.assertEqual(loads(output[0]), document['_source'])
+        self.assertIn('Unparseable document', output[1])
+
+    # ----------------------------------------------------------------------
+    def test_log_document_rotate_output_by_event_time(self):
+        config = deepcopy(CONFIG)
+        config.json_output = OUTPUT_FORMAT_NDJSON
+        file_sink = mock.Mock(spec=FileSink, rotates_by_event_time=True)
+
+        logger = LstailLogger(config, output=file_sink, verbose=False)
+        logger.log_document(self._factor_json_test_document())
+
+        file_sink.set_event_time.assert_called_once_with(datetime(2018, 2, 22, 22, 22, 42))
+
+    # ----------------------------------------------------------------------
+    def test_log_document_timestamp_from_sort_value(self):
+        config = deepcopy(CONFIG)
+        custom_output = StringIO()
+        logger = LstailLogger(config, output=custom_output, verbose=False)
+        logger.update_display_columns(['message'])
+        logger.set_time_field_name('@timestamp')
+        document = dict(
+            _id='1',
+            # the sort value is used instead of parsing the timestamp
+            sort=[1519338162123],
+            _source={'@timestamp': 'unparseable', 'message': 'sorted'})
+
+        with mock.patch('lstail.logger.parse_timestamp_from_elasticsearch') as mock_parse:
+            logger.log_document(document)
+            # documents without sort values are still parsed
+            logger.log_document(self._factor_json_test_document())
+
+        output = custom_output.getvalue().splitlines()
+        self.assertTrue(output[0].startswith('2018-02-22T22:22:42.123 '))
+        mock_parse.assert_called_once_with('2018-02-22T22:22:42.000Z')
+
+    # ----------------------------------------------------------------------
+    @data(False, True)
+    def test_log_documents_like_log_document(self, csv_output):
+        config = deepcopy(CONFIG)
+        config.csv_output = csv_output
+        documents = [
+            self._factor_json_test_document(),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:43.000Z', 'log_level': 42}),
+            # printed on their own: duplicate, nested value, unparseable source
+            self._factor_json_test_document(),
+            dict(_id='3', _source={'@timestamp': '2018-02-22T22:22:44.000Z', 'message': {}}),
+            dict(_id='4', _source='unparseable'),
+        ]
+
+        outputs = []
+        for log_documents in (False, True):
+            custom_output = StringIO()
+            logger = LstailLogger(config, output=custom_output, verbose=False)
+            logger.update_display_columns(['level', 'hostname', 'nested.field', 'message'])
+            with freeze_time(LOG_DATETIME):
+                if log_documents:
+                    logger.log_documents(deepcopy(documents))
+                    # the columns have been handled page-wise
+                    self.assertTrue(logger._page_columns)
+                else:
+                    for document in deepcopy(documents):
+                        logger.log_document(document)
+            outputs.append(custom_output.getvalue())
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(outputs[1].splitlines()), len(documents))
+
+    # ----------------------------------------------------------------------
+    def test_log_documents_binary_output(self):
+        config = deepcopy(CONFIG)
+        document = self._factor_json_test_document()
+        document['_source']['message'] = 'bïnary output'
+        # the duplicate is printed on its own in between
+        documents = [document, document, dict(_id='2', _source=document['_source'])]
+
+        text_output = StringIO()
+        binary_buffer = BytesIO()
+        binary_output = TextIOWrapper(binary_buffer, encoding='utf-8')
+        for output in (text_output, binary_output):
+            logger = LstailLogger(config, output=output, verbose=False)
+            logger.update_display_columns(['hostname', 'message'])
+            with freeze_time(LOG_DATETIME):
+                logger.info('first')
+                logger.log_documents(deepcopy(documents))
+                logger.info('last')
+
+        binary_output.flush()
+        output = binary_buffer.getvalue().decode('utf-8')
+        self.assertEqual(output, text_output.getvalue())
+        self.assertEqual(len(output.splitlines()), 5)
+
+    # ----------------------------------------------------------------------
+    @data(False, True)
+    def test_log_document_max_length(self, csv_output):
+        config = deepcopy(CONFIG)
+        config.csv_output = csv_output
+        config.display.columns['message'] = Column(names=['message'], display=True, max_length=20)
+        document = self._factor_json_test_document()
+        document['_source']['message'] = 'x' * 100
+
+        outputs = []
+        for log_documents in (False, True):
+            custom_output = StringIO()
+            logger = LstailLogger(config, output=custom_output, verbose=False)
+            logger.update_display_columns(['message'])
+            if log_documents:
+                logger.log_documents([document])
+            else:
+                logger.log_document(document)
+            outputs.append(custom_output.getvalue())
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertTrue(outputs[0].rstrip().endswith('x' * 11 + '...[+89]'))
+
+    # ----------------------------------------------------------------------
+    def test_log_document_highlight(self):
+        config = deepcopy(CONFIG)
+        config.highlight_terms = ['localhost', 'output', 'put" m']
+        config.display.columns['hostname'] = Column(
+            names=['hostname', 'logsource'], color='_c_magenta', display=True, padding=10)
+        config.display.columns['message'] = Column(names=['message'], color=None, display=True)
+        document = self._factor_json_test_document()
+
+        outputs = []
+        for log_documents in (False, True):
+            custom_output = StringIO()
+            logger = LstailLogger(config, output=custom_output, verbose=False, use_colors=True)
+            logger.update_display_columns(['hostname', 'message'])
+            if log_documents:
+                logger.log_documents([deepcopy(document)])
+                self.assertTrue(logger._page_columns)
+            else:
+                logger.log_document(deepcopy(document))
+            outputs.append(custom_output.getvalue())
+
+        self.assertEqual(outputs[0], outputs[1])
+        # highlighted after padding, overlapping terms are highlighted at once
+        self.assertIn('\033[7mlocalhost\033[27m ', outputs[0])
+        self.assertIn('json "\033[7moutput" m\033[27message', outputs[0])
+
+    # ----------------------------------------------------------------------
+    def test_log_document_highlight_colored_message(self):
+        config = deepcopy(CONFIG)
+        config.highlight_terms = ['31', '[3', 'age']
+        config.display.columns['message'] = Column(names=['message'], color=None, display=True)
+        document = self._factor_json_test_document()
+
+        outputs = []
+        for log_documents in (False, True):
+            custom_output = StringIO()
+            logger = LstailLogger(config, output=custom_output, verbose=False, use_colors=True)
+            logger.update_display_columns(['level', 'message'])
+            # the shared terminal colors might have been cleared by other tests
+            with mock.patch.dict(TERM_COLORS, _c_red='\033[31m'):
+                if log_documents:
+                    logger.log_documents([deepcopy(document)])
+                else:
+                    logger.log_document(deepcopy(document))
+            outputs.append(custom_output.getvalue())
+
+        self.assertEqual(outputs[0], outputs[1])
+        # the color of the log level is not highlighted, only the message itself
+        self.assertIn('\033[31mjson "output" mess\033[7mage\033[27m', outputs[0])
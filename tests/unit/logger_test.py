@@ -51,6 +51,8 @@ LOG_DOCUMENT_CONFIG = mock.Mock(
     debug=False,
     verbose=False,
     csv_output=False,
+    fan_out=False,
+    multi_search=False,
     kibana=mock.Mock(default_columns=LOG_DOCUMENT_COLUMN_NAMES),
     format=mock.Mock(timestamp='%Y-%m-%dT%H:%M:%S.%f'),
     display=mock.Mock(columns=LOG_DOCUMENT_COLUMNS))
@@ -124,10 +126,26 @@ class LoggerTest(BaseTestCase):
         color_code = logger._get_column_color(column, force_color='_c_yellow')
         self.assertEqual(color_code, '_c_yellow')
 
+    # ----------------------------------------------------------------------
+    def test_factor_log_level_color_code(self):
+        config = mock.Mock()
+        config.parser.log_level_names_warning = ['warn', 'WARNING']
+        config.parser.log_level_names_error = ['Error', 'warn']
+        logger = LstailLogger(config, output=sys.stdout, verbose=False)
+
+        # log levels are matched case-insensitively, warning wins if configured for both
+        self.assertEqual(logger._factor_log_level_color_code('WARN'), '_c_yellow')
+        self.assertEqual(logger._factor_log_level_color_code('warning'), '_c_yellow')
+        self.assertEqual(logger._factor_log_level_color_code('ERROR'), '_c_red')
+        self.assertEqual(logger._factor_log_level_color_code('info'), '_c_reset')
+
     # ----------------------------------------------------------------------
     def test_update_display_columns(self):
         default_column_names = ['column1', 'column2']
-        config = mock.Mock(kibana=mock.Mock(default_columns=default_column_names))
+        config = mock.Mock(
+            fan_out=False,
+            multi_search=False,
+            kibana=mock.Mock(default_columns=default_column_names))
         logger = LstailLogger(config, output=sys.stdout, verbose=False)
 
         # columns = None
@@ -141,6 +159,20 @@ class LoggerTest(BaseTestCase):
         expected_columns = ['document_id', 'timestamp'] + test_columns
         self.assertEqual(logger._display_columns, expected_columns)
 
+    # ----------------------------------------------------------------------
+    def test_update_display_columns_fan_out(self):
+        config = mock.Mock(
+            debug=False,
+            fan_out=True,
+            multi_search=False,
+            kibana=mock.Mock(default_columns=['column1']))
+        logger = LstailLogger(config, output=sys.stdout, verbose=False)
+
+        logger.update_display_columns(columns=['test_col1'])
+
+        expected_columns = ['timestamp', 'cluster', 'test_col1']
+        self.assertEqual(logger._display_columns, expected_columns)
+
     # ----------------------------------------------------------------------
     def test_log_document_positive(self):
         logger = LstailLogger(LOG_DOCUMENT_CONFIG, output=sys.stdout, verbose=False)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from json import loads
+
+from lstail.constants import SORT_ORDER_ASCENDING
+from lstail.dto.configuration import Configuration
+from lstail.multisearch import MultiSearchLogstashReader
+from lstail.query.elasticsearch_7 import ElasticSearch7QueryBuilder
+from lstail.reader import LogstashReader
+from lstail.util.backpressure import BackpressureController
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def _factor_document(document_id, timestamp):
+    return dict(_id=document_id, _source={'@timestamp': timestamp})
+
+
+class MultiSearchLogstashReaderTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_reader(self):
+        config = Configuration()
+        config.initial_query_size = 10
+        config.narrow_indices = False
+        config.page_size_max = 10000
+        config.page_target_bytes = 1000
+        config.page_max_bytes = 10000
+        config.page_target_latency = 1.0
+        config.kibana.saved_searches = ['search1', 'search2']
+        reader = MultiSearchLogstashReader(config)
+        reader._logger = self._mocked_logger
+        reader._http_handler = self._factor_mocked_http_handler(response_size=300, duration=0.3)
+        reader._readers = {}
+        for index, saved_search in enumerate(config.kibana.saved_searches):
+            search_reader = LogstashReader(config)
+            search_reader._logger = self._mocked_logger
+            search_reader._http_handler = reader._http_handler
+            search_reader._query_builder = ElasticSearch7QueryBuilder(
+                f'logstash{index}-*', None, None, None, reader._http_handler, self._mocked_logger)
+            search_reader._base_query = search_reader._query_builder.build()
+            search_reader._setup_index_resolver()
+            search_reader._setup_page_size_controller()
+            search_reader._setup_processed_documents_index()
+            search_reader._last_timestamp = datetime(2018, 2, 22, 22, 22, 42)
+            reader._readers[saved_search] = search_reader
+        return reader
+
+    # ----------------------------------------------------------------------
+    def test_fetch_multi_search_pages(self):
+        reader = self._factor_reader()
+        reader._http_handler.request.return_value = dict(responses=[
+            dict(hits=dict(hits=[
+                _factor_document('2', '2018-02-22T22:22:45.000Z'),
+                _factor_document('1', '2018-02-22T22:22:43.000Z'),
+            ])),
+            dict(hits=dict(hits=[_factor_document('3', '2018-02-22T22:22:44.000Z')])),
+        ])
+
+        reader._fetch_multi_search_pages()
+        documents = reader._merge_documents()
+
+        # one request for all saved searches
+        path, request_body = reader._http_handler.request.call_args[0]
+        self.assertEqual(path, '_msearch')
+        self.assertEqual(
+            reader._http_handler.request.call_args[1],
+            dict(content_type='application/x-ndjson'))
+        self.assertTrue(request_body.endswith('\n'))
+        lines = [loads(line) for line in request_body.splitlines()]
+        self.assertEqual(lines[0], {'index': 'logstash0-*'})
+        self.assertEqual(lines[1]['size'], 10)
+        self.assertEqual(lines[2], {'index': 'logstash1-*'})
+        # merged by timestamp and tagged with the saved search
+        self.assertEqual([document['_id'] for document in documents], ['1', '3', '2'])
+        self.assertEqual(
+            [document['_source']['search'] for document in documents],
+            ['search1', 'search2', 'search1'])
+        # the size of the combined response is split by the number of returned documents
+        for search_reader in reader._readers.values():
+            self.assertEqual(search_reader._page_size_controller.average_document_size, 100)
+
+    # ----------------------------------------------------------------------
+    def test_fetch_multi_search_pages_error(self):
+        reader = self._factor_reader()
+        reader._http_handler.request.return_value = dict(responses=[
+            dict(error=dict(type='index_not_found_exception'), status=404),
+            dict(hits=dict(hits=[_factor_document('3', '2018-02-22T22:22:44.000Z')])),
+        ])
+
+        reader._fetch_multi_search_pages()
+        documents = reader._merge_documents()
+
+        self.assertEqual([document['_id'] for document in documents], ['3'])
+        self._mocked_logger.error.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_fetch_multi_search_pages_backpressure(self):
+        reader = self._factor_reader()
+        first_reader = reader._readers['search1']
+        first_reader._backpressure = BackpressureController('sample', max_lag=10)
+        # following poll, with a page size of one document
+        first_reader._sort_order = SORT_ORDER_ASCENDING
+        first_reader._page_size_controller = mock.Mock(size=1)
+        reader._http_handler.request.return_value = dict(responses=[
+            dict(hits=dict(hits=[_factor_document('1', '2018-02-22T22:22:43.000Z')])),
+            dict(hits=dict(hits=[])),
+        ])
+
+        reader._fetch_multi_search_pages()
+        reader._log_backpressure_notices()
+
+        # the full page lags behind, so the sample rate of the saved search is reduced
+        self.assertEqual(first_reader._backpressure.sample_rate, 0.5)
+        self._mocked_logger.warning.assert_called_with(
+            '{}: {}', 'search1', first_reader._backpressure_notice)
+
+    # ----------------------------------------------------------------------
+    def test_setup_readers_ignored_options(self):
+        reader = self._factor_reader()
+        reader._config.async_search = True
+        reader._config.hit_cache_dir = '~/.cache/lstail'
+        reader._config.follow = True
+        reader._config.backpressure = 'sample'
+        reader._config.backpressure_max_lag = 10
+
+        with mock.patch.object(LogstashReader, '_setup_query'):
+            reader._setup_readers()
+
+        self.assertEqual(self._mocked_logger.warning.call_count, 2)
+        for search_reader in reader._readers.values():
+            self.assertFalse(search_reader._config.async_search)
+            self.assertTrue(search_reader._config.no_cache)
+            self.assertIsNotNone(search_reader._backpressure)
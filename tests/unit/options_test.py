@@ -7,6 +7,9 @@ from lstail.options import LstailArgumentParser
 from tests.base import BaseTestCase
 
 
+# pylint: disable=too-many-public-methods
+
+
 class OptionsTest(BaseTestCase):
 
     # ----------------------------------------------------------------------
@@ -53,6 +56,74 @@ class OptionsTest(BaseTestCase):
     def test_flag_csv(self):
         self._test_flag(None, 'csv', 'csv_output')
 
+    # ----------------------------------------------------------------------
+    def test_flag_fan_out(self):
+        self._test_flag(None, 'fan-out', 'fan_out')
+
+    # ----------------------------------------------------------------------
+    def test_flag_serve(self):
+        self._test_flag(None, 'serve', 'serve')
+
+    # ----------------------------------------------------------------------
+    def test_flag_attach(self):
+        self._test_flag(None, 'attach', 'attach')
+
+    # ----------------------------------------------------------------------
+    def test_option_socket(self):
+        parser = LstailArgumentParser(['--socket', '/tmp/lstail.sock'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.socket_path, '/tmp/lstail.sock')
+
+    # ----------------------------------------------------------------------
+    def test_flag_async_search(self):
+        self._test_flag(None, 'async-search', 'async_search')
+
+    # ----------------------------------------------------------------------
+    def test_option_state_file(self):
+        parser = LstailArgumentParser(['--state-file', '/tmp/lstail.state'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.state_file, '/tmp/lstail.state')
+
+    # ----------------------------------------------------------------------
+    def test_flag_no_cache(self):
+        self._test_flag(None, 'no-cache', 'no_cache')
+
+    # ----------------------------------------------------------------------
+    def test_option_record(self):
+        parser = LstailArgumentParser(['--record', '/tmp/lstail.ndjson.gz'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.record_file, '/tmp/lstail.ndjson.gz')
+
+    # ----------------------------------------------------------------------
+    def test_option_replay(self):
+        parser = LstailArgumentParser(['--replay', '/tmp/lstail.ndjson.gz'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.replay_file, '/tmp/lstail.ndjson.gz')
+
+    # ----------------------------------------------------------------------
+    def test_flag_replay_pacing(self):
+        self._test_flag(None, 'replay-pacing', 'replay_pacing')
+
+    # ----------------------------------------------------------------------
+    def test_option_output(self):
+        parser = LstailArgumentParser(
+            ['-o', '/tmp/lstail.log.gz', '--rotate-size', '100', '--rotate-interval', '1h'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.output_file, '/tmp/lstail.log.gz')
+        self.assertEqual(arguments.output_rotate_size, 100)
+        self.assertEqual(arguments.output_rotate_interval, '1h')
+
+    # ----------------------------------------------------------------------
+    def test_option_json(self):
+        parser = LstailArgumentParser(['--json'])
+        self.assertEqual(parser.parse().json_output, 'json')
+
+        parser = LstailArgumentParser(['--ndjson'])
+        self.assertEqual(parser.parse().json_output, 'ndjson')
+
+        parser = LstailArgumentParser([])
+        self.assertIsNone(parser.parse().json_output)
+
     # ----------------------------------------------------------------------
     def test_flag_version(self):
         self._test_flag('V', 'version', 'version')
@@ -95,10 +166,76 @@ class OptionsTest(BaseTestCase):
     def test_option_lines(self):
         self._test_option('n', 'lines', 'initial_query_size', 42)
 
+    # ----------------------------------------------------------------------
+    def test_option_min_level(self):
+        parser = LstailArgumentParser(['--min-level', 'warning'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.min_level, 'warning')
+
+        parser = LstailArgumentParser(['--min-level', 'debug'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
+
+        parser = LstailArgumentParser([])
+        arguments = parser.parse()
+        self.assertIsNone(arguments.min_level)
+
+    # ----------------------------------------------------------------------
+    def test_option_match(self):
+        parser = LstailArgumentParser(['--match', 'message~refused', '--match', 'path~^/api'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.match_expressions, ['message~refused', 'path~^/api'])
+
+        parser = LstailArgumentParser([])
+        arguments = parser.parse()
+        self.assertIsNone(arguments.match_expressions)
+
+    # ----------------------------------------------------------------------
+    def test_option_summary(self):
+        parser = LstailArgumentParser(['--histogram', '5m', '--top', 'host:5', '--count'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.summary_histogram_interval, '5m')
+        self.assertEqual(arguments.summary_top, 'host:5')
+        self.assertTrue(arguments.summary_count)
+
+        parser = LstailArgumentParser([])
+        arguments = parser.parse()
+        self.assertIsNone(arguments.summary_histogram_interval)
+        self.assertIsNone(arguments.summary_top)
+        self.assertFalse(arguments.summary_count)
+
+    # ----------------------------------------------------------------------
+    def test_option_sample(self):
+        parser = LstailArgumentParser(['--sample', '1%'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.sample_rate, '1%')
+
+    # ----------------------------------------------------------------------
+    def test_option_backpressure(self):
+        parser = LstailArgumentParser(['--backpressure', 'skip'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.backpressure, 'skip')
+
+        parser = LstailArgumentParser(['--backpressure', 'drop'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
+
     # ----------------------------------------------------------------------
     def test_option_saved_search(self):
         self._test_option('s', 'saved-search', 'kibana_saved_search', 'test saved search')
 
+    # ----------------------------------------------------------------------
+    def test_option_saved_search_multiple(self):
+        parser = LstailArgumentParser(['-s', 'search1', '--saved-search', 'search2'])
+        arguments = parser.parse()
+        self.assertEqual(arguments.kibana_saved_search, 'search1')
+        self.assertEqual(arguments.kibana_saved_searches, ['search1', 'search2'])
+
+        parser = LstailArgumentParser([])
+        arguments = parser.parse()
+        self.assertIsNone(arguments.kibana_saved_search)
+        self.assertEqual(arguments.kibana_saved_searches, [])
+
     # ----------------------------------------------------------------------
     def test_option_exclusive_group_initial_query(self):
         parser = LstailArgumentParser(['--lines', '5', '--range', '4d'])
@@ -118,3 +255,21 @@ class OptionsTest(BaseTestCase):
         parser = LstailArgumentParser(['-l', '-V'])
         with self.assertRaises(SystemExit):
             parser.parse()
+
+        parser = LstailArgumentParser(['--serve', '--attach'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
+
+        parser = LstailArgumentParser(['--replay', '/tmp/lstail.ndjson.gz', '--serve'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
+
+    # ----------------------------------------------------------------------
+    def test_option_exclusive_group_output(self):
+        parser = LstailArgumentParser(['--csv', '--json'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
+
+        parser = LstailArgumentParser(['--json', '--ndjson'])
+        with self.assertRaises(SystemExit):
+            parser.parse()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from urllib.error import HTTPError
+
+from lstail.error import AsyncSearchNotSupportedError
+from lstail.query.async_search import AsyncSearch
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+TEST_SEARCH_RESPONSE = dict(hits=dict(hits=[dict(_id='1')]))
+
+
+class AsyncSearchTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_async_search(self, *responses):
+        http_handler = self._factor_mocked_http_handler()
+        http_handler.request.side_effect = list(responses)
+        return AsyncSearch(http_handler, self._mocked_logger, timeout=30)
+
+    # ----------------------------------------------------------------------
+    def test_search_completed_immediately(self):
+        async_search = self._factor_async_search(
+            dict(id='abc', is_running=False, response=TEST_SEARCH_RESPONSE),
+            dict(acknowledged=True))
+
+        response, stats = async_search.search('logstash-*', '{}')
+
+        self.assertEqual(response, TEST_SEARCH_RESPONSE)
+        self.assertEqual((stats.size, stats.duration), (100, 0.1))
+        calls = async_search._http_handler.request.call_args_list
+        self.assertEqual(
+            calls[0][0][0],
+            'logstash-*/_async_search?wait_for_completion_timeout=10s'
+            '&keep_on_completion=true&keep_alive=5m')
+        self.assertEqual(calls[1], mock.call('_async_search/abc', http_method='DELETE'))
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.query.async_search.sleep')
+    def test_search_poll(self, mock_sleep):
+        running_response = dict(
+            id='abc',
+            is_running=True,
+            response=dict(_shards=dict(total=10, successful=2, skipped=1)))
+        async_search = self._factor_async_search(
+            running_response,
+            running_response,
+            dict(id='abc', is_running=False, response=TEST_SEARCH_RESPONSE),
+            dict(acknowledged=True))
+
+        response, stats = async_search.search('logstash-*', '{}', ignore_unavailable=True)
+
+        self.assertEqual(response, TEST_SEARCH_RESPONSE)
+        # the duration of the search is spread over the submit and the polls but not the delete
+        self.assertAlmostEqual(stats.duration, 0.3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        calls = async_search._http_handler.request.call_args_list
+        self.assertTrue(calls[0][0][0].endswith('&ignore_unavailable=true'))
+        # the search is submitted once and then only polled
+        self.assertEqual(calls[1], mock.call('_async_search/abc?wait_for_completion_timeout=10s'))
+        self.assertEqual(calls[3], mock.call('_async_search/abc', http_method='DELETE'))
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.query.async_search.sleep')
+    def test_search_interrupted(self, mock_sleep):
+        mock_sleep.side_effect = KeyboardInterrupt
+        async_search = self._factor_async_search(
+            dict(id='abc', is_running=True, response={}),
+            dict(acknowledged=True))
+
+        with self.assertRaises(KeyboardInterrupt):
+            async_search.search('logstash-*', '{}')
+
+        # the search is deleted anyway
+        async_search._http_handler.request.assert_called_with(
+            '_async_search/abc', http_method='DELETE')
+
+    # ----------------------------------------------------------------------
+    def test_search_not_supported(self):
+        async_search = self._factor_async_search(
+            HTTPError('http://localhost', 400, 'Bad request', None, None))
+
+        with self.assertRaises(AsyncSearchNotSupportedError):
+            async_search.search('logstash-*', '{}')
@@ -52,3 +52,15 @@ class QueryBuilderFactoryTest(BaseTestCase):
             'foo', 'bar', 'foo', 'foobar', http_handler, self._mocked_logger)
 
         self.assertTrue(isinstance(query_builder, ElasticSearch7QueryBuilder))
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.query.factory.detect_elasticsearch_version')
+    def test_detect_elasticsearch_version_once(self, mock_es_detection):
+        mock_es_detection.return_value = ELASTICSEARCH_MAJOR_VERSION_7
+        http_handler = mock.MagicMock()
+
+        factory = QueryBuilderFactory(http_handler, self._mocked_logger)
+        for _ in range(3):
+            factory.factor('foo', 'bar', 'foo', 'foobar', http_handler, self._mocked_logger)
+
+        mock_es_detection.assert_called_once()
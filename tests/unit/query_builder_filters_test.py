@@ -585,3 +585,31 @@ class QueryBuilderCustomSearchTest(BaseTestCase):
             self.assertEqual(result, [])
             result = query_builder._filters[FILTER_GROUP_MUST]
             self.assertEqual(result, [])
+
+    # ----------------------------------------------------------------------
+    def test_add_filter(self):
+        must_filter = {'terms': {'log_level': ['ERROR', 'error']}}
+        must_not_filter = {'exists': {'field': 'debug'}}
+        for builder_class in (ElasticSearch6QueryBuilder, ElasticSearch7QueryBuilder):
+            query_builder = self._factor_query_builder(builder_class)
+            query_builder._kibana_index_name = None
+            query_builder.add_filter(must_filter)
+            query_builder.add_filter(must_not_filter, negate=True)
+            # test
+            with mock.patch.object(query_builder, '_assert_index_exists'):
+                query = query_builder.build().query
+            self.assertIn(must_filter, query['query']['bool']['must'])
+            self.assertEqual(query['query']['bool']['must_not'], [must_not_filter])
+
+    # ----------------------------------------------------------------------
+    def test_add_filter_v2(self):
+        must_filter = {'terms': {'log_level': ['ERROR', 'error']}}
+        query_builder = self._factor_query_builder(ElasticSearch2QueryBuilder)
+        query_builder._kibana_index_name = None
+        query_builder.add_filter(must_filter)
+        # test
+        with mock.patch.object(query_builder, '_assert_index_exists'):
+            query = query_builder.build().query
+        filter_ = query['query']['filtered']['filter']['bool']
+        self.assertIn(must_filter, filter_['must'])
+        self.assertEqual(filter_['must_not'], [])
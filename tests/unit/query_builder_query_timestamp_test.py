@@ -4,7 +4,7 @@
 # of the MIT license.  See the LICENSE file for details.
 
 from copy import deepcopy
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from lstail.constants import (
     BASE_QUERY_ES2,
@@ -121,3 +121,26 @@ class QueryBuilderTimestampTest(BaseTestCase):
         self._evaluate_timestamped_query(
             query_timestamp_replaced.query['query']['filtered']['filter']['bool']['must'],
             timestamp_from)
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.query.factory.detect_elasticsearch_version')
+    def test_timestamp_query_upper_bound(self, mock_es_detection):
+        mock_es_detection.return_value = ELASTICSEARCH_MAJOR_VERSION_7
+        http_handler = mock.MagicMock()
+
+        factory = QueryBuilderFactory(http_handler, self._mocked_logger)
+        query_builder = factory.factor(
+            'foo', 'bar', 'foo', 'foobar', http_handler, self._mocked_logger)
+
+        timestamp_from = datetime.now()
+        timestamp_to = timestamp_from + timedelta(hours=1)
+        query = Query('foo-index', deepcopy(BASE_QUERY_ES6), time_field_name='@timestamp')
+
+        query_time_range = query_builder.build_query_for_time_range(
+            query,
+            timestamp_from,
+            timestamp_to)
+
+        self.assertEqual(
+            query_time_range.query['query']['bool']['must'],
+            [{'range': {'@timestamp': {'gt': timestamp_from, 'lte': timestamp_to}}}])
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from ddt import data, ddt, unpack
+
+from lstail.dto.query import Query
+from tests.base import BaseTestCase
+
+
+@ddt
+class QueryTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    @data(
+        (None, dict(excludes=['message'])),
+        (True, dict(excludes=['message'])),
+        (False, False),
+        ('host', dict(includes='host', excludes=['message'])),
+        (['host', 'message'], dict(includes=['host', 'message'], excludes=['message'])),
+        (dict(excludes='secret'), dict(excludes=['message', 'secret'])),
+        (
+            dict(includes=['*'], excludes=['message', 'secret']),
+            dict(includes=['*'], excludes=['message', 'secret'])),
+    )
+    @unpack
+    def test_set_truncated_fields(self, source, expected_source):
+        query = Query('logstash-*', {}, '@timestamp')
+        if source is not None:
+            query.query['_source'] = source
+
+        query.set_truncated_fields(dict(message=20))
+
+        self.assertEqual(query.query['_source'], expected_source)
+        self.assertIn('message', query.query['script_fields'])
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from urllib.error import HTTPError
+
+from freezegun import freeze_time
+
+from lstail.query.index import IndexResolver
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+TEST_INDEX_NAMES = [
+    'logstash-2018.02.20',
+    'logstash-2018.02.21',
+    'logstash-2018.02.22',
+    'logstash-archive',
+    '.ds-logs-2018.02.01-000001',
+]
+TEST_NOW = datetime(2018, 2, 22, 22, 22, 42)
+
+
+class IndexResolverTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_resolver(self, index_names=None, pattern='logstash-*', enabled=True):
+        if index_names is None:
+            index_names = TEST_INDEX_NAMES
+        http_handler = mock.Mock()
+        http_handler.request.return_value = dict(
+            indices=[dict(name=index_name) for index_name in index_names])
+        return IndexResolver(http_handler, self._mocked_logger, pattern, enabled=enabled)
+
+    # ----------------------------------------------------------------------
+    def test_get_index_narrowed(self):
+        resolver = self._factor_resolver()
+        with freeze_time(TEST_NOW):
+            index = resolver.get_index(datetime(2018, 2, 22, 22, 20))
+
+        expected_indices = [
+            'logstash-2018.02.22',
+            '.ds-logs-2018.02.01-000001',
+            'logstash-archive',
+            'logstash-2018.02.22*',
+        ]
+        self.assertTrue(resolver.narrowed)
+        self.assertEqual(sorted(index.split(',')), sorted(expected_indices))
+
+    # ----------------------------------------------------------------------
+    def test_get_index_time_margin(self):
+        resolver = self._factor_resolver()
+        with freeze_time(TEST_NOW):
+            # shortly after midnight, the previous day is still within the safety margin
+            index = resolver.get_index(datetime(2018, 2, 22, 0, 30))
+
+        self.assertIn('logstash-2018.02.21', index.split(','))
+        self.assertNotIn('logstash-2018.02.20', index.split(','))
+
+    # ----------------------------------------------------------------------
+    def test_get_index_current_period_wildcard(self):
+        resolver = self._factor_resolver()
+        # the day after: the index for the new day does not exist yet
+        with freeze_time(datetime(2018, 2, 23, 0, 0, 5)):
+            index = resolver.get_index(datetime(2018, 2, 23, 0, 0, 1))
+
+        self.assertIn('logstash-2018.02.23*', index.split(','))
+
+    # ----------------------------------------------------------------------
+    def test_get_index_current_period_wildcard_special_prefix(self):
+        # index names may contain characters with a meaning for format() and strftime()
+        resolver = self._factor_resolver(
+            index_names=['logs-{app}-%Y%d-2018.02.22'],
+            pattern='logs-*')
+        with freeze_time(datetime(2018, 2, 23, 0, 0, 5)):
+            index = resolver.get_index(datetime(2018, 2, 23, 0, 0, 1))
+
+        self.assertIn('logs-{app}-%Y%d-2018.02.23*', index.split(','))
+
+    # ----------------------------------------------------------------------
+    def test_get_index_without_wildcard(self):
+        resolver = self._factor_resolver(pattern='logstash-2018.02.22')
+        index = resolver.get_index(TEST_NOW)
+
+        self.assertEqual(index, 'logstash-2018.02.22')
+        self.assertFalse(resolver.narrowed)
+        resolver._http_handler.request.assert_not_called()
+
+    # ----------------------------------------------------------------------
+    def test_get_index_disabled(self):
+        resolver = self._factor_resolver(enabled=False)
+        index = resolver.get_index(TEST_NOW)
+
+        self.assertEqual(index, 'logstash-*')
+        resolver._http_handler.request.assert_not_called()
+
+    # ----------------------------------------------------------------------
+    def test_get_index_resolution_failed(self):
+        resolver = self._factor_resolver()
+        resolver._http_handler.request.side_effect = HTTPError(
+            'http://localhost', 400, 'Bad request', None, None)
+        index = resolver.get_index(TEST_NOW)
+
+        self.assertEqual(index, 'logstash-*')
+        self.assertFalse(resolver.narrowed)
+        # tried the resolve API and the cat API
+        self.assertEqual(resolver._http_handler.request.call_count, 2)
+
+    # ----------------------------------------------------------------------
+    def test_get_index_resolution_cached(self):
+        resolver = self._factor_resolver()
+        resolver.get_index(TEST_NOW)
+        resolver.get_index(TEST_NOW)
+        self.assertEqual(resolver._http_handler.request.call_count, 1)
+
+        resolver.invalidate()
+        resolver.get_index(TEST_NOW)
+        self.assertEqual(resolver._http_handler.request.call_count, 2)
+
+    # ----------------------------------------------------------------------
+    def test_parse_index_name(self):
+        resolver = self._factor_resolver()
+        # daily
+        dated_index = resolver._parse_index_name('logstash-2018.02.22')
+        self.assertEqual(dated_index.period_start, datetime(2018, 2, 22))
+        self.assertEqual(dated_index.period_end, datetime(2018, 2, 23))
+        self.assertEqual(dated_index.template, 'logstash-%Y.%m.%d')
+        # hourly
+        dated_index = resolver._parse_index_name('nginx-2018-02-22-13')
+        self.assertEqual(dated_index.period_start, datetime(2018, 2, 22, 13))
+        self.assertEqual(dated_index.period_end, datetime(2018, 2, 22, 14))
+        # monthly
+        dated_index = resolver._parse_index_name('filebeat-2018.12')
+        self.assertEqual(dated_index.period_start, datetime(2018, 12, 1))
+        self.assertEqual(dated_index.period_end, datetime(2019, 1, 1))
+        # no date or rollover
+        self.assertIsNone(resolver._parse_index_name('logstash-archive'))
+        self.assertIsNone(resolver._parse_index_name('.ds-logs-2018.02.01-000001'))
+        # invalid date
+        self.assertIsNone(resolver._parse_index_name('logstash-2018.13.42'))
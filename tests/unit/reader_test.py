@@ -5,18 +5,28 @@
 
 from copy import deepcopy
 from datetime import datetime, timedelta
+from json import dumps, loads
+from time import sleep
 import sys
 
 from freezegun import freeze_time
 
 from lstail.constants import ELASTICSEARCH_MAJOR_VERSION_2, ELASTICSEARCH_MAJOR_VERSION_6
+from lstail.dto.column import Column
 from lstail.dto.configuration import Configuration
+from lstail.dto.display import DisplayConfiguration
+from lstail.dto.response import ResponseStats
+from lstail.dto.state import ReaderState
+from lstail.error import AsyncSearchNotSupportedError
+from lstail.query.elasticsearch_7 import ElasticSearch7QueryBuilder
 from lstail.query.kibana_saved_search import ListKibanaSavedSearchesController
 from lstail.reader import LogstashReader
+from lstail.util.backpressure import BackpressureController
+from lstail.util.match import DocumentMatcher
 from tests.base import BaseTestCase, mock
 
 
-# pylint: disable=protected-access
+# pylint: disable=protected-access,too-many-public-methods
 
 TEST_CONFIG = Configuration()
 TEST_CONFIG.debug = False
@@ -158,3 +168,543 @@ class LogstashReaderTest(BaseTestCase):
         reader._prompt_for_kibana_saved_search_selection_if_necessary()
         # check
         mock_prompt.assert_not_called()
+
+    # ----------------------------------------------------------------------
+    def _factor_reader_for_fetch(self, hits):
+        config = deepcopy(TEST_CONFIG)
+        config.initial_query_size = 2
+        config.narrow_indices = False
+        config.page_size_max = 10000
+        config.page_target_bytes = 1000
+        config.page_max_bytes = 10000
+        config.page_target_latency = 1.0
+        reader = LogstashReader(config)
+        reader._logger = self._mocked_logger
+        reader._http_handler = self._factor_mocked_http_handler()
+        reader._http_handler.request.return_value = dict(hits=dict(hits=hits))
+        reader._query_builder = ElasticSearch7QueryBuilder(
+            'logstash-*', None, None, None, reader._http_handler, self._mocked_logger)
+        reader._base_query = reader._query_builder.build()
+        reader._setup_index_resolver()
+        reader._setup_page_size_controller()
+        reader._last_timestamp = datetime(2018, 2, 22, 22, 22, 42)
+        return reader
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_sort_order(self):
+        hits = [dict(_id='2'), dict(_id='1')]
+        reader = self._factor_reader_for_fetch(hits)
+
+        # initial query: latest documents in descending order, reversed for output
+        reader._fetch_latest_documents()
+        self.assertEqual(reader._documents, [dict(_id='1'), dict(_id='2')])
+        self._assert_sort_order_in_request(reader, 'desc', expected_size=2)
+
+        # following queries: ascending order to not skip any documents
+        reader._http_handler.request.return_value = dict(hits=dict(hits=[dict(_id='3')]))
+        reader._fetch_latest_documents()
+        self.assertEqual(reader._documents, [dict(_id='3')])
+        # 1000 bytes target per page with 50 bytes per document
+        self._assert_sort_order_in_request(reader, 'asc', expected_size=20)
+
+    # ----------------------------------------------------------------------
+    def _assert_sort_order_in_request(self, reader, expected_sort_order, expected_size):
+        path, query_json = reader._http_handler.request.call_args[0]
+        query = loads(query_json)
+        self.assertEqual(path, 'logstash-*/_search')
+        self.assertEqual(query['sort'][0]['@timestamp']['order'], expected_sort_order)
+        self.assertEqual(query['size'], expected_size)
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_overlap(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.follow_overlap = 30
+        reader._setup_processed_documents_index()
+        reader._sort_order = 'asc'
+        hits = [
+            dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:30.000Z'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:45.000Z'}),
+        ]
+        reader._http_handler.request.return_value = dict(hits=dict(hits=hits))
+        reader._processed_documents.add('2')
+
+        with freeze_time(datetime(2018, 2, 22, 22, 23)):
+            reader._fetch_latest_documents()
+            reader._fetch_latest_timestamp()
+            reader._skip_processed_documents()
+
+        # query from 30 seconds before the last timestamp
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range['gt'], '2018-02-22T22:22:12.000000Z')
+        # already processed documents are skipped
+        self.assertEqual([document['_id'] for document in reader._documents], ['1'])
+        self.assertEqual(reader._last_timestamp, datetime(2018, 2, 22, 22, 22, 45))
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_page_continuation(self):
+        hits = [
+            dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:43.000Z'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:44.000Z'}),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._config.follow_overlap = 30
+        reader._sort_order = 'asc'
+        reader._page_size_controller._size = 2
+
+        reader._fetch_latest_documents()
+        # the page is full, so continue at its last document instead of the overlap
+        self.assertEqual(
+            reader._get_query_timestamp_from(),
+            datetime(2018, 2, 22, 22, 22, 44))
+        # including the time of the last document, later events of it might not have fit
+        reader._fetch_latest_documents()
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range, {'gte': '2018-02-22T22:22:44.000000Z'})
+
+        reader._http_handler.request.return_value = dict(hits=dict(hits=[]))
+        reader._fetch_latest_documents()
+        self.assertEqual(
+            reader._get_query_timestamp_from(),
+            datetime(2018, 2, 22, 22, 22, 12))
+
+    # ----------------------------------------------------------------------
+    def _factor_reader_for_backpressure(self, policy):
+        hits = [
+            dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:43.000Z'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:44.000Z'}),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._setup_processed_documents_index()
+        reader._sort_order = 'asc'
+        reader._page_size_controller._size = 2
+        reader._backpressure = BackpressureController(policy, 60)
+        return reader
+
+    # ----------------------------------------------------------------------
+    def test_apply_backpressure_skip(self):
+        reader = self._factor_reader_for_backpressure('skip')
+        count_response = dict(hits=dict(total=dict(value=5000), hits=[]))
+        reader._http_handler.request.side_effect = [
+            reader._http_handler.request.return_value,
+            count_response]
+
+        with freeze_time(datetime(2018, 2, 22, 22, 32, 44)):
+            reader._fetch_page()
+
+        # the fetched page is printed, the events after it are counted and skipped
+        self.assertEqual([document['_id'] for document in reader._documents], ['1', '2'])
+        query = loads(reader._http_handler.request.call_args[0][1])
+        self.assertEqual(query['size'], 0)
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range['gt'], '2018-02-22T22:22:44.000000Z')
+        self.assertEqual(time_range['lte'], '2018-02-22T22:32:44.000000Z')
+        self.assertEqual(
+            reader._backpressure_notice,
+            'Output lags 600s behind, skipped 5000 events to continue with the latest events')
+        self.assertEqual(reader._last_timestamp, datetime(2018, 2, 22, 22, 32, 44))
+
+        # the next query continues after the skipped events, even with an overlap
+        reader._config.follow_overlap = 30
+        reader._http_handler.request.side_effect = None
+        reader._http_handler.request.return_value = dict(hits=dict(hits=[]))
+        reader._fetch_latest_documents()
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range, {'gt': '2018-02-22T22:32:44.000000Z'})
+        self.assertIsNone(reader._page_continuation_timestamp)
+
+    # ----------------------------------------------------------------------
+    def test_apply_backpressure_skip_match(self):
+        reader = self._factor_reader_for_backpressure('skip')
+        reader._document_matcher = DocumentMatcher(['_id~.'])
+        count_response = dict(hits=dict(total=dict(value=5000), hits=[]))
+        reader._http_handler.request.side_effect = [
+            reader._http_handler.request.return_value,
+            count_response]
+
+        with freeze_time(datetime(2018, 2, 22, 22, 32, 44)):
+            reader._fetch_page()
+
+        # the skipped events are counted before matching them locally
+        self.assertEqual(
+            reader._backpressure_notice,
+            'Output lags 600s behind, skipped 5000 events (counted before --match/--sample) '
+            'to continue with the latest events')
+
+    # ----------------------------------------------------------------------
+    def test_apply_backpressure_skip_without_lag(self):
+        reader = self._factor_reader_for_backpressure('skip')
+
+        with freeze_time(datetime(2018, 2, 22, 22, 23, 0)):
+            reader._fetch_page()
+
+        self.assertIsNone(reader._backpressure_notice)
+        self.assertEqual(reader._http_handler.request.call_count, 1)
+
+    # ----------------------------------------------------------------------
+    def test_apply_backpressure_sample(self):
+        reader = self._factor_reader_for_backpressure('sample')
+
+        with freeze_time(datetime(2018, 2, 22, 22, 32, 44)):
+            reader._fetch_page()
+        # the sample rate applies to the following pages
+        self.assertEqual(len(reader._documents), 2)
+        self.assertEqual(
+            reader._backpressure_notice,
+            'Output lags 600s behind, showing a sample of 50% of the events')
+
+        hits = [dict(_id=str(document_id), _source={}) for document_id in range(3, 9)]
+        reader._http_handler.request.return_value = dict(hits=dict(hits=hits))
+        reader._fetch_page()
+        self.assertEqual([document['_id'] for document in reader._documents], ['3', '6', '7'])
+        self.assertEqual(reader._backpressure_notice, 'Output caught up, showing all events')
+        self.assertIsNone(reader._backpressure_sampler)
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_page_continuation_single_timestamp(self):
+        hits = [
+            dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:44.000Z'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:44.000Z'}),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._sort_order = 'asc'
+        reader._page_size_controller._size = 2
+
+        reader._fetch_latest_documents()
+        # the same page would be returned again, so continue after its time
+        self._mocked_logger.warning.assert_called_once()
+        reader._fetch_latest_documents()
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range, {'gt': '2018-02-22T22:22:44.000000Z'})
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_timestamp_from_sort_value(self):
+        hits = [
+            # the sort value is preferred, the timestamp is parsed only as fallback
+            dict(_id='1', sort=[1519338163000], _source={'@timestamp': 'unparseable'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:44.000Z'}),
+        ]
+        reader = self._factor_reader_for_fetch([])
+        reader._documents = hits[:1]
+
+        reader._fetch_latest_timestamp()
+        self.assertEqual(reader._last_timestamp, datetime(2018, 2, 22, 22, 22, 43))
+
+        reader._documents = hits
+        reader._fetch_latest_timestamp()
+        self.assertEqual(reader._last_timestamp, datetime(2018, 2, 22, 22, 22, 44))
+
+    # ----------------------------------------------------------------------
+    def test_setup_cursor_field(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.ingest_time_field = 'event.ingested'
+        reader._http_handler.request.return_value = dict(
+            fields={'event.ingested': dict(date=dict(type='date'))})
+
+        reader._setup_cursor_field()
+
+        self.assertEqual(reader._base_query.time_field_name, 'event.ingested')
+        self.assertIn('event.ingested', reader._base_query.query['sort'][0])
+
+    # ----------------------------------------------------------------------
+    def test_setup_server_side_truncation(self):
+        hits = [
+            dict(
+                _id='1',
+                _source={'@timestamp': '2018-02-22T22:22:43.000Z'},
+                fields=dict(message=[dict(truncated_value='x' * 20, length=100)])),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._config.server_side_truncation = True
+        reader._config.display = DisplayConfiguration()
+        reader._config.display.columns['message'] = Column(names=['answer'], max_length=20)
+        reader._config.display.columns['timestamp'] = Column(names=['@timestamp'], max_length=5)
+        reader._config.display.columns['a.b'] = Column(names=['a.b'], max_length=5)
+
+        reader._setup_server_side_truncation()
+        reader._fetch_latest_documents()
+
+        query = loads(reader._http_handler.request.call_args[0][1])
+        # the time field and nested fields are not truncated by Elasticsearch
+        self.assertEqual(query['_source'], dict(excludes=['answer', 'message', 'timestamp']))
+        self.assertEqual(
+            query['script_fields']['answer']['script']['params'],
+            dict(field='answer', max_length=20))
+        self.assertEqual(reader._documents[0]['_source']['message'], 'x' * 11 + '...[+89]')
+
+    # ----------------------------------------------------------------------
+    def test_add_min_level_filter(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.min_level = 'warning'
+        reader._config.display = DisplayConfiguration()
+        reader._config.display.columns['log_level'] = Column(names=['level', 'log_level'])
+        reader._config.parser.log_level_names_warning = ['warn']
+        reader._config.parser.log_level_names_error = ['error']
+
+        reader._add_min_level_filter_if_necessary()
+        reader._base_query = reader._query_builder.build()
+
+        values = ['ERROR', 'Error', 'WARN', 'Warn', 'error', 'warn']
+        expected_filter = {
+            'bool': {
+                'should': [{'terms': {'level': values}}, {'terms': {'log_level': values}}],
+                'minimum_should_match': 1}}
+        self.assertIn(expected_filter, reader._base_query.query['query']['bool']['must'])
+
+    # ----------------------------------------------------------------------
+    def test_add_min_level_filter_without_log_level_column(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.min_level = 'error'
+        reader._config.display = DisplayConfiguration()
+
+        reader._add_min_level_filter_if_necessary()
+        reader._base_query = reader._query_builder.build()
+
+        self._mocked_logger.warning.assert_called_once()
+        self.assertEqual(reader._base_query.query['query']['bool']['must'][1:], [])
+
+    # ----------------------------------------------------------------------
+    def test_setup_document_matcher(self):
+        hits = [
+            dict(_id='3', _source={
+                '@timestamp': '2018-02-22T22:22:45.000Z', 'status': 503, 'host': 'web1'}),
+            dict(_id='2', _source={
+                '@timestamp': '2018-02-22T22:22:44.000Z', 'status': 200, 'host': 'web1',
+                'message': 'connection refused'}),
+            dict(_id='1', _source={
+                '@timestamp': '2018-02-22T22:22:43.000Z', 'status': 503, 'host': 'web1',
+                'message': 'connection refused'}),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._http_handler.request.side_effect = [
+            dict(fields=dict(
+                host=dict(keyword=dict(type='keyword', searchable=True)),
+                message=dict(text=dict(type='text', searchable=True)),
+                status=dict(long=dict(type='long', searchable=True)))),
+            dict(hits=dict(hits=hits)),
+        ]
+        reader._config.match_expressions = ['host~^web', 'message~refused', 'status~^5\\d\\d$']
+        reader._setup_processed_documents_index()
+
+        reader._setup_document_matcher()
+        reader._base_query = reader._query_builder.build()
+        reader._fetch_page()
+
+        path = reader._http_handler.request.call_args_list[0][0][0]
+        self.assertEqual(path, '_field_caps?fields=host,message,status')
+        # only the pattern on the keyword field is searched by Elasticsearch
+        query = loads(reader._http_handler.request.call_args[0][1])
+        filter_query = reader._document_matcher.filter_queries[0]
+        self.assertIn({'wildcard': {'host': 'web*'}}, filter_query['bool']['should'])
+        self.assertIn(filter_query, query['query']['bool']['must'])
+        self.assertNotIn('message', dumps(query['query']))
+        # but all patterns are matched locally
+        self.assertEqual([document['_id'] for document in reader._documents], ['1'])
+
+    # ----------------------------------------------------------------------
+    def test_setup_sampling(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.sample_rate = '5%'
+        reader._setup_processed_documents_index()
+
+        reader._setup_sampling()
+        reader._base_query = reader._query_builder.build()
+        reader._fetch_page()
+
+        query = loads(reader._http_handler.request.call_args[0][1])
+        sample_filter = query['query']['bool']['must'][1]['function_score']
+        self.assertEqual(sample_filter['random_score']['field'], '_seq_no')
+        self.assertEqual(sample_filter['boost_mode'], 'replace')
+        self.assertAlmostEqual(sample_filter['min_score'], 0.95)
+        self.assertIsNone(reader._document_sampler)
+
+    # ----------------------------------------------------------------------
+    def test_setup_sampling_locally(self):
+        hits = [dict(_id=str(document_id), _source={}) for document_id in range(8, 0, -1)]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._config.initial_query_size = 10
+        reader._config.sample_rate = '0.5'
+        reader._query_builder.supports_random_score = False
+        reader._setup_processed_documents_index()
+
+        reader._setup_sampling()
+        reader._base_query = reader._query_builder.build()
+        reader._fetch_page()
+
+        # selected by the hash of the document ID
+        self._mocked_logger.info.assert_called_once()
+        self.assertEqual([document['_id'] for document in reader._documents], ['2', '3', '6', '7'])
+
+    # ----------------------------------------------------------------------
+    def test_setup_cursor_field_missing(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.ingest_time_field = 'event.ingested'
+        reader._http_handler.request.return_value = dict(fields={})
+
+        reader._setup_cursor_field()
+
+        self.assertEqual(reader._base_query.time_field_name, '@timestamp')
+
+    # ----------------------------------------------------------------------
+    def _factor_reader_for_pipeline(self, pages):
+        config = deepcopy(TEST_CONFIG)
+        config.follow = True
+        config.prefetch_pages = 1
+        reader = LogstashReader(config)
+        reader._logger = mock.Mock()
+        reader._poll_scheduler = mock.Mock()
+
+        def fetch_page():
+            page = pages.pop(0)
+            if isinstance(page, Exception):
+                raise page
+            reader._documents = page
+            if not pages:
+                reader._config.follow = False
+
+        reader._fetch_page = fetch_page
+        reader._print_documents = mock.Mock()
+        return reader
+
+    # ----------------------------------------------------------------------
+    def test_read_pipelined(self):
+        pages = [[dict(_id='1')], RuntimeError('failed'), [dict(_id='2')]]
+        reader = self._factor_reader_for_pipeline(pages)
+
+        reader._read_pipelined()
+
+        reader._print_documents.assert_has_calls(
+            [mock.call([dict(_id='1')]), mock.call([dict(_id='2')])])
+        reader._logger.error.assert_called_once()
+        reader._poll_scheduler.record_error.assert_called_once()
+        self.assertTrue(reader._stop_event.is_set())
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.reader.PREFETCH_QUEUE_TIMEOUT', 0.01)
+    def test_read_pipelined_slow_fetch(self):
+        reader = self._factor_reader_for_pipeline([[dict(_id='1')]])
+        fetch_page = reader._fetch_page
+
+        def slow_fetch_page():
+            sleep(0.1)
+            fetch_page()
+
+        reader._fetch_page = slow_fetch_page
+
+        reader._read_pipelined()
+
+        # the records logged by the fetcher thread are written while waiting for the page
+        reader._logger.flush.assert_called()
+        reader._print_documents.assert_called_once_with([dict(_id='1')])
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_async_search(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._async_search = mock.Mock()
+        reader._async_search.search.return_value = (
+            dict(hits=dict(hits=[dict(_id='1')])),
+            ResponseStats(300, 2.0))
+
+        # initial query as async search
+        reader._fetch_latest_documents()
+        self.assertEqual(reader._documents, [dict(_id='1')])
+        # the page size is learned from the stats of the async search
+        self.assertEqual(reader._page_size_controller.average_document_size, 300)
+        reader._async_search.search.assert_called_once()
+        reader._http_handler.request.assert_not_called()
+
+        # following queries as regular search
+        reader._fetch_latest_documents()
+        reader._async_search.search.assert_called_once()
+        reader._http_handler.request.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_async_search_not_supported(self):
+        reader = self._factor_reader_for_fetch([dict(_id='1')])
+        reader._async_search = mock.Mock()
+        reader._async_search.search.side_effect = AsyncSearchNotSupportedError()
+
+        reader._fetch_latest_documents()
+
+        self.assertEqual(reader._documents, [dict(_id='1')])
+        self.assertIsNone(reader._async_search)
+        self.assertEqual(reader._http_handler.request.call_args[0][0], 'logstash-*/_search')
+
+    # ----------------------------------------------------------------------
+    def test_resume_from_state(self):
+        hits = [
+            dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:42.000Z'}),
+            dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:42.000Z'}),
+        ]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._setup_processed_documents_index()
+        timestamp = datetime(2018, 2, 22, 22, 22, 42)
+        reader._resume_from_state(ReaderState(timestamp, [(timestamp, '1')]))
+
+        with freeze_time(datetime(2018, 2, 22, 22, 23)):
+            reader._fetch_page()
+
+        # continue in ascending order including the stored timestamp
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range['gt'], '2018-02-22T22:22:41.999000Z')
+        self.assertEqual(query['sort'][0]['@timestamp']['order'], 'asc')
+        # the document processed before the restart is skipped
+        self.assertEqual([document['_id'] for document in reader._documents], ['2'])
+
+    # ----------------------------------------------------------------------
+    def test_factor_state_if_necessary(self):
+        reader = self._factor_reader_for_fetch([])
+        reader._config.follow = True
+        reader._config.state_checkpoint_pages = 2
+        reader._state_file = mock.Mock()
+        reader._setup_processed_documents_index()
+        reader._processed_documents.add('1', reader._last_timestamp)
+
+        self.assertIsNone(reader._factor_state_if_necessary())
+        state = reader._factor_state_if_necessary()
+        self.assertEqual(state.timestamp, reader._last_timestamp)
+        self.assertEqual(state.documents, [(reader._last_timestamp, '1')])
+
+        # always store the last page if not following
+        reader._config.follow = False
+        self.assertIsNotNone(reader._factor_state_if_necessary())
+
+    # ----------------------------------------------------------------------
+    def test_fetch_latest_documents_hit_cache(self):
+        hits = [dict(_id='2'), dict(_id='1')]
+        reader = self._factor_reader_for_fetch(hits)
+        reader._hit_cache = mock.Mock()
+        reader._hit_cache.search.return_value = hits
+
+        # initial query via the hit cache
+        reader._fetch_latest_documents()
+        self.assertEqual(reader._documents, [dict(_id='1'), dict(_id='2')])
+        # the page size is not learned from a page which was not fetched at once
+        self.assertIsNone(reader._page_size_controller.average_document_size)
+        timestamp_from, size, fetch, _ = reader._hit_cache.search.call_args[0]
+        self.assertEqual(timestamp_from, datetime(2018, 2, 22, 22, 22, 42))
+        self.assertEqual(size, 2)
+        # missing time ranges are fetched with an upper bound
+        self.assertEqual(fetch(timestamp_from, timestamp_from + timedelta(hours=1), 2), hits)
+        query = loads(reader._http_handler.request.call_args[0][1])
+        time_range = query['query']['bool']['must'][-1]['range']['@timestamp']
+        self.assertEqual(time_range['lte'], '2018-02-22T23:22:42.000000Z')
+
+        # following queries without the hit cache
+        reader._fetch_latest_documents()
+        reader._hit_cache.search.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_print_documents_recorded(self):
+        reader = LogstashReader(deepcopy(TEST_CONFIG))
+        reader._logger = mock.Mock()
+        reader._recorder = mock.Mock()
+
+        reader._print_documents([dict(_id='1')])
+
+        reader._recorder.write.assert_called_once_with([dict(_id='1')])
+        reader._logger.log_documents.assert_called_once_with([dict(_id='1')])
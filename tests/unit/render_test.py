@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from copy import deepcopy
+from io import StringIO
+
+from lstail.logger import LstailLogger
+from tests.base import BaseTestCase, mock
+from tests.unit.logger_output_test import CONFIG
+
+
+# pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def _factor_documents(count):
+    return [
+        dict(_id=str(number), _source={
+            '@timestamp': f'2018-02-22T22:{number // 60 % 60:02d}:{number % 60:02d}.000Z',
+            'level': 'info',
+            'hostname': 'localhost',
+            'program': 'lstail',
+            'message': f'message {number}'})
+        for number in range(count)]
+
+
+class RenderPoolTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _log_documents(self, pages, render_pool_threshold):
+        config = deepcopy(CONFIG)
+        config.render_pool_threshold = render_pool_threshold
+        output = StringIO()
+        logger = LstailLogger(config, output=output, verbose=False)
+        logger.update_display_columns(['level', 'hostname', 'program', 'message'])
+        for page in pages:
+            logger.log_documents(page)
+        logger.flush()
+        return logger, output.getvalue()
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.render.RENDER_POOL_CHUNK_DOCUMENTS', 7)
+    def test_render_in_order(self):
+        documents = _factor_documents(100)
+        # the small last page is rendered in the main process after the others are written
+        pages = [documents[:40], documents[40:90], documents[90:]]
+
+        logger, output = self._log_documents(pages, render_pool_threshold=20)
+        expected_logger, expected_output = self._log_documents(pages, render_pool_threshold=0)
+
+        self.assertIsNotNone(logger._render_pool)
+        self.assertIsNone(expected_logger._render_pool)
+        self.assertEqual(output, expected_output)
+        self.assertEqual(len(output.splitlines()), 100)
+        logger._shutdown_render_pool()
+
+    # ----------------------------------------------------------------------
+    def test_render_pool_not_used_for_terminal(self):
+        config = deepcopy(CONFIG)
+        config.render_pool_threshold = 1
+        output = mock.Mock()
+        output.isatty.return_value = True
+        logger = LstailLogger(config, output=output, verbose=False)
+
+        self.assertFalse(logger._use_render_pool(_factor_documents(10)))
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from tempfile import TemporaryDirectory
+import gzip
+import os
+
+from lstail.dto.configuration import Configuration
+from lstail.error import InvalidRecordingError
+from lstail.recording import Recorder
+from lstail.replay import ReplayLogstashReader
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+TEST_DOCUMENTS = [
+    dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:42.000Z', 'message': 'first'}),
+    dict(_id='2', _source={'@timestamp': '2018-02-22T22:22:44.500Z', 'message': 'second'}),
+]
+TEST_SEARCH_DESCRIPTION = dict(version='1.0', columns=['message'], time_field_name='@timestamp')
+
+
+class ReplayTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        super().setUp()
+        self._temp_directory = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._recording_path = os.path.join(self._temp_directory.name, 'recording.ndjson.gz')
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        self._temp_directory.cleanup()
+        super().tearDown()
+
+    # ----------------------------------------------------------------------
+    def _record(self, documents):
+        recorder = Recorder(self._recording_path, TEST_SEARCH_DESCRIPTION)
+        recorder.open()
+        recorder.write(documents)
+        recorder.close()
+
+    # ----------------------------------------------------------------------
+    def _replay(self, replay_pacing=False):
+        config = Configuration()
+        config.replay_file = self._recording_path
+        config.replay_pacing = replay_pacing
+        reader = ReplayLogstashReader(config)
+        reader._setup_logger = mock.Mock()
+        reader._logger = mock.Mock()
+        reader.read()
+        return reader._logger
+
+    # ----------------------------------------------------------------------
+    def test_record_and_replay(self):
+        self._record(TEST_DOCUMENTS)
+
+        logger = self._replay()
+
+        logger.update_display_columns.assert_called_once_with(['message'])
+        logger.print_header.assert_called_once()
+        logger.log_documents.assert_called_once_with(TEST_DOCUMENTS)
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.replay.sleep')
+    def test_replay_pacing(self, mock_sleep):
+        self._record(TEST_DOCUMENTS)
+
+        logger = self._replay(replay_pacing=True)
+
+        mock_sleep.assert_called_once_with(2.5)
+        # the first document is printed before waiting for the second one
+        logger.log_documents.assert_has_calls(
+            [mock.call([TEST_DOCUMENTS[0]]), mock.call([TEST_DOCUMENTS[1]])])
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.replay.REPLAY_PAGE_SIZE', 1)
+    def test_replay_pages(self):
+        self._record(TEST_DOCUMENTS)
+
+        logger = self._replay()
+
+        self.assertEqual(logger.log_documents.call_count, 2)
+
+    # ----------------------------------------------------------------------
+    def test_replay_truncated_recording(self):
+        self._record(TEST_DOCUMENTS)
+        with open(self._recording_path, 'rb') as recording_file:
+            data = recording_file.read()
+        with open(self._recording_path, 'wb') as recording_file:
+            # cut off the gzip trailer, as if the recording has not been closed
+            recording_file.write(data[:-8])
+
+        logger = self._replay()
+
+        logger.log_documents.assert_called_once_with(TEST_DOCUMENTS)
+        logger.debug.assert_called_with(
+            'Recording "{}" ends unexpectedly', self._recording_path)
+
+    # ----------------------------------------------------------------------
+    def test_replay_invalid_recording(self):
+        with gzip.open(self._recording_path, 'wb') as recording_file:
+            recording_file.write(b'{"_id": "1"}\n')
+
+        with self.assertRaises(InvalidRecordingError):
+            self._replay()
+
+    # ----------------------------------------------------------------------
+    def test_replay_empty_recording(self):
+        with open(self._recording_path, 'wb'):
+            pass
+
+        with self.assertRaises(InvalidRecordingError):
+            self._replay()
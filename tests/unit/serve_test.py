@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from io import BytesIO
+from json import dumps, loads
+from socket import AF_UNIX, SOCK_STREAM, socket, socketpair
+from tempfile import TemporaryDirectory
+import os
+
+from lstail.dto.configuration import Configuration
+from lstail.dto.server import Server
+from lstail.error import (
+    TailServerAlreadyRunningError,
+    TailServerNotFoundError,
+    TailServerSocketError,
+)
+from lstail.serve import AttachedLogstashReader, get_socket_path, ServingLogstashReader
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+TEST_DOCUMENT = dict(_id='1', _source={'@timestamp': '2018-02-22T22:22:42.000Z'})
+
+
+# ----------------------------------------------------------------------
+def _factor_config(socket_path=None):
+    config = Configuration()
+    config.initial_query_size = 2
+    config.socket_path = socket_path
+    config.default_index = 'logstash-*'
+    server = Server()
+    server.url = 'http://localhost:9200'
+    config.servers.append(server)
+    return config
+
+
+class ServeTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        super().setUp()
+        self._temp_directory = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._socket_path = os.path.join(self._temp_directory.name, 'test.sock')
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        self._temp_directory.cleanup()
+        super().tearDown()
+
+    # ----------------------------------------------------------------------
+    @mock.patch.dict(os.environ, XDG_RUNTIME_DIR='/run/user/1000')
+    def test_get_socket_path(self):
+        self.assertEqual(get_socket_path(_factor_config('/tmp/test.sock')), '/tmp/test.sock')
+
+        config = _factor_config()
+        socket_path = get_socket_path(config)
+        self.assertTrue(os.path.basename(socket_path).startswith('lstail-'))
+        # same search, same socket
+        self.assertEqual(get_socket_path(_factor_config()), socket_path)
+        # different search, different socket
+        config.kibana.saved_search = 'Syslog'
+        self.assertNotEqual(get_socket_path(config), socket_path)
+
+    # ----------------------------------------------------------------------
+    def test_get_socket_path_runtime_directory(self):
+        with mock.patch.dict(os.environ, XDG_RUNTIME_DIR='/run/user/1000'):
+            socket_path = get_socket_path(_factor_config())
+        self.assertEqual(os.path.dirname(socket_path), '/run/user/1000')
+
+        # without runtime directory, a private directory in the temporary directory is used
+        with mock.patch.dict(os.environ, XDG_RUNTIME_DIR=''), \
+                mock.patch('lstail.serve.gettempdir', return_value=self._temp_directory.name):
+            socket_path = get_socket_path(_factor_config())
+            runtime_directory = os.path.dirname(socket_path)
+            self.assertEqual(
+                runtime_directory,
+                os.path.join(self._temp_directory.name, f'lstail-{os.getuid()}'))
+            self.assertEqual(os.stat(runtime_directory).st_mode & 0o777, 0o700)
+            # the existing directory is used again
+            self.assertEqual(get_socket_path(_factor_config()), socket_path)
+
+            # a directory accessible by others is not used
+            os.chmod(runtime_directory, 0o777)
+            with self.assertRaises(TailServerSocketError):
+                get_socket_path(_factor_config())
+
+    # ----------------------------------------------------------------------
+    def _factor_server(self):
+        server = ServingLogstashReader(_factor_config(self._socket_path))
+        server._logger = mock.Mock()
+        server._query_builder = mock.Mock(display_columns=['message'])
+        server._base_query = mock.Mock(time_field_name='@timestamp')
+        server._setup_server_socket()
+        return server
+
+    # ----------------------------------------------------------------------
+    def test_serve(self):
+        server = self._factor_server()
+        try:
+            server._print_documents([TEST_DOCUMENT])
+            server._logger.flush.assert_called_once()
+
+            with socket(AF_UNIX, SOCK_STREAM) as client:
+                client.connect(self._socket_path)
+                stream = client.makefile('rb')
+                hello = loads(stream.readline())
+                self.assertEqual(hello['columns'], ['message'])
+                # the backlog is sent to new clients
+                self.assertEqual(loads(stream.readline()), TEST_DOCUMENT)
+        finally:
+            server._close_server_socket()
+
+        self.assertFalse(os.path.exists(self._socket_path))
+
+    # ----------------------------------------------------------------------
+    def test_serve_already_running(self):
+        server = self._factor_server()
+        try:
+            with self.assertRaises(TailServerAlreadyRunningError):
+                self._factor_server()
+        finally:
+            server._close_server_socket()
+
+    # ----------------------------------------------------------------------
+    def test_serve_stale_socket(self):
+        with socket(AF_UNIX, SOCK_STREAM) as stale_socket:
+            stale_socket.bind(self._socket_path)
+
+        # nobody is listening on the socket anymore, so it is replaced
+        server = self._factor_server()
+        server._close_server_socket()
+
+    # ----------------------------------------------------------------------
+    def test_serve_no_socket(self):
+        with open(self._socket_path, 'w', encoding='utf-8') as file_:
+            file_.write('data')
+
+        with self.assertRaises(TailServerSocketError):
+            self._factor_server()
+        self.assertTrue(os.path.exists(self._socket_path))
+
+    # ----------------------------------------------------------------------
+    def test_attach(self):
+        reader = AttachedLogstashReader(_factor_config(self._socket_path))
+        reader._logger = mock.Mock()
+        reader._connection, server_connection = socketpair()
+        with server_connection:
+            server_connection.sendall(
+                b'{"version": "1", "columns": ["message"], "time_field_name": "@timestamp"}\n'
+                b'{"_id": "1", "_source": {"@timestamp": "2018-02-22T22:22:42.000Z"}}\n')
+
+        reader._read_from_server()
+        reader._connection.close()
+
+        # the columns of the server are not used
+        reader._logger.update_display_columns.assert_called_once_with()
+        reader._logger.log_documents.assert_called_once_with([TEST_DOCUMENT])
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.serve.ATTACH_READ_SIZE', 60)
+    def test_attach_read_documents(self):
+        reader = AttachedLogstashReader(_factor_config(self._socket_path))
+        reader._logger = mock.Mock()
+        messages = [dumps(dict(_id=str(index), _source={})) for index in range(3)]
+        stream = BytesIO(''.join(f'{message}\n' for message in messages).encode())
+
+        reader._read_documents(stream)
+
+        # messages split over reads are completed by the next read
+        documents = [
+            document
+            for call in reader._logger.log_documents.call_args_list
+            for document in call[0][0]]
+        self.assertEqual([document['_id'] for document in documents], ['0', '1', '2'])
+        self.assertLess(reader._logger.log_documents.call_count, len(messages))
+
+    # ----------------------------------------------------------------------
+    def test_attach_no_server(self):
+        reader = AttachedLogstashReader(_factor_config(self._socket_path))
+        with self.assertRaises(TailServerNotFoundError):
+            reader._connect()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from tempfile import TemporaryDirectory
+import gzip
+import os
+
+from lstail.error import OutputCompressionNotAvailableError
+from lstail.sink import FileSink
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+
+class FileSinkTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        super().setUp()
+        self._temp_directory = TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        self._temp_directory.cleanup()
+        super().tearDown()
+
+    # ----------------------------------------------------------------------
+    def _get_path(self, file_name):
+        return os.path.join(self._temp_directory.name, file_name)
+
+    # ----------------------------------------------------------------------
+    def _read_gzip_file(self, file_name):
+        with gzip.open(self._get_path(file_name), 'rt', encoding='utf-8') as output_file:
+            return output_file.read()
+
+    # ----------------------------------------------------------------------
+    def test_write_gzip(self):
+        lines = [f'line {number}\n' for number in range(10000)]
+
+        with FileSink(self._get_path('output.log.gz')) as file_sink:
+            self.assertFalse(file_sink.isatty())
+            for line in lines:
+                print(line, end='', file=file_sink)
+
+        self.assertEqual(self._read_gzip_file('output.log.gz'), ''.join(lines))
+
+    # ----------------------------------------------------------------------
+    def test_write_plain(self):
+        with FileSink(self._get_path('output.log')) as file_sink:
+            print('message', file=file_sink)
+
+        with open(self._get_path('output.log'), encoding='utf-8') as output_file:
+            self.assertEqual(output_file.read(), 'message\n')
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.sink.FILE_SINK_CHUNK_SIZE', 10)
+    def test_rotate_by_size(self):
+        with FileSink(self._get_path('output.log.gz'), rotate_size=20) as file_sink:
+            for number in range(6):
+                print(f'line {number:04d}', file=file_sink)  # 10 bytes
+
+        self.assertEqual(self._read_gzip_file('output-0000.log.gz'), 'line 0000\nline 0001\n')
+        self.assertEqual(self._read_gzip_file('output-0001.log.gz'), 'line 0002\nline 0003\n')
+        self.assertEqual(self._read_gzip_file('output-0002.log.gz'), 'line 0004\nline 0005\n')
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.sink.FILE_SINK_CHUNK_SIZE', 10)
+    def test_rotate_by_event_time(self):
+        with FileSink(self._get_path('output.log.gz'), rotate_interval=3600) as file_sink:
+            print('header', file=file_sink)
+            file_sink.set_event_time(datetime(2018, 2, 22, 21, 59, 59))
+            print('first', file=file_sink)
+            file_sink.set_event_time(datetime(2018, 2, 22, 22, 0, 0))
+            print('second', file=file_sink)
+            file_sink.set_event_time(datetime(2018, 2, 22, 22, 59, 0))
+            print('third', file=file_sink)
+
+        self.assertEqual(self._read_gzip_file('output-20180222T210000.log.gz'), 'header\nfirst\n')
+        self.assertEqual(self._read_gzip_file('output-20180222T220000.log.gz'), 'second\nthird\n')
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.sink.zstandard', None)
+    def test_compression_not_available(self):
+        with self.assertRaises(OutputCompressionNotAvailableError):
+            FileSink(self._get_path('output.log.zst'))
+
+    # ----------------------------------------------------------------------
+    def test_write_error(self):
+        file_sink = FileSink(self._get_path('missing/output.log'))
+        file_sink.open()
+        print('message', file=file_sink)
+
+        with self.assertRaises(FileNotFoundError):
+            file_sink.close()
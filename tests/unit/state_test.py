@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from json import dump, load
+from tempfile import TemporaryDirectory
+import os
+
+from lstail.dto.state import ReaderState
+from lstail.state import StateFile
+from tests.base import BaseTestCase
+
+
+# pylint: disable=protected-access
+
+
+class StateFileTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        super().setUp()
+        self._temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._path = os.path.join(self._temp_dir.name, 'state.json')
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        self._temp_dir.cleanup()
+        super().tearDown()
+
+    # ----------------------------------------------------------------------
+    def test_save_and_load(self):
+        state_file = StateFile(self._path, 'fingerprint', self._mocked_logger)
+        timestamp = datetime(2018, 2, 22, 22, 22, 42, 123000)
+        state_file.save(ReaderState(timestamp, [(timestamp, '1'), (None, '2')]))
+
+        state = state_file.load()
+
+        self.assertEqual(state.timestamp, timestamp)
+        self.assertEqual(state.documents, [(timestamp, '1'), (None, '2')])
+        # the temporary file has been replaced
+        self.assertEqual(os.listdir(self._temp_dir.name), ['state.json'])
+
+    # ----------------------------------------------------------------------
+    def test_load_missing(self):
+        state_file = StateFile(self._path, 'fingerprint', self._mocked_logger)
+
+        self.assertIsNone(state_file.load())
+
+    # ----------------------------------------------------------------------
+    def test_load_other_search(self):
+        StateFile(self._path, 'other', self._mocked_logger).save(
+            ReaderState(datetime(2018, 2, 22, 22, 22, 42), []))
+        state_file = StateFile(self._path, 'fingerprint', self._mocked_logger)
+
+        self.assertIsNone(state_file.load())
+        self._mocked_logger.info.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_load_other_version(self):
+        StateFile(self._path, 'fingerprint', self._mocked_logger).save(
+            ReaderState(datetime(2018, 2, 22, 22, 22, 42), []))
+        with open(self._path, encoding='utf-8') as state_file:
+            state = load(state_file)
+        state['version'] = 0
+        with open(self._path, 'w', encoding='utf-8') as state_file:
+            dump(state, state_file)
+
+        self.assertIsNone(StateFile(self._path, 'fingerprint', self._mocked_logger).load())
+        self._mocked_logger.warning.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_load_invalid(self):
+        with open(self._path, 'w', encoding='utf-8') as state_file:
+            state_file.write('{')
+        state_file = StateFile(self._path, 'fingerprint', self._mocked_logger)
+
+        self.assertIsNone(state_file.load())
+        self._mocked_logger.warning.assert_called_once()
+
+    # ----------------------------------------------------------------------
+    def test_save_failed(self):
+        path = os.path.join(self._temp_dir.name, 'missing', 'state.json')
+        state_file = StateFile(path, 'fingerprint', self._mocked_logger)
+
+        state_file.save(ReaderState(datetime(2018, 2, 22, 22, 22, 42), []))
+
+        self._mocked_logger.warning.assert_called_once()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+from io import StringIO
+from json import loads
+
+from ddt import data, ddt, unpack
+from freezegun import freeze_time
+
+from lstail.dto.configuration import Configuration
+from lstail.dto.response import ResponseStats
+from lstail.error import InvalidSummaryFieldError
+from lstail.query.elasticsearch_6 import ElasticSearch6QueryBuilder
+from lstail.query.elasticsearch_7 import ElasticSearch7QueryBuilder
+from lstail.summary import format_sparkline, parse_top_field, SummaryLogstashReader
+from tests.base import BaseTestCase, mock
+
+
+# pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def _factor_response(total, histogram_buckets=None, top_buckets=None, top_other_count=0):
+    aggregations = {}
+    if histogram_buckets is not None:
+        aggregations['histogram'] = dict(buckets=[
+            dict(key=key, doc_count=count) for key, count in histogram_buckets])
+    if top_buckets is not None:
+        aggregations['top'] = dict(
+            buckets=[dict(key=key, doc_count=count) for key, count in top_buckets],
+            sum_other_doc_count=top_other_count)
+    return dict(hits=dict(total=total, hits=[]), aggregations=aggregations)
+
+
+@ddt
+class SummaryLogstashReaderTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_reader(self, query_builder_class=ElasticSearch7QueryBuilder, **settings):
+        config = Configuration()
+        config.narrow_indices = False
+        config.follow = False
+        for name, value in settings.items():
+            setattr(config, name, value)
+        reader = SummaryLogstashReader(config)
+        reader._logger = self._mocked_logger
+        reader._http_handler = self._factor_mocked_http_handler()
+        reader._query_builder = query_builder_class(
+            'logstash-*', None, None, None, reader._http_handler, self._mocked_logger)
+        with mock.patch.object(reader._query_builder, '_assert_index_exists'):
+            reader._base_query = reader._query_builder.build()
+        reader._setup_index_resolver()
+        reader._setup_summary()
+        reader._last_timestamp = datetime(2018, 2, 22, 22, 0, 0)
+        reader._summary_start = reader._last_timestamp
+        reader.set_output(StringIO())
+        return reader
+
+    # ----------------------------------------------------------------------
+    @data(
+        ('host', ('host', 10)),
+        ('host:5', ('host', 5)),
+        ('url:port', ('url:port', 10)),
+    )
+    @unpack
+    def test_parse_top_field(self, top_field, expected_result):
+        self.assertEqual(parse_top_field(top_field), expected_result)
+
+    # ----------------------------------------------------------------------
+    @data('host:0', ':5')
+    def test_parse_top_field_invalid(self, top_field):
+        with self.assertRaises(InvalidSummaryFieldError):
+            parse_top_field(top_field)
+
+    # ----------------------------------------------------------------------
+    def test_format_sparkline(self):
+        self.assertEqual(format_sparkline([0, 7, 14, 7]), '▁▅█▅')
+        self.assertEqual(format_sparkline([0, 0]), '▁▁')
+        self.assertEqual(format_sparkline([]), '')
+
+    # ----------------------------------------------------------------------
+    @data(
+        (ElasticSearch7QueryBuilder, 'fixed_interval', True),
+        (ElasticSearch6QueryBuilder, 'interval', False),
+    )
+    @unpack
+    def test_factor_summary_query(self, query_builder_class, interval_name, track_total_hits):
+        reader = self._factor_reader(
+            query_builder_class,
+            summary_histogram_interval='5m',
+            summary_top='host:3')
+
+        query = reader._factor_summary_query(
+            datetime(2018, 2, 22, 22, 0, 0),
+            datetime(2018, 2, 22, 23, 0, 0))
+
+        query = query.query
+        self.assertEqual(query['size'], 0)
+        self.assertNotIn('sort', query)
+        self.assertEqual(query.get('track_total_hits', False), track_total_hits)
+        histogram = query['aggs']['histogram']['date_histogram']
+        self.assertEqual(histogram[interval_name], '300s')
+        self.assertEqual(
+            histogram['extended_bounds'],
+            {'min': 1519336800000, 'max': 1519340400000})
+        self.assertEqual(query['aggs']['top'], {'terms': {'field': 'host', 'size': 3}})
+        # the base query is not changed
+        self.assertIn('sort', reader._base_query.query)
+
+    # ----------------------------------------------------------------------
+    def test_get_summary_end(self):
+        reader = self._factor_reader(refresh_interval=10.0)
+        with freeze_time(datetime(2018, 2, 22, 23, 0, 0)):
+            self.assertEqual(reader._get_summary_end(), datetime(2018, 2, 22, 23, 0, 0))
+
+            # in follow mode, the latest refresh interval is summarized by the next refresh
+            reader._config.follow = True
+            self.assertEqual(reader._get_summary_end(), datetime(2018, 2, 22, 22, 59, 50))
+
+            reader._last_timestamp = datetime(2018, 2, 22, 22, 59, 55)
+            self.assertEqual(reader._get_summary_end(), datetime(2018, 2, 22, 22, 59, 55))
+
+    # ----------------------------------------------------------------------
+    def test_fetch_summary(self):
+        reader = self._factor_reader(summary_count=True)
+        reader._http_handler.request.return_value = _factor_response(dict(value=42))
+        timestamp_to = datetime(2018, 2, 22, 23, 0, 0)
+
+        reader._fetch_summary(timestamp_to)
+
+        query = loads(reader._http_handler.request.call_args[0][1])
+        self.assertEqual(query['size'], 0)
+        self.assertNotIn('aggs', query)
+        self.assertEqual(reader._summary.count, 42)
+        self.assertEqual(reader._last_timestamp, timestamp_to)
+
+    # ----------------------------------------------------------------------
+    def test_fetch_summary_async_search(self):
+        reader = self._factor_reader(summary_count=True)
+        reader._async_search = mock.Mock()
+        reader._async_search.search.return_value = (
+            _factor_response(dict(value=42)), ResponseStats(300, 2.0))
+        reader._http_handler.request.return_value = _factor_response(dict(value=3))
+
+        # initial query as async search
+        reader._fetch_summary(datetime(2018, 2, 22, 23, 0, 0))
+        reader._async_search.search.assert_called_once()
+        reader._http_handler.request.assert_not_called()
+
+        # following queries as regular search
+        reader._fetch_summary(datetime(2018, 2, 22, 23, 0, 10))
+        reader._async_search.search.assert_called_once()
+        reader._http_handler.request.assert_called_once()
+        self.assertEqual(reader._summary.count, 45)
+
+    # ----------------------------------------------------------------------
+    def test_add_summary_response(self):
+        reader = self._factor_reader(summary_histogram_interval='1m', summary_top='host:2')
+
+        reader._add_summary_response(_factor_response(
+            10, [(0, 4), (60000, 6)], [('web01', 6), ('web02', 3)], top_other_count=1))
+        reader._add_summary_response(_factor_response(
+            3, [(60000, 1), (120000, 2)], [('web03', 2), ('web01', 1)]))
+
+        self.assertEqual(reader._summary.count, 13)
+        self.assertEqual(reader._new_event_count, 3)
+        self.assertEqual(reader._summary.histogram, {0: 4, 60000: 7, 120000: 2})
+        self.assertEqual(reader._summary.top_values, {'web01': 7, 'web02': 3, 'web03': 2})
+        self.assertEqual(reader._summary.top_other_count, 1)
+
+    # ----------------------------------------------------------------------
+    def test_print_summary(self):
+        reader = self._factor_reader(
+            summary_count=True,
+            summary_histogram_interval='1m',
+            summary_top='host:2')
+        reader._add_summary_response(_factor_response(
+            10,
+            [(1519336800000, 2), (1519336860000, 8)],
+            [('web01', 6), ('web02', 3), ('web03', 1)]))
+
+        reader._print_summary(datetime(2018, 2, 22, 22, 2, 0))
+
+        self.assertEqual(reader._output.getvalue().splitlines(), [
+            'Events per 1m: ▃█',
+            '2018-02-22 22:00:00          2 ' + '█' * 10,
+            '2018-02-22 22:01:00          8 ' + '█' * 40,
+            '10 events since 2018-02-22 22:00:00',
+            'Top values of "host":',
+            '         6 web01',
+            '         3 web02',
+            '         1 (other values)',
+        ])
+
+    # ----------------------------------------------------------------------
+    def test_print_summary_follow(self):
+        reader = self._factor_reader(summary_count=True, summary_histogram_interval='1m')
+        reader._config.follow = True
+        reader._add_summary_response(_factor_response(
+            3, [(1519336800000, 2), (1519336860000, 1)]))
+
+        # the second interval is still in progress
+        reader._print_summary(datetime(2018, 2, 22, 22, 1, 30))
+        self.assertEqual(reader._output.getvalue().splitlines(), [
+            'Events per 1m: █',
+            '2018-02-22 22:00:00          2 ' + '█' * 40,
+            '3 events since 2018-02-22 22:00:00',
+        ])
+
+        # no new events: only the completed interval is printed
+        reader.set_output(StringIO())
+        reader._add_summary_response(_factor_response(0, [(1519336860000, 0)]))
+        reader._print_summary(datetime(2018, 2, 22, 22, 2, 0))
+        self.assertEqual(reader._output.getvalue().splitlines(), [
+            '2018-02-22 22:01:00          1 ' + '█' * 20,
+        ])
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.util.backpressure import BackpressureController
+from tests.base import BaseTestCase
+
+
+class BackpressureControllerTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def test_skip_to_live(self):
+        controller = BackpressureController('skip', max_lag=60)
+
+        self.assertFalse(controller.update(61))
+        self.assertTrue(controller.skip_to_live)
+        controller.update(60)
+        self.assertFalse(controller.skip_to_live)
+
+    # ----------------------------------------------------------------------
+    def test_sample_rate(self):
+        controller = BackpressureController('sample', max_lag=60, min_sample_rate=0.2)
+
+        # halved while lagging, down to the minimum rate
+        rates = []
+        for lag in (30, 90, 120, 150, 180):
+            controller.update(lag)
+            rates.append(controller.sample_rate)
+        self.assertEqual(rates, [1.0, 0.5, 0.25, 0.2, 0.2])
+        self.assertFalse(controller.skip_to_live)
+
+        # doubled again once caught up
+        self.assertTrue(controller.update(0))
+        self.assertEqual(controller.sample_rate, 0.4)
+        controller.update(0)
+        controller.update(0)
+        self.assertEqual(controller.sample_rate, 1.0)
+        self.assertFalse(controller.update(0))
+
+    # ----------------------------------------------------------------------
+    def test_block(self):
+        controller = BackpressureController('block', max_lag=60)
+
+        self.assertFalse(controller.update(3600))
+        self.assertFalse(controller.skip_to_live)
+        self.assertEqual(controller.sample_rate, 1.0)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from datetime import datetime
+
+from lstail.util.dedup import ProcessedDocumentIndex
+from tests.base import BaseTestCase
+
+
+class ProcessedDocumentIndexTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def test_add(self):
+        index = ProcessedDocumentIndex()
+        index.add('1')
+        index.add('1')
+        index.add(None)
+
+        self.assertIn('1', index)
+        self.assertNotIn('2', index)
+        self.assertNotIn(None, index)
+        self.assertEqual(len(index), 1)
+
+    # ----------------------------------------------------------------------
+    def test_add_max_size(self):
+        index = ProcessedDocumentIndex(max_size=2)
+        for document_id in ('1', '2', '3'):
+            index.add(document_id)
+
+        self.assertNotIn('1', index)
+        self.assertIn('2', index)
+        self.assertIn('3', index)
+
+    # ----------------------------------------------------------------------
+    def test_prune(self):
+        index = ProcessedDocumentIndex()
+        index.add('1', datetime(2018, 2, 22, 22, 22, 40))
+        index.add('2', None)
+        index.add('3', datetime(2018, 2, 22, 22, 22, 42))
+        index.add('4', datetime(2018, 2, 22, 22, 22, 41))
+
+        index.prune(datetime(2018, 2, 22, 22, 22, 42))
+
+        self.assertNotIn('1', index)
+        self.assertNotIn('2', index)
+        self.assertIn('3', index)
+        # inserted after a newer entry, kept until the newer entry is pruned
+        self.assertIn('4', index)
+
+    # ----------------------------------------------------------------------
+    def test_get_entries(self):
+        index = ProcessedDocumentIndex()
+        index.add('1', datetime(2018, 2, 22, 22, 22, 40))
+        index.add('2', datetime(2018, 2, 22, 22, 22, 42))
+
+        self.assertEqual(
+            index.get_entries(),
+            [(datetime(2018, 2, 22, 22, 22, 40), '1'), (datetime(2018, 2, 22, 22, 22, 42), '2')])
+        self.assertEqual(index.get_entries(limit=1), [(datetime(2018, 2, 22, 22, 22, 42), '2')])
+        self.assertEqual(index.get_entries(limit=0), [])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from threading import Thread
+import logging
+
+from lstail.util.deferred import DeferredLogRecords
+from tests.base import BaseTestCase
+
+
+class DeferredLogRecordsTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _defer_in_thread(self, records, *record):
+        results = []
+        thread = Thread(target=lambda: results.append(records.defer(*record)))
+        thread.start()
+        thread.join()
+        return results[0]
+
+    # ----------------------------------------------------------------------
+    def test_defer_owner_thread(self):
+        records = DeferredLogRecords()
+
+        self.assertFalse(records.defer(logging.INFO, 'message', (), {}))
+        self.assertFalse(records)
+
+    # ----------------------------------------------------------------------
+    def test_defer_other_thread(self):
+        records = DeferredLogRecords()
+
+        self.assertTrue(self._defer_in_thread(records, logging.INFO, 'first', (), {}))
+        self.assertTrue(self._defer_in_thread(records, logging.DEBUG, 'second {}', (1,), {}))
+
+        self.assertTrue(records)
+        self.assertEqual(records.pop_all(), [
+            (logging.INFO, 'first', (), {}),
+            (logging.DEBUG, 'second {}', (1,), {}),
+        ])
+        self.assertFalse(records)
+
+    # ----------------------------------------------------------------------
+    def test_defer_exc_info(self):
+        records = DeferredLogRecords()
+
+        def log_exception():
+            try:
+                raise ValueError('test error')
+            except ValueError:
+                records.defer(logging.ERROR, 'failed', (), dict(exc_info=True))
+
+        thread = Thread(target=log_exception)
+        thread.start()
+        thread.join()
+
+        # the exception is captured while it is handled
+        _, _, _, kwargs = records.pop_all()[0]
+        self.assertIs(kwargs['exc_info'][0], ValueError)
+
+    # ----------------------------------------------------------------------
+    def test_pop_all_other_thread(self):
+        records = DeferredLogRecords()
+        self._defer_in_thread(records, logging.INFO, 'message', (), {})
+
+        results = []
+        thread = Thread(target=lambda: results.append(records.pop_all()))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(results, [[]])
+        self.assertTrue(records)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.util.document import get_document_field, merge_truncated_fields, truncate_field_value
+from tests.base import BaseTestCase
+
+
+class GetDocumentFieldTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def test_get_document_field(self):
+        source = {
+            'message': 'test',
+            'event.ingested': 'flat',
+            'event': dict(created='nested'),
+        }
+
+        self.assertEqual(get_document_field(source, 'message'), 'test')
+        self.assertEqual(get_document_field(source, 'event.ingested'), 'flat')
+        self.assertEqual(get_document_field(source, 'event.created'), 'nested')
+        self.assertIsNone(get_document_field(source, 'event.missing'))
+        self.assertIsNone(get_document_field(source, 'message.missing'))
+        self.assertEqual(get_document_field(source, 'missing', default=''), '')
+
+
+class TruncateFieldValueTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def test_truncate_field_value(self):
+        self.assertEqual(truncate_field_value('short', 10), 'short')
+        self.assertEqual(truncate_field_value(12345678901, 10), 12345678901)
+        # the marker counts into the maximum length
+        self.assertEqual(truncate_field_value('x' * 100, 20), 'x' * 11 + '...[+89]')
+        # already truncated values are not cut again
+        truncated = truncate_field_value('x' * 100, 20)
+        self.assertEqual(truncate_field_value(truncated, 20), truncated)
+        # cut by Elasticsearch to the maximum length
+        self.assertEqual(truncate_field_value('x' * 20, 20, length=100), 'x' * 11 + '...[+89]')
+        # the marker is cut as well if it is longer than the maximum length
+        self.assertEqual(truncate_field_value('x' * 100, 3), '...')
+        self.assertEqual(truncate_field_value('x' * 100, 0), '')
+
+    # ----------------------------------------------------------------------
+    def test_merge_truncated_fields(self):
+        document = dict(
+            _source={'@timestamp': '2018-02-22T22:22:42.000Z'},
+            fields=dict(
+                message=[dict(truncated_value='x' * 20, length=100)],
+                answer=[42],
+                other=[None],
+                unrelated=['value']))
+
+        merge_truncated_fields(document, dict(message=20, answer=20, other=20, missing=20))
+
+        self.assertEqual(document['_source']['message'], 'x' * 11 + '...[+89]')
+        self.assertEqual(document['_source']['answer'], 42)
+        self.assertNotIn('other', document['_source'])
+        self.assertEqual(document['fields'], dict(unrelated=['value']))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from ddt import data, ddt, unpack
+
+from lstail.util.highlight import KeywordHighlighter
+from tests.base import BaseTestCase
+
+
+@ddt
+class KeywordHighlighterTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    @data(
+        (['error'], 'no match', 'no match'),
+        (['error'], 'error in error', '[error] in [error]'),
+        (['he', 'she', 'his', 'hers'], 'ushers', 'u[shers]'),
+        (['abcd', 'bc'], 'abcx abcd', 'a[bc]x [abcd]'),
+        # adjacent occurrences are highlighted at once
+        (['req-42', 'web'], 'req-42web01', '[req-42web]01'),
+        # a longer occurrence covers previous shorter ones
+        (['b', 'c', 'abcd'], 'abcd', '[abcd]'),
+        (['a.b', '[x]'], 'a.b axb [x]', '[a.b] axb [[x]]'),
+        (['', 'x'], 'xyz', '[x]yz'),
+        ([], 'xyz', 'xyz'),
+        # not within terminal escape sequences like the color of a message
+        (['3', '33', 'm'], '\x1b[33mwarm 33', '\x1b[33mwar[m] [33]'),
+        (['x'], 'x\x1b[0mx\x1b[', '[x]\x1b[0m[x]\x1b['),
+    )
+    @unpack
+    def test_highlight(self, terms, text, expected_text):
+        highlighter = KeywordHighlighter(terms, '[', ']')
+        self.assertEqual(highlighter.highlight(text), expected_text)
+
+    # ----------------------------------------------------------------------
+    def test_find(self):
+        highlighter = KeywordHighlighter(['ab', 'bc', 'x'], '[', ']')
+        self.assertEqual(highlighter.find('abc x ab'), [(0, 3), (4, 5), (6, 8)])
+
+    # ----------------------------------------------------------------------
+    def test_bool(self):
+        self.assertTrue(KeywordHighlighter(['x'], '[', ']'))
+        self.assertFalse(KeywordHighlighter([''], '[', ']'))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from ddt import data, ddt, unpack
+
+from lstail.error import InvalidMatchExpressionError
+from lstail.util.match import DocumentMatcher
+from tests.base import BaseTestCase
+
+
+# ----------------------------------------------------------------------
+def _factor_filter_query(field_name, wildcard_pattern):
+    return {
+        'bool': {
+            'should': [
+                {'wildcard': {field_name: wildcard_pattern}},
+                {'bool': {'must_not': {'exists': {'field': field_name}}}},
+            ],
+            'minimum_should_match': 1,
+        }
+    }
+
+
+@ddt
+class DocumentMatcherTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    @data(
+        ('message~connection refused', ('message', '*connection refused*')),
+        ('path~^/api/v1', ('path', '/api/v1*')),
+        (r'host~web\.example\.com', ('host', '*web.example.com*')),
+        (r'message~what\?\*', ('message', '*what\\?\\**')),
+        ('message~time(d)? out', None),
+        (r'status~^5\d\d$', None),
+        ('message~', None),
+        ('message~^', None),
+    )
+    @unpack
+    def test_filter_queries(self, expression, expected_wildcard):
+        matcher = DocumentMatcher([expression])
+        matcher.set_keyword_fields({'message', 'path', 'host', 'status'})
+
+        expected_filter_queries = []
+        if expected_wildcard is not None:
+            # documents without indexed value (e.g. longer than "ignore_above") are kept
+            expected_filter_queries.append(_factor_filter_query(*expected_wildcard))
+        self.assertEqual(matcher.filter_queries, expected_filter_queries)
+
+    # ----------------------------------------------------------------------
+    def test_filter_queries_not_keyword_field(self):
+        # e.g. analyzed text fields are searched by tokens, not like the regular expression
+        matcher = DocumentMatcher(['message~err', 'host~^web-0'])
+        self.assertEqual(matcher.filter_queries, [])
+
+        matcher.set_keyword_fields({'host'})
+        self.assertEqual(matcher.filter_queries, [_factor_filter_query('host', 'web-0*')])
+        self.assertEqual(matcher.field_names, ['host', 'message'])
+
+    # ----------------------------------------------------------------------
+    @data('message', '~error', 'message~(unbalanced')
+    def test_invalid_expression(self, expression):
+        with self.assertRaises(InvalidMatchExpressionError):
+            DocumentMatcher([expression])
+
+    # ----------------------------------------------------------------------
+    def test_pushdown_ratio(self):
+        matcher = DocumentMatcher(['message~refused', 'path~^/api', 'status~^5\\d\\d$'])
+        self.assertEqual(matcher.pushdown_ratio, 0.0)
+
+        matcher.set_keyword_fields({'message', 'path', 'status'})
+        self.assertAlmostEqual(matcher.pushdown_ratio, 2 / 3)
+
+        matcher = DocumentMatcher([])
+        self.assertEqual(matcher.pushdown_ratio, 0.0)
+
+    # ----------------------------------------------------------------------
+    def test_filter(self):
+        documents = [
+            dict(_id='1', _source=dict(status=503, message='refused')),
+            dict(_id='2', _source=dict(status=200, message='refused')),
+            dict(_id='3', _source=dict(message='refused')),
+            dict(_id='4', _source=dict(status=[200, 502], message='refused')),
+            dict(_id='5', _source=dict(http=dict(status=500), message='refused')),
+        ]
+        # all patterns are evaluated locally, even if searched by Elasticsearch as well
+        matcher = DocumentMatcher(['status~^5\\d\\d$', 'message~refused'])
+        matcher.set_keyword_fields({'message'})
+
+        matched_documents = matcher.filter(documents)
+
+        self.assertEqual([document['_id'] for document in matched_documents], ['1', '4'])
+        self.assertEqual(matcher.checked_documents, 5)
+        self.assertEqual(matcher.matched_documents, 2)
+
+    # ----------------------------------------------------------------------
+    def test_filter_nested_field(self):
+        documents = [
+            dict(_id='1', _source={'http': dict(status=500)}),
+            dict(_id='2', _source={'http.status': 404}),
+        ]
+        matcher = DocumentMatcher(['http.status~^[45]'])
+
+        matched_documents = matcher.filter(documents)
+
+        self.assertEqual([document['_id'] for document in matched_documents], ['1', '2'])
+
+    # ----------------------------------------------------------------------
+    def test_filter_pushed_down(self):
+        documents = [
+            dict(_id='1', _source=dict(message='Connection refused')),
+            dict(_id='2', _source=dict(message='connection refused')),
+        ]
+        matcher = DocumentMatcher(['message~connection'])
+        matcher.set_keyword_fields({'message'})
+
+        matched_documents = matcher.filter(documents)
+
+        self.assertEqual([document['_id'] for document in matched_documents], ['2'])
+        self.assertEqual(matcher.checked_documents, 2)
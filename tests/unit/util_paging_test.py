@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.util.paging import AdaptivePageSizeController
+from tests.base import BaseTestCase
+
+
+class AdaptivePageSizeControllerTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_controller(self, initial_size=500):
+        return AdaptivePageSizeController(
+            initial_size=initial_size,
+            min_size=10,
+            max_size=10000,
+            target_bytes=1024 * 1024,
+            max_bytes=4 * 1024 * 1024,
+            target_latency=1.0)
+
+    # ----------------------------------------------------------------------
+    def test_initial_size(self):
+        self.assertEqual(self._factor_controller().size, 500)
+        self.assertEqual(self._factor_controller(initial_size=1).size, 10)
+        self.assertEqual(self._factor_controller(initial_size=99999).size, 10000)
+
+    # ----------------------------------------------------------------------
+    def test_update_empty_response(self):
+        controller = self._factor_controller()
+        controller.update(document_count=0, response_size=100, duration=0.1)
+        self.assertEqual(controller.size, 500)
+        self.assertIsNone(controller.average_document_size)
+
+    # ----------------------------------------------------------------------
+    def test_update_small_documents(self):
+        controller = self._factor_controller()
+        # 200 bytes per document, fast responses: grow to the maximum step by step
+        controller.update(document_count=500, response_size=500 * 200, duration=0.1)
+        self.assertEqual(controller.size, 1000)
+        controller.update(document_count=1000, response_size=1000 * 200, duration=0.1)
+        self.assertEqual(controller.size, 2000)
+        for _ in range(5):
+            controller.update(document_count=controller.size,
+                              response_size=controller.size * 200,
+                              duration=0.1)
+        # 1 MB / 200 bytes
+        self.assertEqual(controller.size, 5242)
+
+    # ----------------------------------------------------------------------
+    def test_update_big_documents(self):
+        controller = self._factor_controller()
+        # 2 MB per document: shrink to the minimum
+        controller.update(document_count=5, response_size=5 * 2 * 1024 * 1024, duration=0.5)
+        self.assertEqual(controller.size, 10)
+
+    # ----------------------------------------------------------------------
+    def test_update_latency(self):
+        controller = self._factor_controller()
+        # 500 documents took 5 seconds: 100 documents per second to meet 1 second
+        controller.update(document_count=500, response_size=500 * 100, duration=5.0)
+        self.assertEqual(controller.size, 100)
+
+        # latency is ignored for pages which are not full
+        controller.update(document_count=10, response_size=10 * 100, duration=5.0)
+        self.assertEqual(controller.size, 200)
+
+    # ----------------------------------------------------------------------
+    def test_update_average_document_size(self):
+        controller = self._factor_controller()
+        controller.update(document_count=10, response_size=1000, duration=0.1)
+        self.assertEqual(controller.average_document_size, 100)
+        controller.update(document_count=10, response_size=2000, duration=0.1)
+        self.assertAlmostEqual(controller.average_document_size, 130)
@@ -8,7 +8,7 @@ from datetime import datetime
 from ddt import data, ddt, unpack
 
 from lstail.error import InvalidTimestampFormatError
-from lstail.util.timestamp import parse_timestamp_from_elasticsearch
+from lstail.util.timestamp import get_timestamp_from_sort_value, parse_timestamp_from_elasticsearch
 from tests.base import BaseTestCase
 
 
@@ -92,6 +92,18 @@ TEST_DATA_NEGATIVE = (
 )
 
 
+TEST_DATA_SORT_VALUES = (
+    (dict(sort=[1519338162123]), datetime(2018, 2, 22, 22, 22, 42, 123000)),
+    (dict(sort=[0]), datetime(1970, 1, 1)),
+    # missing time field
+    (dict(sort=[-9223372036854775808]), None),
+    (dict(sort=[9223372036854775807]), None),
+    (dict(sort=['2018-02-22T22:22:42.123Z']), None),
+    (dict(sort=[]), None),
+    (dict(), None),
+)
+
+
 @ddt
 class ParseTimestampTest(BaseTestCase):
 
@@ -115,3 +127,10 @@ class ParseTimestampTest(BaseTestCase):
 
         with self.assertRaises(InvalidTimestampFormatError):
             parse_timestamp_from_elasticsearch('')
+
+    # ----------------------------------------------------------------------
+    @data(*TEST_DATA_SORT_VALUES)
+    @unpack
+    def test_sort_value(self, test_document, expected_datetime):
+        result = get_timestamp_from_sort_value(test_document)
+        self.assertEqual(result, expected_datetime)
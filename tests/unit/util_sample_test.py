@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from ddt import data, ddt, unpack
+
+from lstail.error import InvalidSampleRateError
+from lstail.util.sample import DocumentSampler, format_sample_rate, parse_sample_rate
+from tests.base import BaseTestCase
+
+
+@ddt
+class SampleTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    @data(
+        ('0.01', 0.01),
+        ('1%', 0.01),
+        (' 12.5% ', 0.125),
+        ('1', 1.0),
+    )
+    @unpack
+    def test_parse_sample_rate(self, sample_rate, expected_rate):
+        self.assertAlmostEqual(parse_sample_rate(sample_rate), expected_rate)
+
+    # ----------------------------------------------------------------------
+    @data('0', '0%', '1.5', '-0.1', 'half', '%', 'nan')
+    def test_parse_sample_rate_invalid(self, sample_rate):
+        with self.assertRaises(InvalidSampleRateError):
+            parse_sample_rate(sample_rate)
+
+    # ----------------------------------------------------------------------
+    @data((0.01, '1%'), (0.125, '12.5%'), (1.0, '100%'))
+    @unpack
+    def test_format_sample_rate(self, rate, expected_text):
+        self.assertEqual(format_sample_rate(rate), expected_text)
+
+    # ----------------------------------------------------------------------
+    def test_document_sampler(self):
+        documents = [dict(_id=str(document_id)) for document_id in range(10000)]
+        sampler = DocumentSampler(0.1)
+
+        sampled_documents = sampler.filter(documents)
+
+        self.assertAlmostEqual(len(sampled_documents) / len(documents), 0.1, delta=0.01)
+        # the same documents are selected each time
+        self.assertEqual(sampler.filter(documents), sampled_documents)
+        self.assertEqual(DocumentSampler(1.0).filter(documents), documents)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This software may be modified and distributed under the terms
+# of the MIT license.  See the LICENSE file for details.
+
+from lstail.util.scheduler import AdaptivePollScheduler
+from tests.base import BaseTestCase, mock
+
+
+class AdaptivePollSchedulerTest(BaseTestCase):
+
+    # ----------------------------------------------------------------------
+    def _factor_scheduler(self):
+        return AdaptivePollScheduler(
+            interval=5.0,
+            min_interval=0.5,
+            max_interval=30.0,
+            backoff_factor=2.0)
+
+    # ----------------------------------------------------------------------
+    def test_update_full_page(self):
+        scheduler = self._factor_scheduler()
+        scheduler.update(document_count=10, page_size=10)
+        self.assertEqual(scheduler.next_interval, 0.5)
+
+    # ----------------------------------------------------------------------
+    def test_update_documents_found(self):
+        scheduler = self._factor_scheduler()
+        scheduler.update(document_count=3, page_size=10)
+        self.assertEqual(scheduler.next_interval, 5.0)
+
+    # ----------------------------------------------------------------------
+    def test_update_back_off(self):
+        scheduler = self._factor_scheduler()
+        expected_intervals = [10.0, 20.0, 30.0, 30.0]
+        for expected_interval in expected_intervals:
+            scheduler.update(document_count=0, page_size=10)
+            self.assertEqual(scheduler.next_interval, expected_interval)
+
+        # new documents reset the interval
+        scheduler.update(document_count=1, page_size=10)
+        self.assertEqual(scheduler.next_interval, 5.0)
+        scheduler.update(document_count=0, page_size=10)
+        self.assertEqual(scheduler.next_interval, 10.0)
+
+    # ----------------------------------------------------------------------
+    def test_update_for_pages(self):
+        scheduler = self._factor_scheduler()
+        scheduler.update_for_pages([(3, 10), (10, 10)])
+        self.assertEqual(scheduler.next_interval, 0.5)
+
+        scheduler.update_for_pages([(3, 10), (0, 10)])
+        self.assertEqual(scheduler.next_interval, 5.0)
+
+        scheduler.update_for_pages([(0, 10), (0, 10)])
+        self.assertEqual(scheduler.next_interval, 10.0)
+
+    # ----------------------------------------------------------------------
+    def test_record_error(self):
+        scheduler = self._factor_scheduler()
+        scheduler.record_error()
+        self.assertEqual(scheduler.next_interval, 10.0)
+
+    # ----------------------------------------------------------------------
+    def test_update_back_off_no_overflow(self):
+        scheduler = self._factor_scheduler()
+        for _ in range(5000):
+            scheduler.update(document_count=0, page_size=10)
+        self.assertEqual(scheduler.next_interval, 30.0)
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.util.scheduler.monotonic')
+    def test_get_wait_time_measured_from_poll_start(self, mock_monotonic):
+        scheduler = self._factor_scheduler()
+        mock_monotonic.return_value = 100.0
+        scheduler.start_poll()
+        scheduler.update(document_count=3, page_size=10)
+
+        # fetching and printing took 2 seconds
+        mock_monotonic.return_value = 102.0
+        self.assertEqual(scheduler.get_wait_time(), 3.0)
+
+        # fetching and printing took longer than the interval
+        mock_monotonic.return_value = 107.0
+        self.assertEqual(scheduler.get_wait_time(), 0.0)
+
+    # ----------------------------------------------------------------------
+    @mock.patch('lstail.util.scheduler.sleep')
+    @mock.patch('lstail.util.scheduler.monotonic')
+    def test_wait(self, mock_monotonic, mock_sleep):
+        scheduler = self._factor_scheduler()
+        mock_monotonic.return_value = 100.0
+        scheduler.start_poll()
+        scheduler.update(document_count=10, page_size=10)
+        mock_monotonic.return_value = 101.0
+        scheduler.wait()
+        mock_sleep.assert_not_called()
+
+        scheduler.start_poll()
+        scheduler.update(document_count=3, page_size=10)
+        mock_monotonic.return_value = 102.0
+        scheduler.wait()
+        mock_sleep.assert_called_once_with(4.0)